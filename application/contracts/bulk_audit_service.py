@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator
 
 import sys
 import os # <--- Added this import
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from application.dtos import BulkAuditResultDTO
+from application.dtos import BulkAuditResultDTO, ProgressEventDTO
 
 class BulkAuditService(ABC):
     """
@@ -13,7 +14,7 @@ class BulkAuditService(ABC):
     """
 
     @abstractmethod
-    def perform_audit(self, country_code: str) -> BulkAuditResultDTO:
+    def perform_audit(self, country_code: str, incremental: bool = False) -> BulkAuditResultDTO:
         """
         Orchestrates a full audit of a CHT instance.
         1. Fetches all installed forms from the CHT.
@@ -22,8 +23,58 @@ class BulkAuditService(ABC):
 
         Args:
             country_code (str): The country to audit ('MALI' or 'RCI').
+            incremental (bool): Only re-audit the forms whose XLSForm (git blob SHA) or views
+                changed since the stored results of a previous audit, and reuse the others.
 
         Returns:
             BulkAuditResultDTO: An object containing the full audit results.
         """
         pass
+
+    @abstractmethod
+    async def perform_audit_async(self, country_code: str, incremental: bool = False) -> BulkAuditResultDTO:
+        """
+        Asynchronous version of `perform_audit`: forms are downloaded, parsed and compared
+        concurrently on the running event loop, with a bounded number in flight.
+
+        Args:
+            country_code (str): The country to audit ('MALI' or 'RCI').
+            incremental (bool): See `perform_audit`.
+
+        Returns:
+            BulkAuditResultDTO: The same result `perform_audit` returns.
+        """
+        pass
+
+    @abstractmethod
+    def stream_audit(self, country_code: str, incremental: bool = False) -> Iterator[ProgressEventDTO]:
+        """
+        Runs `perform_audit` and yields its progress as it happens, so a UI can render each form
+        as soon as it is audited instead of waiting for the whole country.
+
+        Stages are 'preparing', 'fetching' (download and parse; one event per form), 'auditing'
+        (one event per form, carrying its SingleFormComparisonResultDTO) and 'done', whose event
+        carries the BulkAuditResultDTO `perform_audit` returns.
+
+        Args:
+            country_code (str): The country to audit ('MALI' or 'RCI').
+            incremental (bool): See `perform_audit`.
+
+        Returns:
+            Iterator[ProgressEventDTO]: The progress events, ending with the 'done' event.
+        """
+        pass
+
+    @abstractmethod
+    def stream_audit_async(self, country_code: str, incremental: bool = False) -> AsyncIterator[ProgressEventDTO]:
+        """
+        Asynchronous version of `stream_audit`, iterated on the running event loop.
+
+        Args:
+            country_code (str): The country to audit ('MALI' or 'RCI').
+            incremental (bool): See `perform_audit`.
+
+        Returns:
+            AsyncIterator[ProgressEventDTO]: The same events `stream_audit` yields.
+        """
+        pass
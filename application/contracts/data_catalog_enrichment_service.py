@@ -32,3 +32,26 @@ class DataCatalogEnrichmentService(ABC):
             DataCatalogResultDTO: The same catalog object, with rows modified in place.
         """
         pass
+
+    @abstractmethod
+    async def enrich_catalog_async(
+        self,
+        catalog: DataCatalogResultDTO,
+        country_code: str,
+        mode: str,
+        form_filter: str
+    ) -> DataCatalogResultDTO:
+        """
+        Asynchronous version of `enrich_catalog`: form contexts are loaded and descriptions
+        generated concurrently, with a bounded number of calls in flight.
+
+        Args:
+            catalog (DataCatalogResultDTO): The existing data catalog to enrich.
+            country_code (str): The country code (e.g., "MALI" or "RCI").
+            mode (str): The generation mode ("fill" or "overwrite").
+            form_filter (str): The specific form_view to filter on, or "All".
+
+        Returns:
+            DataCatalogResultDTO: The same catalog object, with rows modified in place.
+        """
+        pass
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from application.dtos import DataCatalogResultDTO
+from application.dtos import DataCatalogResultDTO, ProgressEventDTO
 
 class DataCatalogService(ABC):
     """
@@ -11,14 +12,76 @@ class DataCatalogService(ABC):
     """
 
     @abstractmethod
-    def generate_catalog(self, country_code: str) -> DataCatalogResultDTO:
+    def generate_catalog(self, country_code: str, incremental: bool = False) -> DataCatalogResultDTO:
         """
         Orchestrates the generation of a data catalog for a given country.
 
         Args:
             country_code (str): The country code (e.g., 'MALI', 'RCI').
+            incremental (bool): Keep the stored rows, enriched labels included, of every form whose
+                XLSForm and view are unchanged since the stored catalog; only the other forms are rebuilt.
+                In both modes, rebuilt rows that are otherwise unchanged keep their stored labels, and a
+                form that fails to rebuild keeps its stored rows.
 
         Returns:
-            DataCatalogResultDTO: An object containing the generated catalog rows.
+            DataCatalogResultDTO: An object containing the generated catalog rows and, when a catalog
+                store is configured, the rows added and removed since the stored catalog.
+        """
+        pass
+
+    @abstractmethod
+    async def generate_catalog_async(self, country_code: str, incremental: bool = False) -> DataCatalogResultDTO:
+        """
+        Asynchronous version of `generate_catalog`: forms are processed concurrently,
+        with a bounded number in flight. Rows keep the order of the installed forms.
+
+        Args:
+            country_code (str): The country code (e.g., 'MALI', 'RCI').
+            incremental (bool): See `generate_catalog`.
+
+        Returns:
+            DataCatalogResultDTO: The same result `generate_catalog` returns.
+        """
+        pass
+
+    @abstractmethod
+    def stream_catalog(self, country_code: str, incremental: bool = False) -> Iterator[ProgressEventDTO]:
+        """
+        Runs `generate_catalog` and yields its progress as it happens. Stages are 'preparing',
+        'cataloging' (one event per form, carrying its DataCatalogRowDTOs) and 'done', whose
+        event carries the DataCatalogResultDTO `generate_catalog` returns.
+
+        Args:
+            country_code (str): The country code (e.g., 'MALI', 'RCI').
+            incremental (bool): See `generate_catalog`.
+
+        Returns:
+            Iterator[ProgressEventDTO]: The progress events, ending with the 'done' event.
+        """
+        pass
+
+    @abstractmethod
+    def stream_catalog_async(self, country_code: str, incremental: bool = False) -> AsyncIterator[ProgressEventDTO]:
+        """
+        Asynchronous version of `stream_catalog`, iterated on the running event loop.
+
+        Args:
+            country_code (str): The country code (e.g., 'MALI', 'RCI').
+            incremental (bool): See `generate_catalog`.
+
+        Returns:
+            AsyncIterator[ProgressEventDTO]: The same events `stream_catalog` yields.
+        """
+        pass
+
+    @abstractmethod
+    def save_catalog(self, country_code: str, catalog: DataCatalogResultDTO):
+        """
+        Records edited rows (e.g. AI-generated descriptions) in the catalog store, so that the
+        next incremental generation keeps them. Does nothing when no catalog store is configured.
+
+        Args:
+            country_code (str): The country code (e.g., 'MALI', 'RCI').
+            catalog (DataCatalogResultDTO): The catalog whose rows replace the stored ones.
         """
         pass
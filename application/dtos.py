@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Tuple, Literal
+from typing import Any, Dict, List, Optional, Tuple, Literal
 
 import sys
 import os
@@ -79,6 +79,32 @@ class BulkAuditResultDTO:
     invalid_xlsforms: List[str] = field(default_factory=list)
     missing_views: List[str] = field(default_factory=list)
 
+@dataclass(frozen=True)
+class FormAuditRecordDTO:
+    """The audit outcome of one form, stored with the fingerprints of the inputs it was computed from."""
+    form_id: str
+    xlsform_sha: str  # Git blob SHA of the XLSForm.
+    view_fingerprints: Dict[str, Optional[str]] = field(default_factory=dict)  # SHA-256 of each view consulted; None if it was missing.
+    db_doc_groups: List[str] = field(default_factory=list)  # Groups the form declares.
+    claimed_db_doc_groups: List[str] = field(default_factory=list)  # Groups the form audited (not claimed by an earlier form).
+    invalid: bool = False
+    view_missing: bool = False
+    result: Optional[SingleFormComparisonResultDTO] = None
+
+@dataclass(frozen=True)
+class ProgressEventDTO:
+    """A step of a long-running operation over the forms of a country, streamed as it happens."""
+    stage: str  # The stage the operation is in, e.g. 'fetching', 'auditing'; 'done' on the last event.
+    forms_done: int  # Forms completed in the current stage.
+    forms_total: int  # Forms the current stage processes.
+    elapsed_seconds: float  # Since the operation started.
+    eta_seconds: Optional[float] = None  # Estimated time left in the current stage; None until a form completes.
+    form_id: Optional[str] = None  # The form that just completed, if any.
+    form_result: Any = None  # Its result: a SingleFormComparisonResultDTO (audit) or its DataCatalogRowDTOs (catalog).
+    result: Any = None  # The full result (BulkAuditResultDTO or DataCatalogResultDTO), on the 'done' event only.
+    @property
+    def fraction_done(self) -> float: return self.forms_done / self.forms_total if self.forms_total else 1.0
+
 # --- Other DTOs ---
 @dataclass(frozen=True)
 class CommitDTO: sha: str; author: str; date: str; message: str
@@ -97,4 +123,38 @@ class ParsedColumnDTO: column_name: str; json_path: str; sql_type: str
 @dataclass(frozen=False)
 class DataCatalogRowDTO: formview_name: str; xlsform_name: str; column_name: str; sql_type: str; json_path: str; odk_type: str; calculation: str = ""; label_fr: str = ""; label_en: str = ""; label_bm: str = ""
 @dataclass(frozen=False)
-class DataCatalogResultDTO: catalog_rows: List[DataCatalogRowDTO]
+class DataCatalogResultDTO:
+    catalog_rows: List[DataCatalogRowDTO]
+    # Changes against the stored catalog, by (form, column); empty when no catalog store is configured.
+    added_rows: List[DataCatalogRowDTO] = field(default_factory=list)
+    removed_rows: List[DataCatalogRowDTO] = field(default_factory=list)
+    regenerated_forms: List[str] = field(default_factory=list)
+    reused_forms: List[str] = field(default_factory=list)  # Forms whose stored rows were kept as they were.
+@dataclass(frozen=False)
+class CatalogFormRecordDTO:
+    """The catalog rows of one form, stored with the fingerprints of the inputs they were built from."""
+    form_id: str
+    xlsform_sha: Optional[str]  # Git blob SHA of the XLSForm; None if it could not be listed.
+    view_name: str
+    view_fingerprint: str  # SHA-256 of the view SQL.
+    rows: List[DataCatalogRowDTO] = field(default_factory=list)
+@dataclass(frozen=True)
+class HttpHostStatsDTO:
+    """Per-host transport statistics of the shared HTTP client."""
+    host: str
+    requests: int
+    errors: int
+    total_latency_seconds: float
+    connections_opened: int
+    @property
+    def average_latency_seconds(self) -> float: return self.total_latency_seconds / self.requests if self.requests else 0.0
+    @property
+    def reused_connections(self) -> int: return max(self.requests - self.connections_opened, 0)
+@dataclass(frozen=True)
+class SemanticCacheStatsDTO:
+    """Hit/miss counters of the semantic response cache since it was opened."""
+    hits: int
+    misses: int
+    entries: int
+    @property
+    def hit_ratio(self) -> float: return self.hits / (self.hits + self.misses) if (self.hits + self.misses) else 0.0
@@ -1,38 +1,91 @@
+import asyncio
+import hashlib
 import sys
 import os
-import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from application.contracts.bulk_audit_service import BulkAuditService
-from application.dtos import BulkAuditResultDTO, SingleFormComparisonResultDTO, NotFoundElementDTO, RepeatGroupAuditResultDTO, DbDocGroupAuditResultDTO
-from domain.contracts.cht_app_repository import CHTAppRepository
-from domain.contracts.code_repository import CodeRepository
-from domain.contracts.data_warehouse_repository import DataWarehouseRepository
+from application.dtos import BulkAuditResultDTO, SingleFormComparisonResultDTO, NotFoundElementDTO, RepeatGroupAuditResultDTO, DbDocGroupAuditResultDTO, FormAuditRecordDTO, ProgressEventDTO
+from domain.contracts.audit_result_repository import AuditResultRepository
+from domain.contracts.async_cht_app_repository import AsyncCHTAppRepository
+from domain.contracts.async_code_repository import AsyncCodeRepository
+from domain.contracts.async_data_warehouse_repository import AsyncDataWarehouseRepository
 from domain.contracts.xlsform_repository import XLSFormRepository
 from domain.contracts.logger import Logger
-from application.utils import get_view_name, get_repeat_group_view_name, get_db_doc_group_view_name
+from domain.services.sql_extraction_index import get_sql_extraction_index
+from application.utils import (
+    get_view_name, get_repeat_group_view_name, get_db_doc_group_view_name, get_xlsform_directory, get_xlsform_path,
+    gather_with_concurrency, run_coroutine_sync, iterate_sync, stream_progress, ProgressReporter
+)
+
+@dataclass
+class _FetchedForm:
+    """Outcome of the download + parse stage for a single form."""
+    form_id: str
+    parsed_data: Optional[Dict[str, Any]] = None
+    missing_label: Optional[str] = None
+    invalid: bool = False
+    claimed_db_doc_groups: Dict[str, list] = field(default_factory=dict)
+    record: Optional[FormAuditRecordDTO] = None  # Stored result reused by an incremental audit.
+    view_fingerprints: Dict[str, Optional[str]] = field(default_factory=dict)  # Views consulted by this audit.
+
+def _fingerprint(sql_content: str) -> str:
+    return hashlib.sha256(sql_content.encode('utf-8')).hexdigest()
 
 class BulkAuditServiceImpl(BulkAuditService):
-    def __init__(self, cht_app_repo: CHTAppRepository, code_repo: CodeRepository, dw_repo: DataWarehouseRepository, xlsform_repo: XLSFormRepository, logger: Logger):
-        self._cht_app_repo = cht_app_repo
-        self._code_repo = code_repo
-        self._dw_repo = dw_repo
+    def __init__(
+        self,
+        async_cht_app_repo: AsyncCHTAppRepository,
+        async_code_repo: AsyncCodeRepository,
+        async_dw_repo: AsyncDataWarehouseRepository,
+        xlsform_repo: XLSFormRepository,
+        logger: Logger,
+        max_workers: int = 1,
+        parse_in_processes: bool = False,
+        audit_result_repo: Optional[AuditResultRepository] = None
+    ):
+        # The audit runs on the async contracts, so that downloads and view queries of many forms overlap.
+        self._async_cht_app_repo = async_cht_app_repo
+        self._async_code_repo = async_code_repo
+        self._async_dw_repo = async_dw_repo
         self._xlsform_repo = xlsform_repo
         self._logger = logger
+        # At most this many forms are in flight at once; 1 keeps the historical sequential behaviour.
+        self._max_workers = max(1, int(max_workers or 1))
+        self._parse_in_processes = bool(parse_in_processes)
+        # Per-form results are stored with their input fingerprints, for incremental audits.
+        self._audit_result_repo = audit_result_repo
 
     def _is_extracted_in_struct(self, sql_content: str, json_path: str) -> bool:
-        pattern = re.compile(r"JSON_EXTRACT_SCALAR\s*\(\s*item\s*,\s*['\"]" + re.escape(json_path) + r"['\"]\s*\)", re.IGNORECASE | re.DOTALL)
-        return pattern.search(sql_content) is not None
+        return get_sql_extraction_index(sql_content).is_extracted_in_struct(json_path)
+
+    def _is_referenced(self, sql_content: str, json_path: str) -> bool:
+        return get_sql_extraction_index(sql_content).references_path(json_path)
 
     def _is_unnest_pattern_present(self, sql_content: str, repeat_group_json_path: str) -> bool:
-        pattern = re.compile(r"UNNEST\s*\(\s*JSON_EXTRACT_ARRAY\s*\([^,]+,\s*['\"]" + re.escape(repeat_group_json_path) + r"['\"]\s*\)", re.IGNORECASE | re.DOTALL)
-        return pattern.search(sql_content) is not None
+        return get_sql_extraction_index(sql_content).is_unnested(repeat_group_json_path)
+
+    def perform_audit(self, country_code: str, incremental: bool = False) -> BulkAuditResultDTO:
+        return run_coroutine_sync(self.perform_audit_async(country_code, incremental))
+
+    async def perform_audit_async(self, country_code: str, incremental: bool = False) -> BulkAuditResultDTO:
+        return await self._run_audit(country_code, incremental, ProgressReporter())
 
-    def perform_audit(self, country_code: str) -> BulkAuditResultDTO:
-        self._logger.log_info(f"Starting bulk audit for country: {country_code}")
-        installed_forms = self._cht_app_repo.get_installed_xform_ids(country_code)
+    def stream_audit(self, country_code: str, incremental: bool = False) -> Iterator[ProgressEventDTO]:
+        return iterate_sync(lambda: self.stream_audit_async(country_code, incremental))
+
+    def stream_audit_async(self, country_code: str, incremental: bool = False) -> AsyncIterator[ProgressEventDTO]:
+        return stream_progress(lambda reporter: self._run_audit(country_code, incremental, reporter))
+
+    async def _run_audit(self, country_code: str, incremental: bool, reporter: ProgressReporter) -> BulkAuditResultDTO:
+        self._logger.log_info(f"Starting {'incremental ' if incremental else ''}bulk audit for country: {country_code}")
+        installed_forms = await self._async_cht_app_repo.get_installed_xform_ids(country_code)
+        reporter.start_stage("preparing", len(installed_forms))
         
         compared_forms, missing_xlsforms, invalid_xlsforms, missing_views = [], [], [], []
         processed_db_doc_groups = set() # Set to track audited db-doc groups
@@ -40,45 +93,221 @@ class BulkAuditServiceImpl(BulkAuditService):
         project_id = "musoitproducts"
         dataset_id = "cht_mali_prod" if country_code.upper() == "MALI" else "cht_rci_prod"
 
+        # One query for every view definition of the dataset and one bulk download for all XLSForms.
+        # get_view_query is then served from memory; forms absent from the download fall back to per-file downloads.
+        _, prefetched_xlsforms, (xlsform_shas, records) = await asyncio.gather(
+            self._preload_view_queries(project_id, dataset_id),
+            self._prefetch_xlsforms(country_code),
+            self._load_audit_state(country_code, incremental)
+        )
+
+        # An incremental audit reuses the stored result of every form whose XLSForm and consulted views are unchanged.
+        reusable = await gather_with_concurrency(self._max_workers, (
+            self._reusable_record(records.get(form_id), xlsform_shas.get(get_xlsform_path(country_code, form_id)), project_id, dataset_id)
+            for form_id in installed_forms
+        ))
+        if incremental:
+            self._logger.log_info(f"Reusing the stored audit of {sum(record is not None for record in reusable)} of {len(installed_forms)} forms.")
+
+        with (ProcessPoolExecutor(max_workers=self._max_workers) if self._parse_in_processes else nullcontext()) as parse_executor:
+            # Stage 1: download and parse every other form concurrently. Results keep the installation order.
+            reporter.start_stage("fetching", sum(record is None for record in reusable))
+            parsed = iter(await gather_with_concurrency(self._max_workers, (
+                reporter.track(form_id, self._fetch_and_parse(country_code, form_id, prefetched_xlsforms, parse_executor))
+                for form_id, record in zip(installed_forms, reusable) if record is None
+            )))
+            fetched_forms = [_FetchedForm(form_id, record=record) if record is not None else next(parsed) for form_id, record in zip(installed_forms, reusable)]
+
+            # Stage 2: claim db-doc groups in installation order, so the first form that declares a group audits it.
+            stale_forms = []
+            for fetched in fetched_forms:
+                if fetched.missing_label is not None:
+                    missing_xlsforms.append(fetched.missing_label)
+                elif fetched.invalid or (fetched.record is not None and fetched.record.invalid):
+                    invalid_xlsforms.append(fetched.form_id)
+                elif fetched.record is not None:
+                    claimed = self._claim_db_doc_groups(dict.fromkeys(fetched.record.db_doc_groups), processed_db_doc_groups)
+                    if list(claimed) != fetched.record.claimed_db_doc_groups:
+                        # Another form now claims (or released) one of its groups: its stored result no longer applies.
+                        stale_forms.append((fetched, list(claimed)))
+                else:
+                    fetched.claimed_db_doc_groups = self._claim_db_doc_groups(fetched.parsed_data["db_doc_groups"], processed_db_doc_groups)
+
+            reparsed = await gather_with_concurrency(self._max_workers, (
+                self._fetch_and_parse(country_code, fetched.form_id, prefetched_xlsforms, parse_executor) for fetched, _ in stale_forms
+            ))
+        for (fetched, claimed), fresh in zip(stale_forms, reparsed):
+            fetched.record, fetched.parsed_data = None, fresh.parsed_data
+            fetched.missing_label, fetched.invalid = fresh.missing_label, fresh.invalid
+            if fresh.missing_label is not None:
+                missing_xlsforms.append(fresh.missing_label)
+            elif fresh.invalid:
+                invalid_xlsforms.append(fetched.form_id)
+            else:
+                fetched.claimed_db_doc_groups = {name: fresh.parsed_data["db_doc_groups"].get(name, []) for name in claimed}
+
+        # Stage 3: fetch the views and compare concurrently.
+        parsed_forms = [fetched for fetched in fetched_forms if fetched.parsed_data is not None]
+        reused_forms = [fetched for fetched in fetched_forms if fetched.record is not None and not fetched.record.invalid]
+        reporter.start_stage("auditing", len(parsed_forms) + len(reused_forms))
+        for fetched in reused_forms:
+            reporter.form_done(fetched.form_id, fetched.record.result)
+        audited = iter(await gather_with_concurrency(self._max_workers, (
+            reporter.track(fetched.form_id, self._audit_form(fetched, project_id, dataset_id, country_code), lambda outcome: outcome[1])
+            for fetched in parsed_forms
+        )))
+        audited_forms = {
+            fetched.form_id: (fetched.record.view_missing, fetched.record.result) if fetched.record is not None else next(audited)
+            for fetched in fetched_forms
+            if (fetched.record is not None and not fetched.record.invalid) or fetched.parsed_data is not None
+        }
+
         for form_id in installed_forms:
-            self._logger.log_info(f"Auditing form: {form_id}")
-            
+            if form_id not in audited_forms:
+                continue
+            view_missing, form_result = audited_forms[form_id]
+            if view_missing:
+                missing_views.append(form_result.form_id)
+            if form_result.not_found_elements or form_result.repeat_groups or form_result.db_doc_groups:
+                compared_forms.append(form_result)
+
+        await self._save_audit_state(country_code, fetched_forms, audited_forms, xlsform_shas)
+        result = BulkAuditResultDTO(compared_forms, missing_xlsforms, invalid_xlsforms, missing_views)
+        reporter.finish(result)
+        return result
+
+    async def _load_audit_state(self, country_code: str, incremental: bool) -> Tuple[Dict[str, str], Dict[str, FormAuditRecordDTO]]:
+        """The git blob SHA of every XLSForm and, for an incremental audit, the stored records."""
+        if self._audit_result_repo is None:
+            return {}, {}
+        try:
+            xlsform_shas = await self._async_code_repo.list_directory(branch="master", directory=get_xlsform_directory(country_code))
+        except Exception as e:
+            self._logger.log_warning(f"Could not list the XLSForms of {country_code}; their audit results will not be stored. Error: {e}")
+            return {}, {}
+        records = await asyncio.to_thread(self._audit_result_repo.load_records, country_code) if incremental else {}
+        return xlsform_shas, records
+
+    async def _reusable_record(self, record: Optional[FormAuditRecordDTO], xlsform_sha: Optional[str], project_id: str, dataset_id: str) -> Optional[FormAuditRecordDTO]:
+        if record is None or xlsform_sha is None or record.xlsform_sha != xlsform_sha:
+            return None
+        for view_name, fingerprint in record.view_fingerprints.items():
             try:
-                xls_path = f"muso-mali/forms/app/{form_id}.xlsx" if country_code.upper() == "MALI" else f"muso-cdi/forms/app/{form_id}.xlsx"
-                xls_content = self._code_repo.download_file(branch="master", file_path=xls_path)
+                current = _fingerprint(await self._async_dw_repo.get_view_query(project_id, dataset_id, view_name))
             except FileNotFoundError:
-                missing_xlsforms.append(form_id); continue
-            except Exception:
-                missing_xlsforms.append(f"{form_id} (Download Error)"); continue
+                current = None
+            if current != fingerprint:
+                return None
+        return record
+
+    async def _save_audit_state(self, country_code: str, fetched_forms: List[_FetchedForm], audited_forms: Dict[str, Tuple[bool, SingleFormComparisonResultDTO]], xlsform_shas: Dict[str, str]):
+        if self._audit_result_repo is None or not xlsform_shas:
+            return
+        records = {}
+        for fetched in fetched_forms:
+            xlsform_sha = xlsform_shas.get(get_xlsform_path(country_code, fetched.form_id))
+            if fetched.record is not None:
+                records[fetched.form_id] = fetched.record
+            elif xlsform_sha is None or fetched.missing_label is not None:
+                continue # Only forms whose XLSForm could be identified are stored.
+            elif fetched.parsed_data is None:
+                records[fetched.form_id] = FormAuditRecordDTO(fetched.form_id, xlsform_sha, invalid=True)
+            else:
+                view_missing, form_result = audited_forms[fetched.form_id]
+                records[fetched.form_id] = FormAuditRecordDTO(
+                    form_id=fetched.form_id,
+                    xlsform_sha=xlsform_sha,
+                    view_fingerprints=dict(fetched.view_fingerprints),
+                    db_doc_groups=list(fetched.parsed_data["db_doc_groups"]),
+                    claimed_db_doc_groups=list(fetched.claimed_db_doc_groups),
+                    view_missing=view_missing,
+                    result=form_result
+                )
+        try:
+            await asyncio.to_thread(self._audit_result_repo.save_records, country_code, records)
+        except Exception as e:
+            self._logger.log_warning(f"Could not store the audit results of {country_code}. Error: {e}")
+
+    async def _preload_view_queries(self, project_id: str, dataset_id: str):
+        try:
+            await self._async_dw_repo.load_view_queries(project_id, dataset_id)
+        except Exception as e:
+            self._logger.log_warning(f"Bulk view loading failed, falling back to per-view lookups. Error: {e}")
+
+    async def _prefetch_xlsforms(self, country_code: str) -> Mapping[str, bytes]:
+        try:
+            return await self._async_code_repo.download_directory(branch="master", directory=get_xlsform_directory(country_code))
+        except Exception as e:
+            self._logger.log_warning(f"Bulk XLSForm download failed, falling back to per-file downloads. Error: {e}")
+            return {}
 
+    async def _download_xlsform(self, xls_path: str, prefetched_xlsforms: Mapping[str, bytes]) -> bytes:
+        if xls_path in prefetched_xlsforms:
             try:
-                parsed_data = self._xlsform_repo.get_elements_from_file(xls_content)
-                main_elements, repeat_groups_data, db_doc_groups_data = parsed_data["main_elements"], parsed_data["repeat_groups"], parsed_data["db_doc_groups"]
+                # The bulk download is lazy: the first value read fetches the whole directory.
+                return await asyncio.to_thread(prefetched_xlsforms.__getitem__, xls_path)
             except Exception as e:
-                self._logger.log_exception(f"Could not parse XLSForm for '{form_id}'. Error: {e}"); invalid_xlsforms.append(form_id); continue
+                self._logger.log_warning(f"Could not read '{xls_path}' from the bulk download. Error: {e}")
+        return await self._async_code_repo.download_file(branch="master", file_path=xls_path)
 
-            for group_name in db_doc_groups_data.keys():
-                self._logger.log_info(f"Found db-doc group '{group_name}' in form '{form_id}'")
+    async def _fetch_and_parse(self, country_code: str, form_id: str, prefetched_xlsforms: Mapping[str, bytes], parse_executor: Optional[ProcessPoolExecutor]) -> _FetchedForm:
+        self._logger.log_info(f"Auditing form: {form_id}")
 
-            not_found_main, sql_content = [], None
-            view_name = get_view_name(country_code, form_id)
-            try:
-                sql_content = self._dw_repo.get_view_query(project_id, dataset_id, view_name)
-                for el in main_elements:
-                    if el.json_path and el.json_path not in sql_content:
-                        not_found_main.append(NotFoundElementDTO(el.question_name, el.json_path))
-            except FileNotFoundError:
-                missing_views.append(form_id)
+        try:
+            xls_content = await self._download_xlsform(get_xlsform_path(country_code, form_id), prefetched_xlsforms)
+        except FileNotFoundError:
+            return _FetchedForm(form_id, missing_label=form_id)
+        except Exception:
+            return _FetchedForm(form_id, missing_label=f"{form_id} (Download Error)")
+
+        try:
+            if parse_executor is not None:
+                parsed_data = await asyncio.get_running_loop().run_in_executor(parse_executor, self._xlsform_repo.get_elements_from_file, xls_content)
+            else:
+                parsed_data = await asyncio.to_thread(self._xlsform_repo.get_elements_from_file, xls_content)
+            parsed_data = {key: parsed_data[key] for key in ("main_elements", "repeat_groups", "db_doc_groups")}
+        except Exception as e:
+            self._logger.log_exception(f"Could not parse XLSForm for '{form_id}'. Error: {e}")
+            return _FetchedForm(form_id, invalid=True)
 
-            repeat_group_results = self._audit_repeat_groups(form_id, repeat_groups_data, sql_content, project_id, dataset_id)
-            db_doc_group_results = self._audit_db_doc_groups(form_id, db_doc_groups_data, project_id, dataset_id, processed_db_doc_groups)
+        for group_name in parsed_data["db_doc_groups"].keys():
+            self._logger.log_info(f"Found db-doc group '{group_name}' in form '{form_id}'")
 
-            if not_found_main or repeat_group_results or db_doc_group_results:
-                compared_forms.append(SingleFormComparisonResultDTO(form_id, not_found_main, repeat_group_results, db_doc_group_results))
+        return _FetchedForm(form_id, parsed_data=parsed_data)
 
-        return BulkAuditResultDTO(compared_forms, missing_xlsforms, invalid_xlsforms, missing_views)
+    async def _get_view_query(self, fetched: _FetchedForm, project_id: str, dataset_id: str, view_name: str) -> str:
+        """Returns a view's SQL and records its fingerprint (None when the view is missing) for the form's audit record."""
+        try:
+            sql_content = await self._async_dw_repo.get_view_query(project_id, dataset_id, view_name)
+        except FileNotFoundError:
+            fetched.view_fingerprints[view_name] = None
+            raise
+        fetched.view_fingerprints[view_name] = _fingerprint(sql_content)
+        return sql_content
 
-    def _audit_repeat_groups(self, form_id, repeat_groups_data, main_sql_content, project_id, dataset_id):
+    async def _audit_form(self, fetched: _FetchedForm, project_id: str, dataset_id: str, country_code: str):
+        form_id = fetched.form_id
+        main_elements, repeat_groups_data = fetched.parsed_data["main_elements"], fetched.parsed_data["repeat_groups"]
+
+        not_found_main, sql_content, view_missing = [], None, False
+        view_name = get_view_name(country_code, form_id)
+        try:
+            sql_content = await self._get_view_query(fetched, project_id, dataset_id, view_name)
+            for el in main_elements:
+                if el.json_path and not self._is_referenced(sql_content, el.json_path):
+                    not_found_main.append(NotFoundElementDTO(el.question_name, el.json_path))
+        except FileNotFoundError:
+            view_missing = True
+
+        repeat_group_results, db_doc_group_results = await asyncio.gather(
+            self._audit_repeat_groups(fetched, repeat_groups_data, sql_content, project_id, dataset_id),
+            self._audit_db_doc_groups(fetched, fetched.claimed_db_doc_groups, project_id, dataset_id)
+        )
+
+        return view_missing, SingleFormComparisonResultDTO(form_id, not_found_main, repeat_group_results, db_doc_group_results)
+
+    async def _audit_repeat_groups(self, fetched, repeat_groups_data, main_sql_content, project_id, dataset_id):
+        form_id = fetched.form_id
         results = []
         for repeat_name, repeat_data in repeat_groups_data.items():
             elements, json_path_in_parent = repeat_data["elements"], repeat_data["json_path_in_parent"]
@@ -92,10 +321,10 @@ class BulkAuditServiceImpl(BulkAuditService):
             else:
                 view_name = get_repeat_group_view_name(form_id, repeat_name)
                 try:
-                    sql = self._dw_repo.get_view_query(project_id, dataset_id, view_name)
+                    sql = await self._get_view_query(fetched, project_id, dataset_id, view_name)
                     handling_method = 'SEPARATE_VIEW'
                     for el in elements:
-                        if el.json_path and el.json_path not in sql:
+                        if el.json_path and not self._is_referenced(sql, el.json_path):
                             not_found.append(NotFoundElementDTO(el.question_name, el.json_path))
                 except FileNotFoundError:
                     self._logger.log_warning(f"Separate view not found for repeat group: {repeat_name}")
@@ -103,24 +332,30 @@ class BulkAuditServiceImpl(BulkAuditService):
             results.append(RepeatGroupAuditResultDTO(repeat_name, handling_method, elements, not_found))
         return results
 
-    def _audit_db_doc_groups(self, form_id, db_doc_groups_data, project_id, dataset_id, processed_db_doc_groups):
-        results = []
+    def _claim_db_doc_groups(self, db_doc_groups_data, processed_db_doc_groups):
+        claimed = {}
         for group_name, elements in db_doc_groups_data.items():
             if group_name in processed_db_doc_groups:
                 self._logger.log_info(f"Skipping already audited db-doc group: {group_name}")
                 continue
+            claimed[group_name] = elements
+            processed_db_doc_groups.add(group_name) # Mark as processed
+        return claimed
 
+    async def _audit_db_doc_groups(self, fetched, db_doc_groups_data, project_id, dataset_id):
+        form_id = fetched.form_id
+        results = []
+        for group_name, elements in db_doc_groups_data.items():
             not_found, view_found = [], False
             view_name = get_db_doc_group_view_name(form_id, group_name)
             try:
-                sql = self._dw_repo.get_view_query(project_id, dataset_id, view_name)
+                sql = await self._get_view_query(fetched, project_id, dataset_id, view_name)
                 view_found = True
                 for el in elements:
-                    if el.json_path and el.json_path not in sql:
+                    if el.json_path and not self._is_referenced(sql, el.json_path):
                         not_found.append(NotFoundElementDTO(el.question_name, el.json_path))
             except FileNotFoundError:
                 self._logger.log_warning(f"View not found for db-doc group: {group_name}")
             
             results.append(DbDocGroupAuditResultDTO(group_name, view_found, elements, not_found))
-            processed_db_doc_groups.add(group_name) # Mark as processed
         return results
@@ -1,6 +1,7 @@
+import asyncio
 import sys
 import os
-from typing import Callable
+from typing import Callable, Dict, List, Optional
 from dependency_injector.providers import Configuration
 from collections import defaultdict
 
@@ -8,12 +9,15 @@ from collections import defaultdict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from application.contracts.data_catalog_enrichment_service import DataCatalogEnrichmentService
-from application.dtos import DataCatalogResultDTO
-from domain.contracts.semantic_comparator_repository import SemanticComparatorRepository
-from domain.contracts.code_repository import CodeRepository
+from application.dtos import DataCatalogResultDTO, DataCatalogRowDTO
+from domain.contracts.async_semantic_comparator_repository import AsyncSemanticComparatorRepository
+from domain.contracts.async_code_repository import AsyncCodeRepository
 from domain.contracts.rich_xlsform_repository import RichXLSFormRepository
+from domain.contracts.enrichment_checkpoint_repository import EnrichmentCheckpointRepository
 from domain.contracts.logger import Logger
 from domain.services.cht_path_interpreter import CHTPathInterpreter
+from domain.services.formula_normalizer import normalize_formula
+from application.utils import get_xlsform_path, gather_with_concurrency, run_coroutine_sync
 
 class DataCatalogEnrichmentServiceImpl(DataCatalogEnrichmentService):
     """
@@ -22,19 +26,26 @@ class DataCatalogEnrichmentServiceImpl(DataCatalogEnrichmentService):
 
     def __init__(
         self, 
-        semantic_repo: SemanticComparatorRepository, 
-        code_repo: CodeRepository,
+        async_semantic_repo: AsyncSemanticComparatorRepository,
+        async_code_repo: AsyncCodeRepository,
         xlsform_repo: RichXLSFormRepository,
         path_interpreter_factory: Callable[..., CHTPathInterpreter],
         form_context_config: Configuration,
-        logger: Logger
+        logger: Logger,
+        max_workers: int = 1,
+        checkpoint_repo: Optional[EnrichmentCheckpointRepository] = None
     ):
-        self._semantic_repo = semantic_repo
-        self._code_repo = code_repo
+        # Enrichment runs on the async contracts, so that downloads and model calls of many forms overlap.
+        self._async_semantic_repo = async_semantic_repo
+        self._async_code_repo = async_code_repo
         self._xlsform_repo = xlsform_repo
         self._path_interpreter_factory = path_interpreter_factory
         self._form_context_config = form_context_config
         self._logger = logger
+        # At most this many downloads or model calls are in flight at once; 1 keeps the historical sequential behaviour.
+        self._max_workers = max(1, int(max_workers or 1))
+        # Descriptions are checkpointed form by form, so that an interrupted run resumes where it stopped.
+        self._checkpoint_repo = checkpoint_repo
 
     def enrich_catalog(
         self, 
@@ -43,6 +54,15 @@ class DataCatalogEnrichmentServiceImpl(DataCatalogEnrichmentService):
         mode: str, 
         form_filter: str
     ) -> DataCatalogResultDTO:
+        return run_coroutine_sync(self.enrich_catalog_async(catalog, country_code, mode, form_filter))
+
+    async def enrich_catalog_async(
+        self,
+        catalog: DataCatalogResultDTO,
+        country_code: str,
+        mode: str,
+        form_filter: str
+    ) -> DataCatalogResultDTO:
         
         self._logger.log_info(f"Starting data catalog enrichment. Country: {country_code}, Mode: {mode}, Filter: {form_filter}")
         
@@ -51,50 +71,154 @@ class DataCatalogEnrichmentServiceImpl(DataCatalogEnrichmentService):
         if form_filter != "All":
             rows_to_process = [row for row in rows_to_process if row.formview_name == form_filter]
 
-        # Group rows by form to process one form at a time
+        # Group rows by form so that each form context is loaded once
         form_groups = defaultdict(list)
         for row in rows_to_process:
             form_groups[row.xlsform_name].append(row)
 
-        enriched_count = 0
+        # Select the rows to describe first, so that forms with nothing to enrich are not downloaded.
+        run_key = f"{country_code}|{mode}|{form_filter}"
+        checkpoint = await asyncio.to_thread(self._checkpoint_repo.load, run_key) if self._checkpoint_repo else {}
+        resumed_count = 0
+        form_rows = {}
         for form_id, rows in form_groups.items():
-            self._logger.log_info(f"Processing form: {form_id}")
-            form_context_md = None
-            try:
-                # Use the provided country_code to build the path
-                xls_path_prefix = "muso-mali/forms/app/" if country_code.upper() == "MALI" else "muso-cdi/forms/app/"
-                xls_path = f"{xls_path_prefix}{form_id}.xlsx"
-                
-                self._logger.log_info(f"Downloading XLSForm for context: {xls_path}")
-                xls_content = self._code_repo.download_file(branch="master", file_path=xls_path)
-                
-                form_context_md = self._xlsform_repo.get_survey_sheet_as_markdown(xls_content)
-                self._logger.log_info(f"Successfully generated Markdown context for {form_id}")
-
-            except Exception as e:
-                self._logger.log_exception(f"Could not get form context for '{form_id}'. Skipping enrichment for this form. Error: {e}")
-                continue # Skip to the next form if context can't be loaded
+            rows = [
+                row for row in rows
+                if row.odk_type == 'calculate' and row.calculation
+                and ((mode == "overwrite") or (mode == "fill" and not row.label_fr))
+            ]
+            pending = []
+            for row in rows:
+                saved = checkpoint.get(self._checkpoint_key(row))
+                if saved is None:
+                    pending.append(row)
+                else:
+                    self._apply_descriptions(row, saved)
+                    resumed_count += 1
+            if pending:
+                form_rows[form_id] = pending
+        if resumed_count:
+            self._logger.log_info(f"Resumed {resumed_count} rows from the checkpoint of a previous run.")
 
-            # Now, iterate through the rows for this specific form
+        # Rows sharing a formula, in one form or across forms, are described once: formulas are grouped by
+        # their normalized text and each group is described with the context of one form that uses it.
+        rows_by_formula: Dict[str, List[DataCatalogRowDTO]] = defaultdict(list)
+        forms_by_formula: Dict[str, List[str]] = defaultdict(list)
+        for form_id, rows in form_rows.items():
             for row in rows:
-                if row.odk_type == 'calculate' and row.calculation:
-                    should_process = (mode == "overwrite") or (mode == "fill" and not row.label_fr)
-
-                    if should_process:
-                        try:
-                            self._logger.log_info(f"Enriching row: {row.column_name} with formula: {row.calculation}")
-                            descriptions = self._semantic_repo.get_formula_description_with_context(
-                                formula=row.calculation,
-                                form_context=form_context_md
-                            )
-                            
-                            row.label_fr = descriptions.get('fr', row.label_fr)
-                            row.label_en = descriptions.get('en', row.label_en)
-                            row.label_bm = descriptions.get('bm', row.label_bm)
-                            enriched_count += 1
-
-                        except Exception as e:
-                            self._logger.log_exception(f"Failed to enrich row for column '{row.column_name}': {e}")
-
-        self._logger.log_info(f"Enrichment complete. Processed {enriched_count} rows.")
+                formula_key = normalize_formula(row.calculation)
+                rows_by_formula[formula_key].append(row)
+                if form_id not in forms_by_formula[formula_key]:
+                    forms_by_formula[formula_key].append(form_id)
+        self._logger.log_info(f"{sum(map(len, rows_by_formula.values()))} rows share {len(rows_by_formula)} distinct formulas.")
+
+        # Each round gives every pending formula to the first form using it that has not failed, and describes
+        # the formulas of every such form in one batched request. Formulas of a failed form move to another form.
+        enriched_count, failed_forms, unresolved = 0, set(), []
+        pending = list(rows_by_formula)
+        while pending:
+            owned = defaultdict(list)
+            for formula_key in pending:
+                form_id = next((form for form in forms_by_formula[formula_key] if form not in failed_forms), None)
+                if form_id is None:
+                    unresolved.append(formula_key)
+                else:
+                    owned[form_id].append(formula_key)
+
+            form_ids = list(owned)
+            enriched = await gather_with_concurrency(self._max_workers, (
+                self._enrich_form_formulas(run_key, country_code, form_id, owned[form_id], rows_by_formula) for form_id in form_ids
+            ))
+
+            pending = []
+            for form_id, count in zip(form_ids, enriched):
+                if count is None:
+                    failed_forms.add(form_id)
+                    pending.extend(owned[form_id])
+                else:
+                    enriched_count += count
+
+        if self._checkpoint_repo:
+            if not unresolved:
+                await asyncio.to_thread(self._checkpoint_repo.clear, run_key)
+            else:
+                self._logger.log_warning(f"{len(unresolved)} formulas could not be described; the progress is kept for the next run.")
+
+        self._logger.log_info(f"Enrichment complete. Processed {enriched_count + resumed_count} rows.")
         return catalog
+
+    @staticmethod
+    def _checkpoint_key(row: DataCatalogRowDTO) -> str:
+        # The formula is part of the key, so that a row whose calculation changed is described again.
+        return f"{row.xlsform_name}|{row.formview_name}|{row.column_name}|{row.calculation}"
+
+    @staticmethod
+    def _apply_descriptions(row: DataCatalogRowDTO, descriptions: Dict[str, str]):
+        row.label_fr = descriptions.get('fr', row.label_fr)
+        row.label_en = descriptions.get('en', row.label_en)
+        row.label_bm = descriptions.get('bm', row.label_bm)
+
+    async def _load_form_context(self, country_code: str, form_id: str, formulas: List[str]) -> Optional[str]:
+        self._logger.log_info(f"Processing form: {form_id}")
+        try:
+            # Use the provided country_code to build the path
+            xls_path = get_xlsform_path(country_code, form_id)
+
+            self._logger.log_info(f"Downloading XLSForm for context: {xls_path}")
+            xls_content = await self._async_code_repo.download_file(branch="master", file_path=xls_path)
+
+            # Only the rows in the dependency closure of the formulas are sent, not the whole survey sheet.
+            form_context_md = await asyncio.to_thread(self._xlsform_repo.get_formula_context_as_markdown, xls_content, formulas)
+            self._logger.log_info(f"Successfully generated Markdown context for {form_id}")
+            return form_context_md
+
+        except Exception as e:
+            self._logger.log_exception(f"Could not get form context for '{form_id}'. Skipping enrichment for this form. Error: {e}")
+            return None
+
+    async def _enrich_form_formulas(
+        self,
+        run_key: str,
+        country_code: str,
+        form_id: str,
+        formula_keys: List[str],
+        rows_by_formula: Dict[str, List[DataCatalogRowDTO]]
+    ) -> Optional[int]:
+        """Describes the given formulas with the context of one form and fans the descriptions out to every row using them."""
+        # The formulas are sent as written in this form, so that its dependency graph can locate them.
+        formulas = [
+            next(row.calculation for row in rows_by_formula[formula_key] if row.xlsform_name == form_id)
+            for formula_key in formula_keys
+        ]
+        # Stage 1: load the Markdown context of the form, sliced to the rows its formulas depend on.
+        form_context_md = await self._load_form_context(country_code, form_id, formulas)
+        if form_context_md is None:
+            return None # Skip forms whose context can't be loaded
+
+        # Stage 2: describe the formulas in one batched request, so that the context is sent once.
+        try:
+            self._logger.log_info(f"Enriching {len(formulas)} distinct formulas with the context of form: {form_id}")
+            descriptions = await self._async_semantic_repo.get_formula_descriptions_with_context(
+                formulas=formulas,
+                form_context=form_context_md
+            )
+        except Exception as e:
+            self._logger.log_exception(f"Failed to enrich the rows of form '{form_id}': {e}")
+            return None
+
+        completed = {}
+        rows_count = 0
+        for formula_key, formula_descriptions in zip(formula_keys, descriptions):
+            for row in rows_by_formula[formula_key]:
+                self._apply_descriptions(row, formula_descriptions)
+                rows_count += 1
+                # Failed descriptions are not checkpointed, so a resumed run asks for them again.
+                if not any(str(text).startswith("Error:") for text in formula_descriptions.values()):
+                    completed[self._checkpoint_key(row)] = formula_descriptions
+
+        if self._checkpoint_repo:
+            try:
+                await asyncio.to_thread(self._checkpoint_repo.save, run_key, completed)
+            except Exception as e:
+                self._logger.log_warning(f"Could not checkpoint the descriptions of form '{form_id}': {e}")
+        return rows_count
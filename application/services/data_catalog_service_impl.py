@@ -1,18 +1,34 @@
+import asyncio
+import hashlib
 import sys
 import os
-from typing import List
+from typing import AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from application.contracts.data_catalog_service import DataCatalogService
-from application.dtos import DataCatalogResultDTO, DataCatalogRowDTO
-from domain.contracts.cht_app_repository import CHTAppRepository
-from domain.contracts.code_repository import CodeRepository
-from domain.contracts.data_warehouse_repository import DataWarehouseRepository
+from application.dtos import CatalogFormRecordDTO, DataCatalogResultDTO, DataCatalogRowDTO, ProgressEventDTO
+from domain.contracts.catalog_store_repository import CatalogStoreRepository
 from domain.contracts.rich_xlsform_repository import RichXLSFormRepository
 from domain.contracts.sql_parser_repository import SQLParserRepository
+from domain.contracts.async_cht_app_repository import AsyncCHTAppRepository
+from domain.contracts.async_code_repository import AsyncCodeRepository
+from domain.contracts.async_data_warehouse_repository import AsyncDataWarehouseRepository
 from domain.contracts.logger import Logger
+from application.utils import (
+    get_xlsform_directory, get_xlsform_path, gather_with_concurrency, run_coroutine_sync, iterate_sync, stream_progress, ProgressReporter
+)
+
+# Row fields that must be unchanged for the labels of a stored row to carry over to its regenerated row.
+_ROW_IDENTITY_FIELDS = ('json_path', 'sql_type', 'odk_type', 'calculation')
+_LABEL_FIELDS = ('label_fr', 'label_en', 'label_bm')
+
+def _fingerprint(sql_content: str) -> str:
+    return hashlib.sha256(sql_content.encode('utf-8')).hexdigest()
+
+def _row_key(row: DataCatalogRowDTO) -> Tuple[str, str]:
+    return row.xlsform_name, row.column_name
 
 class DataCatalogServiceImpl(DataCatalogService):
     """
@@ -21,19 +37,26 @@ class DataCatalogServiceImpl(DataCatalogService):
 
     def __init__(
         self,
-        cht_app_repo: CHTAppRepository,
-        code_repo: CodeRepository,
-        dw_repo: DataWarehouseRepository,
+        async_cht_app_repo: AsyncCHTAppRepository,
+        async_code_repo: AsyncCodeRepository,
+        async_dw_repo: AsyncDataWarehouseRepository,
         xlsform_repo: RichXLSFormRepository,
         sql_parser_repo: SQLParserRepository,
-        logger: Logger
+        logger: Logger,
+        max_workers: int = 1,
+        catalog_store_repo: Optional[CatalogStoreRepository] = None
     ):
-        self._cht_app_repo = cht_app_repo
-        self._code_repo = code_repo
-        self._dw_repo = dw_repo
+        # Generation runs on the async contracts, so that downloads and view queries of many forms overlap.
+        self._async_cht_app_repo = async_cht_app_repo
+        self._async_code_repo = async_code_repo
+        self._async_dw_repo = async_dw_repo
         self._xlsform_repo = xlsform_repo
         self._sql_parser_repo = sql_parser_repo
         self._logger = logger
+        # At most this many forms are processed at once; 1 keeps the historical sequential behaviour.
+        self._max_workers = max(1, int(max_workers or 1))
+        # Rows are stored per form with their input fingerprints, for incremental regeneration.
+        self._catalog_store_repo = catalog_store_repo
         self._view_name_exceptions = {
             "MALI": {
                 "patient_assessment": "formview_assessment",
@@ -56,57 +79,201 @@ class DataCatalogServiceImpl(DataCatalogService):
         country_exceptions = self._view_name_exceptions.get(country_code.upper(), {})
         return country_exceptions.get(form_id, f"formview_{form_id}")
 
-    def generate_catalog(self, country_code: str) -> DataCatalogResultDTO:
-        self._logger.log_info(f"Starting data catalog generation for country: {country_code}")
-        installed_forms = self._cht_app_repo.get_installed_xform_ids(country_code)
-        
-        all_catalog_rows: List[DataCatalogRowDTO] = []
+    async def _preload_view_queries(self, project_id: str, dataset_id: str):
+        try:
+            await self._async_dw_repo.load_view_queries(project_id, dataset_id)
+        except Exception as e:
+            self._logger.log_warning(f"Bulk view loading failed, falling back to per-view lookups. Error: {e}")
+
+    async def _prefetch_xlsforms(self, country_code: str) -> Mapping[str, bytes]:
+        try:
+            return await self._async_code_repo.download_directory(branch="master", directory=get_xlsform_directory(country_code))
+        except Exception as e:
+            self._logger.log_warning(f"Bulk XLSForm download failed, falling back to per-file downloads. Error: {e}")
+            return {}
 
-        for form_id in installed_forms:
+    async def _download_xlsform(self, xls_path: str, prefetched_xlsforms: Mapping[str, bytes]) -> bytes:
+        if xls_path in prefetched_xlsforms:
             try:
-                self._logger.log_info(f"Processing form: {form_id}")
-
-                # 1. Fetch XLSForm from GitHub
-                xls_path_prefix = "muso-mali/forms/app/" if country_code.upper() == "MALI" else "muso-cdi/forms/app/"
-                xls_path = f"{xls_path_prefix}{form_id}.xlsx"
-                xls_content = self._code_repo.download_file(branch="master", file_path=xls_path)
-                
-                # 2. Fetch BigQuery View SQL
-                view_name = self._get_view_name(country_code, form_id)
-                project_id = "musoitproducts"
-                dataset_id = "cht_mali_prod" if country_code.upper() == "MALI" else "cht_rci_prod"
-                sql_content = self._dw_repo.get_view_query(project_id, dataset_id, view_name)
-
-                # 3. Parse both artifacts
-                xls_elements = self._xlsform_repo.get_rich_elements_from_file(xls_content)
-                xls_elements_map = {el.json_path: el for el in xls_elements if el.json_path}
-                
-                sql_columns = self._sql_parser_repo.parse_columns(sql_content)
-
-                # 4. Correlate and generate rows
-                for col in sql_columns:
-                    if col.json_path in xls_elements_map:
-                        element = xls_elements_map[col.json_path]
-                        row = DataCatalogRowDTO(
-                            formview_name=view_name,
-                            xlsform_name=form_id,
-                            column_name=col.column_name,
-                            sql_type=col.sql_type,
-                            json_path=col.json_path,
-                            odk_type=element.odk_type,
-                            calculation=element.calculation or "", # Populate the new field
-                            label_fr=element.titles.get('fr', ''),
-                            label_en=element.titles.get('en', ''),
-                            label_bm=element.titles.get('bm', '')
-                        )
-                        all_catalog_rows.append(row)
-                    else:
-                        self._logger.log_warning(f"Could not find matching XLSForm element for column '{col.column_name}' with path '{col.json_path}' in form '{form_id}'")
-
-            except FileNotFoundError as e:
-                self._logger.log_warning(f"Skipping form '{form_id}': Artifact not found. Reason: {e}")
+                # The bulk download is lazy: the first value read fetches the whole directory.
+                return await asyncio.to_thread(prefetched_xlsforms.__getitem__, xls_path)
             except Exception as e:
-                self._logger.log_exception(f"An unexpected error occurred while processing form '{form_id}': {e}")
+                self._logger.log_warning(f"Could not read '{xls_path}' from the bulk download. Error: {e}")
+        return await self._async_code_repo.download_file(branch="master", file_path=xls_path)
+
+    def generate_catalog(self, country_code: str, incremental: bool = False) -> DataCatalogResultDTO:
+        return run_coroutine_sync(self.generate_catalog_async(country_code, incremental))
+
+    async def generate_catalog_async(self, country_code: str, incremental: bool = False) -> DataCatalogResultDTO:
+        return await self._run_catalog(country_code, incremental, ProgressReporter())
+
+    def stream_catalog(self, country_code: str, incremental: bool = False) -> Iterator[ProgressEventDTO]:
+        return iterate_sync(lambda: self.stream_catalog_async(country_code, incremental))
+
+    def stream_catalog_async(self, country_code: str, incremental: bool = False) -> AsyncIterator[ProgressEventDTO]:
+        return stream_progress(lambda reporter: self._run_catalog(country_code, incremental, reporter))
+
+    async def _run_catalog(self, country_code: str, incremental: bool, reporter: ProgressReporter) -> DataCatalogResultDTO:
+        self._logger.log_info(f"Starting {'incremental ' if incremental else ''}data catalog generation for country: {country_code}")
+        installed_forms = await self._async_cht_app_repo.get_installed_xform_ids(country_code)
+        reporter.start_stage("preparing", len(installed_forms))
+
+        project_id = "musoitproducts"
+        dataset_id = "cht_mali_prod" if country_code.upper() == "MALI" else "cht_rci_prod"
+        _, prefetched_xlsforms, (xlsform_shas, stored_forms) = await asyncio.gather(
+            self._preload_view_queries(project_id, dataset_id),
+            self._prefetch_xlsforms(country_code),
+            self._load_catalog_state(country_code)
+        )
+
+        # An incremental run keeps the stored rows of every form whose XLSForm and view are unchanged.
+        # Either way, regenerated rows keep the stored labels of unchanged rows (e.g. AI descriptions).
+        reporter.start_stage("cataloging", len(installed_forms))
+        records = await gather_with_concurrency(
+            self._max_workers,
+            (
+                reporter.track(form_id, self._catalog_form(
+                    country_code, form_id, project_id, dataset_id, prefetched_xlsforms,
+                    xlsform_shas.get(get_xlsform_path(country_code, form_id)),
+                    stored_forms.get(form_id), incremental
+                ), lambda record: record.rows if record is not None else []) for form_id in installed_forms
+            )
+        )
+        all_catalog_rows: List[DataCatalogRowDTO] = [row for record in records if record is not None for row in record.rows]
+        reused_forms = [record.form_id for record in records if record is not None and record is stored_forms.get(record.form_id)]
+        regenerated_forms = [record.form_id for record in records if record is not None and record.form_id not in reused_forms]
+
+        # A still-installed form that could not be catalogued this time keeps its stored record,
+        # so one failed run neither deletes its rows and labels nor reports them as removed.
+        kept_records = {
+            form_id: stored_forms[form_id] for form_id, record in zip(installed_forms, records)
+            if record is None and form_id in stored_forms
+        }
+        if kept_records:
+            self._logger.log_warning(f"Kept the stored catalog of {len(kept_records)} forms that could not be regenerated: {', '.join(kept_records)}")
+
+        current_keys = {_row_key(row) for row in all_catalog_rows}
+        stored_rows = [row for form_id, record in stored_forms.items() if form_id not in kept_records for row in record.rows]
+        stored_keys = {_row_key(row) for record in stored_forms.values() for row in record.rows}
+        result = DataCatalogResultDTO(
+            catalog_rows=all_catalog_rows,
+            added_rows=[row for row in all_catalog_rows if _row_key(row) not in stored_keys] if self._catalog_store_repo else [],
+            removed_rows=[row for row in stored_rows if _row_key(row) not in current_keys],
+            regenerated_forms=regenerated_forms,
+            reused_forms=reused_forms
+        )
+        await self._save_catalog_state(country_code, {**kept_records, **{record.form_id: record for record in records if record is not None}})
+
+        if incremental:
+            self._logger.log_info(f"Kept the stored rows of {len(reused_forms)} forms and regenerated {len(regenerated_forms)}.")
+        self._logger.log_info(f"Data catalog generation finished. Found {len(all_catalog_rows)} entries ({len(result.added_rows)} added, {len(result.removed_rows)} removed).")
+        reporter.finish(result)
+        return result
+
+    def save_catalog(self, country_code: str, catalog: DataCatalogResultDTO):
+        if self._catalog_store_repo is None:
+            return
+        # Only rows of stored forms are updated: their fingerprints still describe the inputs the rows come from.
+        rows_by_key = {_row_key(row): row for row in catalog.catalog_rows}
+        records = self._catalog_store_repo.load_forms(country_code)
+        for record in records.values():
+            record.rows = [rows_by_key.get(_row_key(row), row) for row in record.rows]
+        self._catalog_store_repo.save_forms(country_code, records)
+
+    async def _load_catalog_state(self, country_code: str) -> Tuple[Dict[str, str], Dict[str, CatalogFormRecordDTO]]:
+        """The git blob SHA of every XLSForm and the stored catalog."""
+        if self._catalog_store_repo is None:
+            return {}, {}
+        try:
+            xlsform_shas = await self._async_code_repo.list_directory(branch="master", directory=get_xlsform_directory(country_code))
+        except Exception as e:
+            self._logger.log_warning(f"Could not list the XLSForms of {country_code}; every form will be regenerated. Error: {e}")
+            xlsform_shas = {}
+        try:
+            stored_forms = await asyncio.to_thread(self._catalog_store_repo.load_forms, country_code)
+        except Exception as e:
+            self._logger.log_warning(f"Could not load the stored catalog of {country_code}. Error: {e}")
+            stored_forms = {}
+        return xlsform_shas, stored_forms
+
+    async def _save_catalog_state(self, country_code: str, records: Dict[str, CatalogFormRecordDTO]):
+        if self._catalog_store_repo is None:
+            return
+        try:
+            await asyncio.to_thread(self._catalog_store_repo.save_forms, country_code, records)
+        except Exception as e:
+            self._logger.log_warning(f"Could not store the data catalog of {country_code}. Error: {e}")
+
+    @staticmethod
+    def _carry_over_labels(rows: List[DataCatalogRowDTO], stored: CatalogFormRecordDTO):
+        """Gives a regenerated row the stored labels it lacks, when the row itself is unchanged (e.g. AI descriptions)."""
+        stored_rows = {row.column_name: row for row in stored.rows}
+        for row in rows:
+            previous = stored_rows.get(row.column_name)
+            if previous is None or any(getattr(row, name) != getattr(previous, name) for name in _ROW_IDENTITY_FIELDS):
+                continue
+            for name in _LABEL_FIELDS:
+                if not getattr(row, name):
+                    setattr(row, name, getattr(previous, name))
+
+    async def _catalog_form(
+        self,
+        country_code: str,
+        form_id: str,
+        project_id: str,
+        dataset_id: str,
+        prefetched_xlsforms: Mapping[str, bytes],
+        xlsform_sha: Optional[str] = None,
+        stored: Optional[CatalogFormRecordDTO] = None,
+        reuse_stored: bool = False
+    ) -> Optional[CatalogFormRecordDTO]:
+        catalog_rows: List[DataCatalogRowDTO] = []
+        try:
+            self._logger.log_info(f"Processing form: {form_id}")
+
+            # 1. Fetch BigQuery View SQL (served from memory once the views are preloaded)
+            view_name = self._get_view_name(country_code, form_id)
+            sql_content = await self._async_dw_repo.get_view_query(project_id, dataset_id, view_name)
+            view_fingerprint = _fingerprint(sql_content)
+
+            if reuse_stored and stored is not None and xlsform_sha is not None and (stored.xlsform_sha, stored.view_name, stored.view_fingerprint) == (xlsform_sha, view_name, view_fingerprint):
+                return stored
+
+            # 2. Fetch XLSForm from GitHub (from the bulk download when available)
+            xls_content = await self._download_xlsform(get_xlsform_path(country_code, form_id), prefetched_xlsforms)
+
+            # 3. Parse both artifacts
+            xls_elements = await asyncio.to_thread(self._xlsform_repo.get_rich_elements_from_file, xls_content)
+            xls_elements_map = {el.json_path: el for el in xls_elements if el.json_path}
+
+            sql_columns = self._sql_parser_repo.parse_columns(sql_content)
+
+            # 4. Correlate and generate rows
+            for col in sql_columns:
+                if col.json_path in xls_elements_map:
+                    element = xls_elements_map[col.json_path]
+                    row = DataCatalogRowDTO(
+                        formview_name=view_name,
+                        xlsform_name=form_id,
+                        column_name=col.column_name,
+                        sql_type=col.sql_type,
+                        json_path=col.json_path,
+                        odk_type=element.odk_type,
+                        calculation=element.calculation or "", # Populate the new field
+                        label_fr=element.titles.get('fr', ''),
+                        label_en=element.titles.get('en', ''),
+                        label_bm=element.titles.get('bm', '')
+                    )
+                    catalog_rows.append(row)
+                else:
+                    self._logger.log_warning(f"Could not find matching XLSForm element for column '{col.column_name}' with path '{col.json_path}' in form '{form_id}'")
+
+            if stored is not None:
+                self._carry_over_labels(catalog_rows, stored)
+            return CatalogFormRecordDTO(form_id, xlsform_sha, view_name, view_fingerprint, catalog_rows)
 
-        self._logger.log_info(f"Data catalog generation finished. Found {len(all_catalog_rows)} entries.")
-        return DataCatalogResultDTO(catalog_rows=all_catalog_rows)
+        except FileNotFoundError as e:
+            self._logger.log_warning(f"Skipping form '{form_id}': Artifact not found. Reason: {e}")
+        except Exception as e:
+            self._logger.log_exception(f"An unexpected error occurred while processing form '{form_id}': {e}")
+        return None
@@ -1,6 +1,5 @@
 import sys
 import os
-import re
 from typing import List
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -10,6 +9,7 @@ from application.dtos import FullComparisonResultDTO, ComparisonResultDTO, Found
 from domain.contracts.xlsform_repository import XLSFormRepository
 from domain.contracts.data_warehouse_repository import DataWarehouseRepository
 from application.utils import get_db_doc_group_view_name, get_repeat_group_view_name
+from domain.services.sql_extraction_index import get_sql_extraction_index
 
 class FormComparatorServiceImpl(FormComparatorService):
     """
@@ -21,8 +21,7 @@ class FormComparatorServiceImpl(FormComparatorService):
         self._dw_repo = dw_repository
 
     def _is_extracted_in_struct(self, sql_content: str, json_path: str) -> bool:
-        pattern = re.compile(r"JSON_EXTRACT_SCALAR\s*\(\s*item\s*,\s*['\"]" + re.escape(json_path) + r"['\"]\s*\)", re.IGNORECASE | re.DOTALL)
-        return pattern.search(sql_content) is not None
+        return get_sql_extraction_index(sql_content).is_extracted_in_struct(json_path)
 
     def compare_form_with_sql(self, xls_content: bytes, sql_content: bytes, country: str, form_id: str, project_id: str, dataset_id: str) -> FullComparisonResultDTO:
         """
@@ -45,7 +44,7 @@ class FormComparatorServiceImpl(FormComparatorService):
             handling_method = 'NOT_FOUND'
             comparison_result = ComparisonResultDTO()
 
-            if f"UNNEST(JSON_EXTRACT_ARRAY(f.doc, '{json_path_in_parent}'))" in sql_content_str:
+            if get_sql_extraction_index(sql_content_str).is_unnested(json_path_in_parent):
                 handling_method = 'ARRAY_IN_MAIN_VIEW'
                 founds, not_founds = [], []
                 for el in elements:
@@ -87,16 +86,15 @@ class FormComparatorServiceImpl(FormComparatorService):
 
     def _compare_elements_to_sql(self, elements: List, sql_content: str, country: str) -> ComparisonResultDTO:
         founds, not_founds, bm_not_founds = [], [], []
+        # The SQL is tokenized once; every element is then an exact lookup of its JSON path literal.
+        occurrences_by_path = get_sql_extraction_index(sql_content).occurrences_of(el.json_path for el in elements if el.json_path)
         for el in elements:
             if el.json_path:
-                try:
-                    matches = list(re.finditer(re.escape(el.json_path), sql_content))
-                except re.error:
-                    matches = []
-                
-                if matches:
-                    lines = [sql_content[:match.start()].count('\n') + 1 for match in matches]
-                    founds.append(FoundReferenceDTO(el.question_name, el.json_path, len(matches), lines))
+                occurrences = occurrences_by_path.get(el.json_path)
+
+                if occurrences:
+                    lines = [reference.line for reference in occurrences]
+                    founds.append(FoundReferenceDTO(el.question_name, el.json_path, len(occurrences), lines))
                 else:
                     if country == 'RCI' and el.question_name.endswith('_bm'):
                         bm_not_founds.append(NotFoundElementDTO(el.question_name, el.json_path))
@@ -1,19 +1,39 @@
 import sys
 import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from application.contracts.xlsform_comparator_service import XLSFormComparatorService
 from application.dtos import XLSFormComparisonResultDTO, ModifiedElementDTO
 from domain.contracts.rich_xlsform_repository import RichXLSFormRepository
 from domain.contracts.semantic_comparator_repository import SemanticComparatorRepository
+from domain.entities.RichCHTElement import RichCHTElement
+from domain.services.bipartite_assignment import best_assignment
+from domain.services.lexical_candidate_index import LexicalCandidateIndex
+from domain.services.xpath_canonicalizer import formula_fingerprint
 
 class XLSFormComparatorServiceImpl(XLSFormComparatorService):
     """
     Concrete implementation of the XLSFormComparatorService.
     """
-    def __init__(self, xlsform_repo: RichXLSFormRepository, semantic_repo: SemanticComparatorRepository):
+    # Minimum similarity score for two elements to be reported as the same, reworded element.
+    SEMANTIC_MATCH_THRESHOLD = 0.5
+
+    def __init__(
+        self,
+        xlsform_repo: RichXLSFormRepository,
+        semantic_repo: SemanticComparatorRepository,
+        lexical_top_k: int = 5,
+        lexical_accept_threshold: float = 0.9
+    ):
         self._xlsform_repo = xlsform_repo
         self._semantic_repo = semantic_repo
+        # Only the k lexically closest new elements of each old element are sent to the AI model.
+        self._lexical_top_k = max(1, int(lexical_top_k or 5))
+        # Pairs at least this lexically similar are matched locally, without any AI call.
+        self._lexical_accept_threshold = float(lexical_accept_threshold if lexical_accept_threshold is not None else 0.9)
 
     def compare_forms(
         self, 
@@ -74,29 +94,33 @@ class XLSFormComparatorServiceImpl(XLSFormComparatorService):
                 del new_elements_map[new_el.path]
 
         # Layer 3: Differentiated Semantic Matching (conditional on UI flags)
-        if use_title_matching or use_formula_matching:
-            for old_path, old_el in list(old_elements_map.items()):
-                best_match = None
-                match_reason = ""
-
-                for new_path, new_el in new_elements_map.items():
-                    # Case 1: For 'calculate' questions, compare formulas if enabled
-                    if use_formula_matching and old_el.odk_type == 'calculate' and new_el.odk_type == 'calculate':
-                        if self._semantic_repo.are_formulas_semantically_similar(old_el.calculation, new_el.calculation):
-                            best_match = new_el
-                            match_reason = "Reworded (Formula Match)"
-                            break
-                    # Case 2: For other questions, compare titles if enabled
-                    elif use_title_matching and old_el.odk_type != 'calculate' and new_el.odk_type != 'calculate':
-                        if self._semantic_repo.are_titles_semantically_similar(old_el.titles.get('fr'), new_el.titles.get('fr')):
-                            best_match = new_el
-                            match_reason = "Reworded (Title Match)"
-                            break
-                
-                if best_match:
-                    modified.append(ModifiedElementDTO(old_el, best_match, match_reason))
-                    del old_elements_map[old_el.path]
-                    del new_elements_map[best_match.path]
+        # Each kind of candidate is scored in one batched call: formulas between 'calculate' questions,
+        # French titles between all other questions.
+        semantic_matches: Dict[str, Tuple[RichCHTElement, str]] = {}
+        if use_formula_matching:
+            semantic_matches.update(self._match_semantically(
+                [el for el in old_elements_map.values() if el.odk_type == 'calculate'],
+                [el for el in new_elements_map.values() if el.odk_type == 'calculate'],
+                lambda el: el.calculation,
+                self._semantic_repo.score_formula_similarities,
+                "Reworded (Formula Match)",
+                equivalence_key=lambda el: formula_fingerprint(el.calculation)
+            ))
+        if use_title_matching:
+            semantic_matches.update(self._match_semantically(
+                [el for el in old_elements_map.values() if el.odk_type != 'calculate'],
+                [el for el in new_elements_map.values() if el.odk_type != 'calculate'],
+                lambda el: el.titles.get('fr'),
+                self._semantic_repo.score_title_similarities,
+                "Reworded (Title Match)"
+            ))
+
+        for old_path, old_el in list(old_elements_map.items()):
+            if old_path in semantic_matches:
+                best_match, match_reason = semantic_matches[old_path]
+                modified.append(ModifiedElementDTO(old_el, best_match, match_reason))
+                del old_elements_map[old_el.path]
+                del new_elements_map[best_match.path]
 
         return XLSFormComparisonResultDTO(
             unchanged_elements=unchanged,
@@ -104,3 +128,99 @@ class XLSFormComparatorServiceImpl(XLSFormComparatorService):
             new_elements=list(new_elements_map.values()),
             deleted_elements=list(old_elements_map.values())
         )
+
+    def _match_semantically(
+        self,
+        old_candidates: List[RichCHTElement],
+        new_candidates: List[RichCHTElement],
+        text_of: Callable[[RichCHTElement], Optional[str]],
+        score_similarities: Callable[[List[str], List[str]], List[List[float]]],
+        reason: str,
+        equivalence_key: Optional[Callable[[RichCHTElement], Optional[str]]] = None
+    ) -> Dict[str, Tuple[RichCHTElement, str]]:
+        """
+        Matches old elements to new ones in up to three tiers:
+
+        0. When an equivalence key is given (e.g. the canonical AST hash of a formula),
+           each old element, in form order, is paired with the first free new element
+           sharing its key.
+        1. A local lexical tier ranks the new candidates of every old element by TF-IDF
+           similarity of their titles, names and calculations. Near-identical pairs are
+           accepted right away.
+        2. The remaining old elements are scored in one batched AI call against the free
+           candidates of all their shortlists; only each element's own top-k lexical
+           candidates can then be matched to it.
+
+        Tiers 1 and 2 pair elements by optimal assignment over their score matrix (maximal
+        total similarity above the tier's threshold), so the result does not depend on the
+        order elements are visited in.
+
+        Returns:
+            Dict[str, Tuple[RichCHTElement, str]]: The matched new element and reason, by old element path.
+        """
+        if not old_candidates or not new_candidates:
+            return {}
+
+        # Tier 0: exact local matches of equivalent elements, settled without any scoring.
+        matches = {}
+        if equivalence_key is not None:
+            matches = self._match_equivalent(old_candidates, new_candidates, equivalence_key, reason)
+            matched_new = {new_el.path for new_el, _ in matches.values()}
+            old_candidates = [el for el in old_candidates if el.path not in matches]
+            new_candidates = [el for el in new_candidates if el.path not in matched_new]
+            if not old_candidates or not new_candidates:
+                return matches
+
+        index = LexicalCandidateIndex(new_candidates)
+        shortlists = [index.top_candidates(old_el, self._lexical_top_k) for old_el in old_candidates]
+        taken = set()
+
+        # Tier 1: local acceptance of high-confidence lexical matches.
+        lexical_scores = np.full((len(old_candidates), len(new_candidates)), -np.inf)
+        for i, shortlist in enumerate(shortlists):
+            for j, score in shortlist:
+                lexical_scores[i, j] = score
+        for i, j, _ in best_assignment(lexical_scores, self._lexical_accept_threshold):
+            taken.add(j)
+            matches[old_candidates[i].path] = (new_candidates[j], reason)
+
+        # Tier 2: AI scoring of the remaining shortlisted pairs only.
+        pending = [i for i, old_el in enumerate(old_candidates) if old_el.path not in matches and any(j not in taken for j, _ in shortlists[i])]
+        if not pending:
+            return matches
+        columns = sorted({j for i in pending for j, _ in shortlists[i] if j not in taken})
+        column_of = {j: column for column, j in enumerate(columns)}
+
+        # One call for all pending elements, so the number of prompts does not grow with the number of elements.
+        scores = score_similarities([text_of(old_candidates[i]) for i in pending], [text_of(new_candidates[j]) for j in columns])
+        scores = np.asarray(scores, dtype=float).reshape(len(pending), len(columns))
+
+        # Pairs outside an element's shortlist cannot be matched, whatever the model scored them.
+        ai_scores = np.full((len(pending), len(columns)), -np.inf)
+        for row, i in enumerate(pending):
+            shortlisted = [column_of[j] for j, _ in shortlists[i] if j not in taken]
+            ai_scores[row, shortlisted] = scores[row, shortlisted]
+        for row, column, _ in best_assignment(ai_scores, self.SEMANTIC_MATCH_THRESHOLD):
+            taken.add(columns[column])
+            matches[old_candidates[pending[row]].path] = (new_candidates[columns[column]], reason)
+        return matches
+
+    @staticmethod
+    def _match_equivalent(
+        old_candidates: List[RichCHTElement],
+        new_candidates: List[RichCHTElement],
+        equivalence_key: Callable[[RichCHTElement], Optional[str]],
+        reason: str
+    ) -> Dict[str, Tuple[RichCHTElement, str]]:
+        free_by_key: Dict[str, List[RichCHTElement]] = {}
+        for new_el in new_candidates:
+            key = equivalence_key(new_el)
+            if key is not None:
+                free_by_key.setdefault(key, []).append(new_el)
+
+        matches = {}
+        for old_el in old_candidates:
+            free = free_by_key.get(equivalence_key(old_el) or "")
+            if free:
+                matches[old_el.path] = (free.pop(0), reason)
+        return matches
@@ -1,4 +1,14 @@
 # This file contains shared utility functions for the application layer.
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Iterable, Iterator, List, Optional, TypeVar
+
+from application.dtos import ProgressEventDTO
+
+T = TypeVar("T")
 
 # A centralized dictionary for main BigQuery view name exceptions.
 _VIEW_NAME_EXCEPTIONS = {
@@ -37,6 +47,13 @@ _DB_DOC_GROUP_VIEW_NAME_EXCEPTIONS = {
 
 }
 
+def get_xlsform_directory(country_code: str) -> str:
+    """Gets the directory of the config repository holding a country's XLSForms."""
+    return "muso-mali/forms/app" if country_code.upper() == "MALI" else "muso-cdi/forms/app"
+
+def get_xlsform_path(country_code: str, form_id: str) -> str:
+    return f"{get_xlsform_directory(country_code)}/{form_id}.xlsx"
+
 def get_view_name(country_code: str, form_id: str) -> str:
     if not form_id: return ""
     country_exceptions = _VIEW_NAME_EXCEPTIONS.get(country_code.upper(), {})
@@ -55,3 +72,119 @@ def get_db_doc_group_view_name(form_id: str, group_name: str) -> str:
     if group_name in _DB_DOC_GROUP_VIEW_NAME_EXCEPTIONS:
         return _DB_DOC_GROUP_VIEW_NAME_EXCEPTIONS[group_name]
     return f"formview_{form_id}_{group_name}"
+
+async def gather_with_concurrency(limit: int, awaitables: Iterable[Awaitable[T]]) -> List[T]:
+    """Awaits the given awaitables concurrently, at most `limit` at a time, and returns their results in order."""
+    semaphore = asyncio.Semaphore(max(1, int(limit or 1)))
+
+    async def bounded(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(bounded(awaitable) for awaitable in awaitables)))
+
+def run_coroutine_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a coroutine to completion from synchronous code. When the calling thread already
+    runs an event loop (e.g. a notebook), the coroutine gets its own loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+class ProgressReporter:
+    """
+    Turns the milestones of a long-running operation into ProgressEventDTOs for a listener.
+    The ETA of a stage extrapolates the average time of the forms it has completed so far.
+    """
+
+    def __init__(self, listener: Optional[Callable[[ProgressEventDTO], None]] = None, clock: Callable[[], float] = time.monotonic):
+        self._listener = listener
+        self._clock = clock
+        self._started = self._stage_started = clock()
+        self._stage, self._done, self._total = "starting", 0, 0
+
+    def _emit(self, form_id: Optional[str] = None, form_result: Any = None, result: Any = None):
+        if self._listener is None:
+            return
+        now = self._clock()
+        eta = (now - self._stage_started) / self._done * (self._total - self._done) if self._done else None
+        self._listener(ProgressEventDTO(self._stage, self._done, self._total, now - self._started, eta, form_id, form_result, result))
+
+    def start_stage(self, stage: str, forms_total: int):
+        self._stage, self._done, self._total = stage, 0, forms_total
+        self._stage_started = self._clock()
+        self._emit()
+
+    def form_done(self, form_id: str, form_result: Any = None):
+        self._done += 1
+        self._emit(form_id, form_result)
+
+    async def track(self, form_id: str, awaitable: Awaitable[T], form_result: Optional[Callable[[T], Any]] = None) -> T:
+        """Awaits one form's work and reports it done, with the part of its outcome given by `form_result`."""
+        outcome = await awaitable
+        self.form_done(form_id, form_result(outcome) if form_result else None)
+        return outcome
+
+    def finish(self, result: Any):
+        self._stage = "done"
+        self._emit(result=result)
+
+async def stream_progress(run: Callable[[ProgressReporter], Awaitable[Any]]) -> AsyncIterator[ProgressEventDTO]:
+    """
+    Runs an operation that reports to a ProgressReporter and yields its events as they happen.
+    Errors of the operation are raised by the iteration, after the events that preceded them.
+    """
+    events: "asyncio.Queue[Optional[ProgressEventDTO]]" = asyncio.Queue()
+    task = asyncio.ensure_future(run(ProgressReporter(events.put_nowait)))
+    task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        task.result()
+    finally:
+        task.cancel()
+
+def iterate_sync(make_iterator: Callable[[], AsyncIterator[T]]) -> Iterator[T]:
+    """
+    Iterates an async iterator from synchronous code. It runs on its own event loop in a helper
+    thread and hands its items over as soon as they are produced. Closing the returned iterator
+    early cancels the async one.
+    """
+    handover: "queue.Queue" = queue.Queue()
+    finished = object()
+    stop = threading.Event()
+    running = {}
+
+    async def pump():
+        running["loop"], running["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        try:
+            async for item in make_iterator():
+                if stop.is_set():
+                    break
+                handover.put((item, None))
+        except Exception as e:
+            handover.put((finished, e))
+        else:
+            handover.put((finished, None))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(asyncio.run, pump())
+        try:
+            while True:
+                item, error = handover.get()
+                if item is finished:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            stop.set()
+            if not future.done() and "task" in running:
+                try:
+                    running["loop"].call_soon_threadsafe(running["task"].cancel)
+                except RuntimeError:
+                    pass # The loop closed in the meantime: the iterator is already finished.
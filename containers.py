@@ -1,13 +1,23 @@
 from dependency_injector import containers, providers
 
 from infrastructure.logging.cloud_run_logger import CloudRunLogger
+from infrastructure.http.pooled_http_client import PooledHttpClient
 from infrastructure.repositories.github_repository import GitHubRepository
+from infrastructure.repositories.cached_code_repository import CachedCodeRepository
 from infrastructure.repositories.github_actions_repository import GitHubActionsRepository
 from infrastructure.repositories.bigquery_repository import BigQueryRepository
 from infrastructure.repositories.cloud_function_xform_api_repository import CloudFunctionXFormApiRepository
 from infrastructure.repositories.http_cht_app_repository import HttpCHTAppRepository
-from infrastructure.repositories.vertex_ai_semantic_comparator import VertexAISemanticComparator
+from infrastructure.repositories.vertex_ai_semantic_comparator import VertexAISemanticComparator, AsyncVertexAISemanticComparator
+from infrastructure.repositories.json_enrichment_checkpoint_repository import JsonEnrichmentCheckpointRepository
+from infrastructure.repositories.json_audit_result_repository import JsonAuditResultRepository
+from infrastructure.repositories.json_catalog_store_repository import JsonCatalogStoreRepository
+from infrastructure.repositories.arrow_catalog_export_repository import ArrowCatalogExportRepository
+from infrastructure.http.request_rate_limiter import RequestRateLimiter, RetryPolicy
+from infrastructure.repositories.threaded_async_adapters import ThreadedAsyncCodeRepository, ThreadedAsyncDataWarehouseRepository, ThreadedAsyncCHTAppRepository
+from infrastructure.repositories.cached_semantic_comparator import SemanticResponseCache, CachedSemanticComparator, CachedAsyncSemanticComparator
 from infrastructure.repositories.pandas_xlsform_repository import PandasXLSFormRepository
+from infrastructure.repositories.openpyxl_xlsform_repository import OpenpyxlXLSFormRepository
 from infrastructure.repositories.pandas_rich_xlsform_repository import PandasRichXLSFormRepository
 from infrastructure.repositories.regex_sql_parser_repository import RegexSQLParserRepository
 from application.services.form_comparator_service_impl import FormComparatorServiceImpl
@@ -25,23 +35,58 @@ class Container(containers.DeclarativeContainer):
     form_context_config = providers.Configuration()
 
     logger = providers.Factory(CloudRunLogger)
-    code_repository = providers.Factory(GitHubRepository, owner=config.repositories.code_repository.args.owner, repo_name=config.repositories.code_repository.args.repo_name, logger=logger)
-    cicd_repository = providers.Factory(GitHubActionsRepository, owner=config.repositories.cicd_repository.args.owner, repo_name=config.repositories.cicd_repository.args.repo_name, logger=logger)
+    # A single pooled transport, so every HTTP-based repository shares keep-alive connections per host.
+    http_client = providers.Singleton(PooledHttpClient, logger=logger, connect_timeout_seconds=config.http_client.connect_timeout_seconds, read_timeout_seconds=config.http_client.read_timeout_seconds, pool_maxsize=config.http_client.pool_maxsize)
+    github_code_repository = providers.Factory(GitHubRepository, owner=config.repositories.code_repository.args.owner, repo_name=config.repositories.code_repository.args.repo_name, logger=logger, http_client=http_client)
+    code_repository = providers.Selector(
+        config.repositories.code_repository.implementation,
+        github=github_code_repository,
+        cached_github=providers.Factory(CachedCodeRepository, inner=github_code_repository, cache_dir=config.repositories.code_repository.cache.directory, max_size_mb=config.repositories.code_repository.cache.max_size_mb, offline=config.repositories.code_repository.cache.offline, logger=logger)
+    )
+    cicd_repository = providers.Factory(GitHubActionsRepository, owner=config.repositories.cicd_repository.args.owner, repo_name=config.repositories.cicd_repository.args.repo_name, logger=logger, http_client=http_client)
     data_warehouse_repository = providers.Factory(BigQueryRepository, logger=logger)
-    xform_api_repository = providers.Factory(CloudFunctionXFormApiRepository, logger=logger)
-    cht_app_repository = providers.Factory(HttpCHTAppRepository, logger=logger)
-    semantic_comparator_repository = providers.Factory(VertexAISemanticComparator, logger=logger)
-    xlsform_repository = providers.Factory(PandasXLSFormRepository)
+    xform_api_repository = providers.Factory(CloudFunctionXFormApiRepository, logger=logger, http_client=http_client)
+    cht_app_repository = providers.Factory(HttpCHTAppRepository, logger=logger, http_client=http_client)
+    # The bulk services run on the async contracts; synchronous repositories are driven from the default thread pool.
+    async_code_repository = providers.Factory(ThreadedAsyncCodeRepository, inner=code_repository)
+    async_data_warehouse_repository = providers.Factory(ThreadedAsyncDataWarehouseRepository, inner=data_warehouse_repository)
+    async_cht_app_repository = providers.Factory(ThreadedAsyncCHTAppRepository, inner=cht_app_repository)
+    # One response store for the synchronous and asynchronous comparators.
+    semantic_response_cache = providers.Singleton(SemanticResponseCache, path=config.repositories.semantic_comparator_repository.cache.path, ttl_seconds=config.repositories.semantic_comparator_repository.cache.ttl_seconds, max_entries=config.repositories.semantic_comparator_repository.cache.max_entries, logger=logger)
+    # One token bucket for every Vertex AI client, sized to the project's quota.
+    vertex_ai_rate_limiter = providers.Singleton(RequestRateLimiter, requests_per_minute=config.repositories.semantic_comparator_repository.args.requests_per_minute, burst=config.repositories.semantic_comparator_repository.args.burst)
+    vertex_ai_retry_policy = providers.Factory(RetryPolicy, max_attempts=config.repositories.semantic_comparator_repository.args.max_attempts, base_delay_seconds=config.repositories.semantic_comparator_repository.args.base_delay_seconds, max_delay_seconds=config.repositories.semantic_comparator_repository.args.max_delay_seconds)
+    vertex_ai_semantic_comparator = providers.Factory(VertexAISemanticComparator, logger=logger, rate_limiter=vertex_ai_rate_limiter, retry_policy=vertex_ai_retry_policy)
+    async_vertex_ai_semantic_comparator = providers.Factory(AsyncVertexAISemanticComparator, logger=logger, rate_limiter=vertex_ai_rate_limiter, retry_policy=vertex_ai_retry_policy)
+    semantic_comparator_repository = providers.Selector(
+        config.repositories.semantic_comparator_repository.implementation,
+        vertex_ai=vertex_ai_semantic_comparator,
+        cached_vertex_ai=providers.Factory(CachedSemanticComparator, inner=vertex_ai_semantic_comparator, cache=semantic_response_cache)
+    )
+    async_semantic_comparator_repository = providers.Selector(
+        config.repositories.semantic_comparator_repository.implementation,
+        vertex_ai=async_vertex_ai_semantic_comparator,
+        cached_vertex_ai=providers.Factory(CachedAsyncSemanticComparator, inner=async_vertex_ai_semantic_comparator, cache=semantic_response_cache)
+    )
+    xlsform_repository = providers.Selector(
+        config.repositories.xlsform_repository.implementation,
+        pandas=providers.Factory(PandasXLSFormRepository),
+        openpyxl=providers.Factory(OpenpyxlXLSFormRepository)
+    )
     rich_xlsform_repository = providers.Factory(PandasRichXLSFormRepository)
     sql_parser_repository = providers.Factory(RegexSQLParserRepository)
 
     cht_path_interpreter = providers.Factory(CHTPathInterpreter)
 
     form_comparator_service = providers.Factory(FormComparatorServiceImpl, xlsform_repository=xlsform_repository, dw_repository=data_warehouse_repository)
-    xlsform_comparator_service = providers.Factory(XLSFormComparatorServiceImpl, xlsform_repo=rich_xlsform_repository, semantic_repo=semantic_comparator_repository)
-    bulk_audit_service = providers.Factory(BulkAuditServiceImpl, cht_app_repo=cht_app_repository, code_repo=code_repository, dw_repo=data_warehouse_repository, xlsform_repo=xlsform_repository, logger=logger)
-    data_catalog_service = providers.Factory(DataCatalogServiceImpl, cht_app_repo=cht_app_repository, code_repo=code_repository, dw_repo=data_warehouse_repository, xlsform_repo=rich_xlsform_repository, sql_parser_repo=sql_parser_repository, logger=logger)
-    data_catalog_enrichment_service = providers.Factory(DataCatalogEnrichmentServiceImpl, semantic_repo=semantic_comparator_repository, code_repo=code_repository, xlsform_repo=rich_xlsform_repository, path_interpreter_factory=cht_path_interpreter.provider, form_context_config=form_context_config, logger=logger)
+    xlsform_comparator_service = providers.Factory(XLSFormComparatorServiceImpl, xlsform_repo=rich_xlsform_repository, semantic_repo=semantic_comparator_repository, lexical_top_k=config.services.xlsform_comparator_service.args.lexical_top_k, lexical_accept_threshold=config.services.xlsform_comparator_service.args.lexical_accept_threshold)
+    audit_result_repository = providers.Factory(JsonAuditResultRepository, directory=config.repositories.audit_result_repository.directory, logger=logger)
+    bulk_audit_service = providers.Factory(BulkAuditServiceImpl, async_cht_app_repo=async_cht_app_repository, async_code_repo=async_code_repository, async_dw_repo=async_data_warehouse_repository, xlsform_repo=xlsform_repository, logger=logger, max_workers=config.services.bulk_audit_service.args.max_workers, parse_in_processes=config.services.bulk_audit_service.args.parse_in_processes, audit_result_repo=audit_result_repository)
+    catalog_export_repository = providers.Factory(ArrowCatalogExportRepository, batch_size=config.repositories.catalog_export_repository.args.batch_size)
+    catalog_store_repository = providers.Factory(JsonCatalogStoreRepository, directory=config.repositories.catalog_store_repository.directory, logger=logger)
+    data_catalog_service = providers.Factory(DataCatalogServiceImpl, async_cht_app_repo=async_cht_app_repository, async_code_repo=async_code_repository, async_dw_repo=async_data_warehouse_repository, xlsform_repo=rich_xlsform_repository, sql_parser_repo=sql_parser_repository, logger=logger, max_workers=config.services.data_catalog_service.args.max_workers, catalog_store_repo=catalog_store_repository)
+    enrichment_checkpoint_repository = providers.Factory(JsonEnrichmentCheckpointRepository, directory=config.repositories.enrichment_checkpoint_repository.directory, logger=logger)
+    data_catalog_enrichment_service = providers.Factory(DataCatalogEnrichmentServiceImpl, async_semantic_repo=async_semantic_comparator_repository, async_code_repo=async_code_repository, xlsform_repo=rich_xlsform_repository, path_interpreter_factory=cht_path_interpreter.provider, form_context_config=form_context_config, logger=logger, max_workers=config.services.data_catalog_enrichment_service.args.max_workers, checkpoint_repo=enrichment_checkpoint_repository)
 
     build_ui = providers.Selector(
         config.ui.interface,
@@ -55,7 +100,8 @@ class Container(containers.DeclarativeContainer):
             code_repository=code_repository,
             cicd_repository=cicd_repository,
             data_warehouse_repository=data_warehouse_repository,
-            xform_api_repository=xform_api_repository
+            xform_api_repository=xform_api_repository,
+            catalog_export_repository=catalog_export_repository
         ),
         pyqt=providers.Callable(
             build_pyqt_ui,
@@ -77,6 +123,7 @@ class Container(containers.DeclarativeContainer):
             code_repository=code_repository,
             cicd_repository=cicd_repository,
             data_warehouse_repository=data_warehouse_repository,
-            xform_api_repository=xform_api_repository
+            xform_api_repository=xform_api_repository,
+            catalog_export_repository=catalog_export_repository
         )
     )
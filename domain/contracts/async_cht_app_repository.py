@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+class AsyncCHTAppRepository(ABC):
+    """
+    Asynchronous counterpart of CHTAppRepository. Methods have the same arguments,
+    results and errors as their synchronous versions.
+    """
+
+    @abstractmethod
+    async def get_installed_xform_ids(self, country_code: str) -> List[str]:
+        """Retrieves the installed XForm IDs. See CHTAppRepository.get_installed_xform_ids."""
+        pass
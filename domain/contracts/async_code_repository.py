@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Mapping
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import CommitDTO
+
+class AsyncCodeRepository(ABC):
+    """
+    Asynchronous counterpart of CodeRepository, for services that fan out many downloads
+    on one event loop. Methods have the same arguments, results and errors as their
+    synchronous versions.
+    """
+
+    @abstractmethod
+    async def download_file(self, branch: str, file_path: str) -> bytes:
+        """Downloads a single file. See CodeRepository.download_file."""
+        pass
+
+    @abstractmethod
+    async def download_directory(self, branch: str, directory: str) -> Mapping[str, bytes]:
+        """Downloads every file of a directory in bulk. See CodeRepository.download_directory."""
+        pass
+
+    @abstractmethod
+    async def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        """Lists the files of a directory with their git blob SHA. See CodeRepository.list_directory."""
+        pass
+
+    @abstractmethod
+    async def get_file_history(self, branch: str, file_path: str) -> List[CommitDTO]:
+        """Retrieves the commit history of a file. See CodeRepository.get_file_history."""
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+class AsyncDataWarehouseRepository(ABC):
+    """
+    Asynchronous counterpart of DataWarehouseRepository. Methods have the same arguments,
+    results and errors as their synchronous versions.
+    """
+
+    @abstractmethod
+    async def get_view_query(self, project_id: str, dataset_id: str, view_id: str) -> str:
+        """Retrieves the SQL query of a view. See DataWarehouseRepository.get_view_query."""
+        pass
+
+    @abstractmethod
+    async def load_view_queries(self, project_id: str, dataset_id: str) -> Dict[str, str]:
+        """Retrieves the SQL query of every view of a dataset. See DataWarehouseRepository.load_view_queries."""
+        pass
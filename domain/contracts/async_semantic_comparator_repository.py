@@ -0,0 +1,53 @@
+import asyncio
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Union
+
+def _flag_score(flag: Union[bool, BaseException]) -> float:
+    # A pair whose call failed is unscored (NaN), not dissimilar.
+    return math.nan if isinstance(flag, BaseException) else (1.0 if flag else 0.0)
+
+class AsyncSemanticComparatorRepository(ABC):
+    """
+    Asynchronous counterpart of SemanticComparatorRepository, so that many model calls
+    can be awaited concurrently. Methods have the same arguments and results as their
+    synchronous versions.
+    """
+
+    @abstractmethod
+    async def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        """See SemanticComparatorRepository.are_titles_semantically_similar."""
+        pass
+
+    @abstractmethod
+    async def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        """See SemanticComparatorRepository.are_formulas_semantically_similar."""
+        pass
+
+    @abstractmethod
+    async def generate_descriptions_from_formula(
+        self,
+        formula: str,
+        context_description: Optional[str] = None
+    ) -> Dict[str, str]:
+        """See SemanticComparatorRepository.generate_descriptions_from_formula."""
+        pass
+
+    @abstractmethod
+    async def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        """See SemanticComparatorRepository.get_formula_description_with_context."""
+        pass
+
+    async def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        """See SemanticComparatorRepository.get_formula_descriptions_with_context. By default formulas are described one after the other."""
+        return [await self.get_formula_description_with_context(formula, form_context) for formula in formulas]
+
+    async def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        """See SemanticComparatorRepository.score_title_similarities. By default every pair is awaited concurrently."""
+        flags = await asyncio.gather(*(self.are_titles_semantically_similar(title1, title2) for title1 in titles1 for title2 in titles2), return_exceptions=True)
+        return [[_flag_score(flag) for flag in flags[i * len(titles2):(i + 1) * len(titles2)]] for i in range(len(titles1))]
+
+    async def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        """See SemanticComparatorRepository.score_formula_similarities. By default every pair is awaited concurrently."""
+        flags = await asyncio.gather(*(self.are_formulas_semantically_similar(formula1, formula2) for formula1 in formulas1 for formula2 in formulas2), return_exceptions=True)
+        return [[_flag_score(flag) for flag in flags[i * len(formulas2):(i + 1) * len(formulas2)]] for i in range(len(formulas1))]
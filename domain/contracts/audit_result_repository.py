@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import FormAuditRecordDTO
+
+class AuditResultRepository(ABC):
+    """
+    Defines the contract for a persistent store of per-form bulk audit results, so that
+    an incremental audit only re-audits the forms whose XLSForm or views changed.
+    """
+
+    @abstractmethod
+    def load_records(self, country_code: str) -> Dict[str, FormAuditRecordDTO]:
+        """
+        Returns the stored audit records of a country.
+
+        Args:
+            country_code (str): The audited country ('MALI' or 'RCI').
+
+        Returns:
+            Dict[str, FormAuditRecordDTO]: The records by form ID; empty when nothing is stored.
+        """
+        pass
+
+    @abstractmethod
+    def save_records(self, country_code: str, records: Dict[str, FormAuditRecordDTO]):
+        """
+        Replaces the stored audit records of a country.
+
+        Args:
+            country_code (str): The audited country.
+            records (Dict[str, FormAuditRecordDTO]): The records by form ID.
+        """
+        pass
@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterable, Union
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import DataCatalogRowDTO
+
+class CatalogExportRepository(ABC):
+    """
+    Defines the contract for writing a data catalog to a file in a tabular format.
+    """
+
+    FORMATS = ("parquet", "feather", "csv")
+
+    @abstractmethod
+    def export(self, rows: Iterable[DataCatalogRowDTO], destination: Union[str, BinaryIO], file_format: str = "parquet"):
+        """
+        Writes catalog rows to a file. Rows are consumed and written in batches, so the
+        whole catalog is never held in memory in the output format.
+
+        Args:
+            rows (Iterable[DataCatalogRowDTO]): The catalog rows, in output order.
+            destination (Union[str, BinaryIO]): A file path, or a writable binary file object.
+            file_format (str): One of 'parquet', 'feather' or 'csv'.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        pass
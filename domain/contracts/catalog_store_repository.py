@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import CatalogFormRecordDTO
+
+class CatalogStoreRepository(ABC):
+    """
+    Defines the contract for a persistent store of data catalog rows, keyed by country, form
+    and column, so that regenerating a catalog only rebuilds the forms whose XLSForm or view
+    changed and keeps the descriptions enriched on the others.
+    """
+
+    @abstractmethod
+    def load_forms(self, country_code: str) -> Dict[str, CatalogFormRecordDTO]:
+        """
+        Returns the stored catalog of a country.
+
+        Args:
+            country_code (str): The country code (e.g., 'MALI', 'RCI').
+
+        Returns:
+            Dict[str, CatalogFormRecordDTO]: The records by form ID; empty when nothing is stored.
+        """
+        pass
+
+    @abstractmethod
+    def save_forms(self, country_code: str, records: Dict[str, CatalogFormRecordDTO]):
+        """
+        Replaces the stored catalog of a country.
+
+        Args:
+            country_code (str): The country code.
+            records (Dict[str, CatalogFormRecordDTO]): The records by form ID.
+        """
+        pass
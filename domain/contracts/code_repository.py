@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Mapping
 
 # Add the project root to the Python path to allow for absolute imports from the application layer
 import sys
@@ -32,6 +32,43 @@ class CodeRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def download_directory(self, branch: str, directory: str) -> Mapping[str, bytes]:
+        """
+        Downloads every file of a directory from a specific branch in a single bulk operation.
+
+        Args:
+            branch (str): The name of the branch from which to download the files (e.g., 'main').
+            directory (str): The path of the directory within the repository.
+
+        Returns:
+            Mapping[str, bytes]: A lazy mapping of full file path to raw content. The file
+                                 contents are only fetched when a value is first accessed.
+
+        Raises:
+            FileNotFoundError: If the directory does not exist in the specified branch.
+            Exception: For other download-related errors.
+        """
+        pass
+
+    @abstractmethod
+    def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        """
+        Lists the files of a directory on a specific branch, with their git blob SHA.
+
+        Args:
+            branch (str): The name of the branch to list (e.g., 'main').
+            directory (str): The path of the directory within the repository.
+
+        Returns:
+            Dict[str, str]: A mapping of full file path to git blob SHA.
+
+        Raises:
+            FileNotFoundError: If the directory does not exist in the specified branch.
+            Exception: For other API-related errors.
+        """
+        pass
+
     @abstractmethod
     def get_file_history(self, branch: str, file_path: str) -> List[CommitDTO]:
         """
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Dict
 
 class DataWarehouseRepository(ABC):
     """
@@ -25,3 +26,23 @@ class DataWarehouseRepository(ABC):
             Exception: For other API-related errors (e.g., permissions, network).
         """
         pass
+
+    @abstractmethod
+    def load_view_queries(self, project_id: str, dataset_id: str) -> Dict[str, str]:
+        """
+        Retrieves the SQL query of every view of a dataset in a single call.
+        Once a dataset is loaded, `get_view_query` is served from this in-memory index.
+        Each call queries the dataset again and replaces the index.
+
+        Args:
+            project_id (str): The ID of the project containing the dataset.
+            dataset_id (str): The ID of the dataset.
+
+        Returns:
+            Dict[str, str]: A mapping of view ID to the SQL query that defines the view.
+
+        Raises:
+            FileNotFoundError: If the specified dataset does not exist.
+            Exception: For other API-related errors (e.g., permissions, network).
+        """
+        pass
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+class EnrichmentCheckpointRepository(ABC):
+    """
+    Defines the contract for a persistent store of the descriptions an enrichment run has
+    already produced, so that an interrupted run can resume without describing them again.
+    """
+
+    @abstractmethod
+    def load(self, run_key: str) -> Dict[str, Dict[str, str]]:
+        """
+        Returns the descriptions saved for a run.
+
+        Args:
+            run_key (str): Identifies the run (e.g. its country, mode and form filter).
+
+        Returns:
+            Dict[str, Dict[str, str]]: The {"fr", "en", "bm"} descriptions by row key; empty when there is no checkpoint.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, run_key: str, descriptions: Dict[str, Dict[str, str]]):
+        """
+        Adds descriptions to the checkpoint of a run, keeping the ones already saved.
+
+        Args:
+            run_key (str): Identifies the run.
+            descriptions (Dict[str, Dict[str, str]]): The {"fr", "en", "bm"} descriptions by row key.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self, run_key: str):
+        """Deletes the checkpoint of a run once it has completed."""
+        pass
@@ -25,3 +25,19 @@ class RichXLSFormRepository(ABC):
             List[RichCHTElement]: A list of rich element objects.
         """
         pass
+
+    @abstractmethod
+    def get_formula_context_as_markdown(self, file_content: bytes, formulas: List[str]) -> str:
+        """
+        Renders the part of the 'survey' sheet needed to explain the given formulas as a
+        Markdown table, for use as the form context of an AI description prompt.
+
+        Args:
+            file_content (bytes): The binary content of the .xlsx file.
+            formulas (List[str]): The calculation formulas to be described.
+
+        Returns:
+            str: The rows holding the formulas and every row they reference, transitively,
+                 as a Markdown table. The whole sheet when none of the formulas is found.
+        """
+        pass
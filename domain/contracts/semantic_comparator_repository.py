@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+import math
+from typing import Callable, Dict, List, Optional
+
+def _flag_score(is_similar: Callable[[str, str], bool], item1: str, item2: str) -> float:
+    try:
+        return 1.0 if is_similar(item1, item2) else 0.0
+    except Exception:
+        return math.nan
 
 class SemanticComparatorRepository(ABC):
     """
@@ -18,6 +25,9 @@ class SemanticComparatorRepository(ABC):
 
         Returns:
             bool: True if the titles are semantically similar, False otherwise.
+
+        Raises:
+            Exception: If the model could not answer, so that a failure is not mistaken for a 'no'.
         """
         pass
 
@@ -32,6 +42,9 @@ class SemanticComparatorRepository(ABC):
 
         Returns:
             bool: True if the formulas are semantically similar, False otherwise.
+
+        Raises:
+            Exception: If the model could not answer, so that a failure is not mistaken for a 'no'.
         """
         pass
 
@@ -54,3 +67,67 @@ class SemanticComparatorRepository(ABC):
                             with keys 'fr', 'en', and 'bm'.
         """
         pass
+
+    def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        """
+        Generates multilingual descriptions for a formula, using the whole form as context.
+        Implementations that can make use of the form context should override this; by
+        default the formula is described on its own.
+
+        Args:
+            formula (str): The ODK calculation formula.
+            form_context (str): The form's 'survey' sheet rendered as Markdown.
+
+        Returns:
+            Dict[str, str]: The descriptions with keys 'fr', 'en', and 'bm'.
+        """
+        return self.generate_descriptions_from_formula(formula)
+
+    def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        """
+        Generates the descriptions of several formulas of the same form, sharing one form
+        context, so that implementations can send the context once per batch instead of
+        once per formula. By default each formula goes through
+        `get_formula_description_with_context`.
+
+        Args:
+            formulas (List[str]): The ODK calculation formulas of the form.
+            form_context (str): The form's 'survey' sheet rendered as Markdown.
+
+        Returns:
+            List[Dict[str, str]]: The descriptions of each formula, in the same order, with
+                                  keys 'fr', 'en', and 'bm'.
+        """
+        return [self.get_formula_description_with_context(formula, form_context) for formula in formulas]
+
+    def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        """
+        Scores every pair of titles of two candidate sets at once, so that implementations
+        can batch the comparisons instead of issuing one request per pair. By default each
+        pair goes through `are_titles_semantically_similar`.
+
+        Args:
+            titles1 (List[str]): The titles of the first set (e.g. the old form).
+            titles2 (List[str]): The titles of the second set (e.g. the new form).
+
+        Returns:
+            List[List[float]]: A len(titles1) x len(titles2) matrix of similarity scores
+                               between 0.0 (unrelated) and 1.0 (same concept), NaN for the
+                               pairs the model could not score.
+        """
+        return [[_flag_score(self.are_titles_semantically_similar, title1, title2) for title2 in titles2] for title1 in titles1]
+
+    def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        """
+        Scores every pair of calculation formulas of two candidate sets at once. By default
+        each pair goes through `are_formulas_semantically_similar`.
+
+        Args:
+            formulas1 (List[str]): The formulas of the first set.
+            formulas2 (List[str]): The formulas of the second set.
+
+        Returns:
+            List[List[float]]: A len(formulas1) x len(formulas2) matrix of similarity scores
+                               between 0.0 and 1.0, NaN for the pairs the model could not score.
+        """
+        return [[_flag_score(self.are_formulas_semantically_similar, formula1, formula2) for formula2 in formulas2] for formula1 in formulas1]
@@ -0,0 +1,87 @@
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+def _minimum_cost_columns(cost: np.ndarray) -> np.ndarray:
+    """
+    Solves the rectangular assignment problem (rows <= columns) with the Hungarian
+    algorithm in its shortest augmenting path form (Jonker-Volgenant potentials).
+    Every row gets a distinct column; the column scan of each step is vectorized.
+
+    Returns:
+        np.ndarray: The column assigned to each row.
+    """
+    rows, columns = cost.shape
+    # Index 0 is a virtual column; potentials and matches of real rows/columns start at 1.
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    row_of_column = np.zeros(columns + 1, dtype=int)
+    previous_column = np.zeros(columns + 1, dtype=int)
+
+    for row in range(1, rows + 1):
+        row_of_column[0] = row
+        current_column = 0
+        min_reduced = np.full(columns + 1, np.inf)
+        visited = np.zeros(columns + 1, dtype=bool)
+        while True:
+            visited[current_column] = True
+            current_row = row_of_column[current_column]
+            free = ~visited[1:]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            improved = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            previous_column[1:][improved] = current_column
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+
+            u[row_of_column[visited]] += delta
+            v[visited] -= delta
+            min_reduced[~visited] -= delta
+
+            current_column = next_column
+            if row_of_column[current_column] == 0:
+                break
+
+        # Augment along the alternating path back to the virtual column.
+        while current_column:
+            column = previous_column[current_column]
+            row_of_column[current_column] = row_of_column[column]
+            current_column = column
+
+    assignment = np.full(rows, -1, dtype=int)
+    matched = np.nonzero(row_of_column[1:])[0]
+    assignment[row_of_column[1:][matched] - 1] = matched
+    return assignment
+
+def best_assignment(scores: Union[np.ndarray, Sequence[Sequence[float]]], threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    Pairs rows with columns so that the total score of the pairs is maximal, each row and
+    column being used at most once. Only pairs scoring at least `threshold` may be made;
+    NaN and -inf mark pairs that are not allowed.
+
+    Unlike a greedy pass, the result does not depend on the order rows are visited in, and an
+    early weak pair never takes the partner a later row matches better.
+
+    Returns:
+        List[Tuple[int, int, float]]: (row, column, score) of every pair, by row.
+    """
+    matrix = np.asarray(scores, dtype=float)
+    if matrix.ndim != 2 or matrix.size == 0:
+        return []
+    allowed = np.isfinite(matrix) & (matrix >= threshold)
+    if not allowed.any():
+        return []
+
+    # Disallowed pairs cost nothing, so taking one is the same as leaving the row unmatched.
+    cost = np.where(allowed, -matrix, 0.0)
+    transposed = cost.shape[0] > cost.shape[1]
+    columns = _minimum_cost_columns(cost.T if transposed else cost)
+
+    pairs = [(column, index) if transposed else (index, column) for index, column in enumerate(columns.tolist()) if column >= 0]
+    return sorted((row, column, float(matrix[row, column])) for row, column in pairs if allowed[row, column])
@@ -0,0 +1,74 @@
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Set
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# The survey columns whose expressions can reference other fields with ${name}.
+REFERENCE_COLUMNS = ('calculation', 'relevant', 'constraint', 'choice_filter')
+
+_VARIABLE_REFERENCE = re.compile(r"\$\{\s*([^}\s]+)\s*\}")
+
+def referenced_names(expression: str) -> List[str]:
+    """The distinct field names an XLSForm expression references with ${name}, in order of appearance."""
+    return list(dict.fromkeys(_VARIABLE_REFERENCE.findall(expression or "")))
+
+class FormulaDependencyGraph:
+    """
+    A domain service that links the rows of a form's 'survey' sheet through the ${name}
+    references of their calculation, relevant, constraint and choice_filter expressions.
+
+    It answers which rows a formula depends on, directly or transitively, so that only
+    those rows need to be described to a model explaining the formula.
+    """
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]]):
+        """
+        Args:
+            rows (Sequence[Mapping[str, Any]]): The survey rows in sheet order, as column -> cell mappings.
+        """
+        self._rows_by_name: Dict[str, List[int]] = {}
+        self._rows_by_calculation: Dict[str, List[int]] = {}
+        self._dependencies: Dict[str, Set[str]] = {}
+
+        for index, row in enumerate(rows):
+            name = str(row.get('name') or '').strip()
+            calculation = str(row.get('calculation') or '').strip()
+            if calculation:
+                self._rows_by_calculation.setdefault(calculation, []).append(index)
+            if not name:
+                continue
+            self._rows_by_name.setdefault(name, []).append(index)
+            dependencies = self._dependencies.setdefault(name, set())
+            for column in REFERENCE_COLUMNS:
+                dependencies.update(referenced_names(str(row.get(column) or '')))
+
+    def dependencies(self, name: str) -> Set[str]:
+        """The names the row called `name` references directly."""
+        return set(self._dependencies.get(name, ()))
+
+    def closure(self, expression: str) -> Set[str]:
+        """Every name the expression references, directly or through the rows it references (cycles are tolerated)."""
+        seen: Set[str] = set()
+        pending = referenced_names(expression)
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            pending.extend(self._dependencies.get(name, ()))
+        return seen
+
+    def context_rows(self, formulas: Iterable[str]) -> List[int]:
+        """
+        The indexes, in sheet order, of the rows needed to explain the formulas: the rows
+        holding each formula and the rows of every name in its closure. Names that are not
+        in the sheet are ignored.
+        """
+        indexes: Set[int] = set()
+        for formula in formulas:
+            indexes.update(self._rows_by_calculation.get((formula or '').strip(), ()))
+            for name in self.closure(formula):
+                indexes.update(self._rows_by_name.get(name, ()))
+        return sorted(indexes)
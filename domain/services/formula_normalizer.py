@@ -0,0 +1,35 @@
+import re
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+_FORMULA_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>'[^']*'?|"[^"]*"?)
+  | (?P<reference>\$\{\s*[^}]*?\s*\})
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<name>[A-Za-z_][\w.\-]*(?::[A-Za-z_][\w.\-]*)?)
+  | (?P<operator>!=|<=|>=|\.\.|//|.)
+""", re.VERBOSE | re.DOTALL)
+
+def normalize_formula(formula: str) -> str:
+    """
+    Returns the canonical text of an XLSForm formula, so that formulas differing only in
+    layout share one key: tokens are separated by single spaces, ${ name } references lose
+    their inner spaces and string literals use single quotes unless they contain one.
+
+    Field references keep their names, since a formula's meaning depends on the fields it reads.
+    """
+    tokens = []
+    for match in _FORMULA_TOKEN.finditer(formula or ""):
+        kind, text = match.lastgroup, match.group()
+        if kind == 'space':
+            continue
+        if kind == 'string':
+            body = text[1:-1] if len(text) > 1 and text[-1] == text[0] else text[1:]
+            text = f'"{body}"' if "'" in body else f"'{body}'"
+        elif kind == 'reference':
+            text = "${" + text[2:-1].strip() + "}"
+        tokens.append(text)
+    return " ".join(tokens)
@@ -0,0 +1,83 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.entities.RichCHTElement import RichCHTElement
+
+_VARIABLE_REFERENCE = re.compile(r"\$\{([^}]*)\}")
+_WORD = re.compile(r"\w+")
+
+def normalize_text(text: str) -> str:
+    """Lower-cases the text, strips accents and rewrites ${name} references as plain names."""
+    text = _VARIABLE_REFERENCE.sub(r" \1 ", text or "")
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+def element_text(element: RichCHTElement) -> str:
+    """The text an element is matched on: its titles (fr/en/bm), its name and its calculation."""
+    parts = [element.titles.get(lang) or "" for lang in ("fr", "en", "bm")]
+    parts += [element.question_name or "", element.calculation or ""]
+    return " ".join(part for part in parts if part and part != "nan")
+
+def character_ngrams(text: str, n: int = 3) -> Counter:
+    """Counts the character n-grams of every word of the normalized text, each word padded with spaces."""
+    ngrams = Counter()
+    for word in _WORD.findall(normalize_text(text)):
+        padded = f" {word} "
+        ngrams.update(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return ngrams
+
+class LexicalCandidateIndex:
+    """
+    A domain service that ranks a set of candidate elements by their lexical similarity
+    to a query element, before any AI model is involved.
+
+    Each candidate is represented by the character trigrams of its titles, name and
+    normalized calculation, weighted by TF-IDF over the candidate set and L2-normalized.
+    An inverted index from trigram to candidates means a query only visits the candidates
+    it shares at least one trigram with; the score is their cosine similarity (0.0 to 1.0).
+    """
+
+    def __init__(self, candidates: Sequence[RichCHTElement], n: int = 3):
+        self._n = n
+        self.candidates: List[RichCHTElement] = list(candidates)
+        counts = [character_ngrams(element_text(element), n) for element in self.candidates]
+
+        document_frequency = Counter(ngram for ngram_counts in counts for ngram in ngram_counts)
+        self._idf: Dict[str, float] = {
+            ngram: math.log((1 + len(counts)) / (1 + df)) + 1 for ngram, df in document_frequency.items()
+        }
+        self._unseen_idf = math.log(1 + len(counts)) + 1
+
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, ngram_counts in enumerate(counts):
+            for ngram, weight in self._weigh(ngram_counts).items():
+                self._postings.setdefault(ngram, []).append((index, weight))
+
+    def _weigh(self, ngram_counts: Counter) -> Dict[str, float]:
+        weights = {ngram: count * self._idf.get(ngram, self._unseen_idf) for ngram, count in ngram_counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {ngram: weight / norm for ngram, weight in weights.items()} if norm else {}
+
+    def scores(self, element: RichCHTElement) -> Dict[int, float]:
+        """The cosine similarity of the element to every candidate sharing a trigram with it, by candidate index."""
+        scores: Dict[int, float] = {}
+        for ngram, weight in self._weigh(character_ngrams(element_text(element), self._n)).items():
+            for index, candidate_weight in self._postings.get(ngram, ()):
+                scores[index] = scores.get(index, 0.0) + weight * candidate_weight
+        return scores
+
+    def top_candidates(self, element: RichCHTElement, k: int) -> List[Tuple[int, float]]:
+        """
+        The k best candidates for the element, as (candidate index, score) pairs sorted by
+        decreasing score (ties keep the candidate order). Candidates with nothing in common
+        with the element are never returned.
+        """
+        ranked = sorted(self.scores(element).items(), key=lambda item: (-item[1], item[0]))
+        return [(index, min(score, 1.0)) for index, score in ranked[:max(k, 0)] if score > 0]
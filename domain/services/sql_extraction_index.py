@@ -0,0 +1,200 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+class SQLToken(NamedTuple):
+    kind: str  # 'ident', 'string', 'number', 'quoted_ident' or 'punct'
+    value: str
+    line: int
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<comment>(?:--|\#)[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>(?P<prefix>[rRbB]{0,2})(?P<body>'''.*?(?:'''|\Z)|\"\"\".*?(?:\"\"\"|\Z)|'(?:\\.|[^'\\\n])*'?|"(?:\\.|[^"\\\n])*"?))
+  | (?P<quoted_ident>`[^`]*`?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"', '`': '`'}
+
+def _decode_string(prefix: str, body: str) -> str:
+    quote_length = 3 if body[:3] in ("'''", '"""') else 1
+    content = body[quote_length:]
+    if content.endswith(body[:quote_length]):
+        content = content[:-quote_length]
+    if 'r' in prefix.lower():
+        return content
+    return re.sub(r"\\(.)", lambda match: _ESCAPES.get(match.group(1), match.group(1)), content, flags=re.DOTALL)
+
+def tokenize_sql(sql_content: str) -> List[SQLToken]:
+    """Splits BigQuery SQL into tokens in a single pass, dropping whitespace and comments."""
+    tokens, line = [], 1
+    for match in _TOKEN_PATTERN.finditer(sql_content):
+        kind, text = match.lastgroup, match.group()
+        if kind == 'newline':
+            line += 1
+            continue
+        if kind == 'string':
+            tokens.append(SQLToken('string', _decode_string(match.group('prefix'), match.group('body')), line))
+        elif kind not in ('space', 'comment'):
+            tokens.append(SQLToken(kind, text, line))
+        line += text.count('\n') if kind in ('comment', 'string') else 0
+    return tokens
+
+@dataclass(frozen=True)
+class JsonPathReference:
+    """A JSON path literal found in a view's SQL, with the context it is used in."""
+    json_path: str
+    line: int
+    function: Optional[str] = None  # Upper-cased function that takes the path as its second argument.
+    source: Optional[str] = None  # First argument of that function, e.g. 'f.doc' or 'item'.
+    cast_type: Optional[str] = None  # Target type of an enclosing CAST/SAFE_CAST.
+    alias: Optional[str] = None  # Column alias given to the extraction.
+    in_unnest: bool = False  # Whether the extraction is the argument of UNNEST(...).
+
+@dataclass
+class _Frame:
+    function: Optional[str]
+    argument_index: int = 0
+    source_tokens: List[str] = field(default_factory=list)
+    references: List[int] = field(default_factory=list)  # Indexes of the references extracted by this call.
+    cast_references: List[int] = field(default_factory=list)  # Indexes of the references this CAST frame converts.
+
+_CAST_FUNCTIONS = {'CAST', 'SAFE_CAST'}
+
+class SQLExtractionIndex:
+    """
+    A domain service that tokenizes a view's SQL once and indexes every JSON path literal
+    it contains, with its enclosing function (JSON_VALUE, JSON_EXTRACT_SCALAR, JSON_EXTRACT_ARRAY, ...),
+    first argument, cast type, alias and line.
+
+    Presence checks compare whole literals, so `$.fields.a` is not reported present because
+    `$.fields.ab` is. Struct and UNNEST lookups stay case-insensitive.
+    """
+
+    def __init__(self, sql_content: str):
+        self.references: List[JsonPathReference] = self._analyze(tokenize_sql(sql_content))
+        self._by_path: Dict[str, List[JsonPathReference]] = {}
+        for reference in self.references:
+            self._by_path.setdefault(reference.json_path, []).append(reference)
+        self.struct_paths: FrozenSet[str] = frozenset(
+            ref.json_path.lower() for ref in self.references
+            if ref.function == 'JSON_EXTRACT_SCALAR' and (ref.source or '').lower() == 'item'
+        )
+        self.unnested_arrays: FrozenSet[str] = frozenset(
+            ref.json_path.lower() for ref in self.references if ref.function == 'JSON_EXTRACT_ARRAY' and ref.in_unnest
+        )
+
+    @staticmethod
+    def _analyze(tokens: List[SQLToken]) -> List[JsonPathReference]:
+        references: List[JsonPathReference] = []
+        stack: List[_Frame] = [_Frame(None)]
+
+        def follows_as(index: int) -> Optional[str]:
+            # Returns the identifier after "AS" at tokens[index], if any.
+            if index + 1 < len(tokens) and tokens[index].kind == 'ident' and tokens[index].value.upper() == 'AS':
+                target = tokens[index + 1]
+                if target.kind in ('ident', 'quoted_ident'):
+                    return target.value.strip('`')
+            return None
+
+        def update(reference_indexes: List[int], **changes):
+            for reference_index in reference_indexes:
+                references[reference_index] = replace(references[reference_index], **changes)
+
+        for i, token in enumerate(tokens):
+            frame = stack[-1]
+            if token.kind == 'punct' and token.value == '(':
+                previous = tokens[i - 1] if i else None
+                function = previous.value.upper() if previous is not None and previous.kind == 'ident' else None
+                stack.append(_Frame(function))
+                continue
+
+            if token.kind == 'punct' and token.value == ')':
+                if len(stack) == 1:
+                    continue
+                closed = stack.pop()
+                parent = stack[-1]
+                if closed.references:
+                    if parent.function in _CAST_FUNCTIONS and follows_as(i + 1):
+                        update(closed.references, cast_type=follows_as(i + 1).upper())
+                        parent.cast_references.extend(closed.references)
+                    else:
+                        alias = follows_as(i + 1)
+                        if alias:
+                            update(closed.references, alias=alias)
+                if closed.cast_references:
+                    alias = follows_as(i + 1)
+                    if alias:
+                        update(closed.cast_references, alias=alias)
+                continue
+
+            if token.kind == 'punct' and token.value == ',':
+                frame.argument_index += 1
+                continue
+
+            if frame.function is not None and frame.argument_index == 0:
+                frame.source_tokens.append(token.value)
+
+            if token.kind == 'string' and token.value.startswith('$'):
+                in_call = frame.function is not None and frame.argument_index == 1 and tokens[i - 1].kind == 'punct' and tokens[i - 1].value == ','
+                reference = JsonPathReference(
+                    json_path=token.value,
+                    line=token.line,
+                    function=frame.function if in_call else None,
+                    source=''.join(frame.source_tokens) if in_call else None,
+                    in_unnest=in_call and len(stack) > 1 and stack[-2].function == 'UNNEST'
+                )
+                references.append(reference)
+                if in_call:
+                    frame.references.append(len(references) - 1)
+
+        return references
+
+    def references_path(self, json_path: str) -> bool:
+        """Whether the SQL contains the exact JSON path literal."""
+        return json_path in self._by_path
+
+    def occurrences(self, json_path: str) -> List[JsonPathReference]:
+        """Every use of the exact JSON path literal, in source order."""
+        return self._by_path.get(json_path, [])
+
+    def occurrences_of(self, json_paths: Iterable[str]) -> Dict[str, List[JsonPathReference]]:
+        """Every use of each exact JSON path literal, looked up in the index; paths that do not occur are absent."""
+        return {json_path: self._by_path[json_path] for json_path in json_paths if json_path in self._by_path}
+
+    def is_extracted_in_struct(self, json_path: str) -> bool:
+        return json_path.lower() in self.struct_paths
+
+    def is_unnested(self, array_json_path: str) -> bool:
+        return array_json_path.lower() in self.unnested_arrays
+
+    def extracted_columns(self) -> List[JsonPathReference]:
+        """The scalar extractions (JSON_VALUE / JSON_EXTRACT_SCALAR) that are given a column alias."""
+        return [ref for ref in self.references if ref.function in ('JSON_VALUE', 'JSON_EXTRACT_SCALAR') and ref.alias]
+
+_CACHE_SIZE = 256
+_cache: "OrderedDict[str, SQLExtractionIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_sql_extraction_index(sql_content: str) -> SQLExtractionIndex:
+    """Returns the extraction index of the given SQL, built once per distinct SQL text (keyed by its hash)."""
+    sql_hash = hashlib.sha256(sql_content.encode('utf-8')).hexdigest()
+    with _cache_lock:
+        index = _cache.get(sql_hash)
+        if index is not None:
+            _cache.move_to_end(sql_hash)
+            return index
+
+    index = SQLExtractionIndex(sql_content)
+    with _cache_lock:
+        _cache[sql_hash] = index
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,249 @@
+import hashlib
+import re
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+class XPathSyntaxError(ValueError):
+    """Raised when a formula is not an ODK XPath expression this parser understands."""
+
+class XPathToken(NamedTuple):
+    kind: str  # 'number', 'string', 'reference', 'name', 'operator' or 'end'
+    value: str
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>'[^']*'|"[^"]*")
+  | (?P<reference>\$\{[^}]*\})
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<name>[A-Za-z_][\w.\-]*(?::[A-Za-z_][\w.\-]*|:\*)?)
+  | (?P<operator>!=|<=|>=|//|\.\.|::|[-+*=<>|/()\[\],.@])
+  | (?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+def tokenize_xpath(expression: str) -> List[XPathToken]:
+    """Splits an ODK XPath expression into tokens, dropping whitespace; the list ends with an 'end' token."""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(expression):
+        kind, text = match.lastgroup, match.group()
+        if kind == 'space':
+            continue
+        if kind == 'error':
+            raise XPathSyntaxError(f"Unexpected character {text!r} at offset {match.start()}.")
+        if kind == 'string':
+            text = text[1:-1]
+        elif kind == 'reference':
+            text = text[2:-1].strip()
+        tokens.append(XPathToken(kind, text))
+    tokens.append(XPathToken('end', ''))
+    return tokens
+
+# Left binding powers of the infix operators, loosest first. Path separators and predicates bind tightest.
+_BINARY_OPERATORS = {
+    'or': 10, 'and': 20,
+    '=': 30, '!=': 30,
+    '<': 40, '<=': 40, '>': 40, '>=': 40,
+    '+': 50, '-': 50,
+    '*': 60, 'div': 60, 'mod': 60,
+    '|': 80,
+}
+_KEYWORD_OPERATORS = {'or', 'and', 'div', 'mod'}
+_UNARY_MINUS_POWER = 70
+_PATH_POWER = 90
+_PREDICATE_POWER = 100
+
+class _PrattParser:
+    """
+    A Pratt (top-down operator precedence) parser for ODK XPath expressions.
+
+    Nodes are plain tuples: ('number', float), ('string', text), ('reference', name),
+    ('call', name, args), ('negate', operand), ('operator', op, (left, right)),
+    ('root',), ('step', axis, test, predicates), ('path', separator, base, step)
+    and ('filter', base, predicate).
+    """
+
+    def __init__(self, tokens: List[XPathToken]):
+        self._tokens = tokens
+        self._position = 0
+
+    def _peek(self, offset: int = 0) -> XPathToken:
+        return self._tokens[min(self._position + offset, len(self._tokens) - 1)]
+
+    def _next(self) -> XPathToken:
+        token = self._peek()
+        self._position += 1
+        return token
+
+    def _expect(self, value: str):
+        token = self._next()
+        if token.kind != 'operator' or token.value != value:
+            raise XPathSyntaxError(f"Expected {value!r} but found {token.value or 'the end of the formula'!r}.")
+
+    def parse(self) -> Tuple:
+        node = self._expression(0)
+        if self._peek().kind != 'end':
+            raise XPathSyntaxError(f"Unexpected {self._peek().value!r} after a complete expression.")
+        return node
+
+    def _expression(self, right_binding_power: int) -> Tuple:
+        left = self._prefix(self._next())
+        while self._infix_power(self._peek()) > right_binding_power:
+            left = self._infix(self._next(), left)
+        return left
+
+    @staticmethod
+    def _infix_power(token: XPathToken) -> int:
+        if token.kind == 'name' and token.value in _KEYWORD_OPERATORS:
+            return _BINARY_OPERATORS[token.value]
+        if token.kind != 'operator':
+            return 0
+        if token.value in ('/', '//'):
+            return _PATH_POWER
+        if token.value == '[':
+            return _PREDICATE_POWER
+        return _BINARY_OPERATORS.get(token.value, 0)
+
+    def _prefix(self, token: XPathToken) -> Tuple:
+        if token.kind == 'number':
+            return ('number', float(token.value))
+        if token.kind == 'string':
+            return ('string', token.value)
+        if token.kind == 'reference':
+            return ('reference', token.value)
+        if token.kind == 'operator' and token.value == '(':
+            node = self._expression(0)
+            self._expect(')')
+            return node
+        if token.kind == 'operator' and token.value == '-':
+            return ('negate', self._expression(_UNARY_MINUS_POWER))
+        if token.kind == 'name' and self._peek().value == '(' and self._peek().kind == 'operator':
+            return self._call(token.value)
+        if token.kind == 'operator' and token.value in ('/', '//'):
+            root = ('root',)
+            if not self._starts_step(self._peek()):
+                if token.value == '//':
+                    raise XPathSyntaxError("'//' must be followed by a location step.")
+                return root
+            return ('path', token.value, root, self._step(self._next()))
+        if self._starts_step(token):
+            return self._step(token)
+        raise XPathSyntaxError(f"Unexpected {token.value or 'end of the formula'!r}.")
+
+    def _infix(self, token: XPathToken, left: Tuple) -> Tuple:
+        if token.value in ('/', '//'):
+            return ('path', token.value, left, self._step(self._next()))
+        if token.value == '[':
+            predicate = self._expression(0)
+            self._expect(']')
+            return ('filter', left, predicate)
+        right = self._expression(_BINARY_OPERATORS[token.value])
+        return ('operator', token.value, (left, right))
+
+    def _call(self, name: str) -> Tuple:
+        self._expect('(')
+        args = []
+        if not (self._peek().kind == 'operator' and self._peek().value == ')'):
+            args.append(self._expression(0))
+            while self._peek().kind == 'operator' and self._peek().value == ',':
+                self._next()
+                args.append(self._expression(0))
+        self._expect(')')
+        return ('call', name, tuple(args))
+
+    @staticmethod
+    def _starts_step(token: XPathToken) -> bool:
+        return token.kind == 'name' or (token.kind == 'operator' and token.value in ('.', '..', '@', '*'))
+
+    def _step(self, token: XPathToken) -> Tuple:
+        if token.kind == 'operator' and token.value in ('.', '..'):
+            return ('step', 'self' if token.value == '.' else 'parent', 'node()', ())
+        axis = 'child'
+        if token.kind == 'operator' and token.value == '@':
+            axis, token = 'attribute', self._next()
+        elif token.kind == 'name' and self._peek().value == '::':
+            self._next()
+            axis, token = token.value, self._next()
+        if token.kind != 'name' and token.value != '*':
+            raise XPathSyntaxError(f"Expected a node name but found {token.value or 'the end of the formula'!r}.")
+        test = token.value
+        if token.kind == 'name' and self._peek().value == '(' and self._peek().kind == 'operator':
+            self._expect('(')
+            self._expect(')')
+            test += '()'
+        predicates = []
+        while self._peek().kind == 'operator' and self._peek().value == '[':
+            self._next()
+            predicates.append(self._expression(0))
+            self._expect(']')
+        return ('step', axis, test, tuple(predicates))
+
+def parse_xpath(expression: str) -> Tuple:
+    """
+    Parses an ODK XPath expression (with ${name} references) into a tuple AST.
+
+    Raises:
+        XPathSyntaxError: If the expression cannot be parsed.
+    """
+    return _PrattParser(tokenize_xpath(expression)).parse()
+
+# Operators whose operands can be reordered, and those whose nested uses can be flattened into one list.
+_COMMUTATIVE = {'or', 'and', '=', '!=', '+', '*', '|'}
+_ASSOCIATIVE = {'or', 'and', '+', '*', '|'}
+# a > b is b < a.
+_MIRRORED = {'>': '<', '>=': '<='}
+
+def _canonical(node: Tuple) -> Tuple:
+    kind = node[0]
+    if kind == 'operator':
+        operator, operands = node[1], [_canonical(operand) for operand in node[2]]
+        if operator in _MIRRORED:
+            operator, operands = _MIRRORED[operator], operands[::-1]
+        if operator in _ASSOCIATIVE:
+            flattened = []
+            for operand in operands:
+                flattened.extend(operand[2] if operand[0] == 'operator' and operand[1] == operator else [operand])
+            operands = flattened
+        if operator in _COMMUTATIVE:
+            operands = sorted(operands, key=repr)
+        return ('operator', operator, tuple(operands))
+    if kind == 'negate':
+        operand = _canonical(node[1])
+        return ('number', -operand[1]) if operand[0] == 'number' else ('negate', operand)
+    if kind == 'call':
+        return ('call', node[1], tuple(_canonical(arg) for arg in node[2]))
+    if kind == 'step':
+        return ('step', node[1], node[2], tuple(_canonical(predicate) for predicate in node[3]))
+    if kind == 'path':
+        return ('path', node[1], _canonical(node[2]), _canonical(node[3]))
+    if kind == 'filter':
+        return ('filter', _canonical(node[1]), _canonical(node[2]))
+    return node
+
+def canonicalize_xpath(expression: str) -> Tuple:
+    """
+    Returns the canonical AST of an ODK XPath expression. Expressions that differ only by
+    whitespace, quote style, redundant parentheses, the operand order of commutative
+    operators (and, or, =, !=, +, *, |), associativity of and/or/+/*/|, mirrored comparisons
+    (a > b, b < a) or number spelling (1, 1.0) share the same canonical AST.
+
+    Raises:
+        XPathSyntaxError: If the expression cannot be parsed.
+    """
+    return _canonical(parse_xpath(expression))
+
+def formula_fingerprint(formula: Optional[str]) -> Optional[str]:
+    """The hash of the canonical AST of a formula, or None when it is empty or cannot be parsed."""
+    if not formula or not formula.strip():
+        return None
+    try:
+        tree: Any = canonicalize_xpath(formula)
+    except XPathSyntaxError:
+        return None
+    return hashlib.sha256(repr(tree).encode('utf-8')).hexdigest()
+
+def are_formulas_equivalent(formula1: Optional[str], formula2: Optional[str]) -> bool:
+    """Whether both formulas parse to the same canonical AST. False when either cannot be parsed."""
+    fingerprint = formula_fingerprint(formula1)
+    return fingerprint is not None and fingerprint == formula_fingerprint(formula2)
@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.contracts.logger import Logger
+from application.dtos import HttpHostStatsDTO
+
+class PooledHttpClient:
+    """
+    A shared HTTP transport for the HTTP-based repositories.
+
+    It keeps one `requests.Session` per host, so connections are pooled and kept alive
+    across calls, applies connect/read timeouts to every request that does not set its own,
+    and records per-host latency and connection reuse.
+    """
+
+    def __init__(
+        self,
+        logger: Optional[Logger] = None,
+        connect_timeout_seconds: float = 5.0,
+        read_timeout_seconds: float = 60.0,
+        pool_maxsize: int = 16
+    ):
+        self._logger = logger
+        self._timeout: Tuple[float, float] = (connect_timeout_seconds or 5.0, read_timeout_seconds or 60.0)
+        self._pool_maxsize = pool_maxsize or 16
+        self._sessions: Dict[str, requests.Session] = {}
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_of(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, url: str) -> requests.Session:
+        """Returns the pooled session used for the host of the given URL."""
+        host = self._host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                # One pool per host; pool_maxsize bounds the concurrent keep-alive connections to it.
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize)
+                session = requests.Session()
+                session.mount(f"{host}/", adapter)
+                self._sessions[host] = session
+                self._adapters[host] = adapter
+                self._stats[host] = {"requests": 0, "errors": 0, "latency": 0.0}
+                if self._logger:
+                    self._logger.log_info(f"Opened pooled HTTP session for {host}")
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        session = self.session_for(url)
+        host = self._host_of(url)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                stats = self._stats[host]
+                stats["requests"] += 1
+                stats["errors"] += int(failed)
+                stats["latency"] += time.perf_counter() - started
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _connections_opened(self, host: str) -> int:
+        adapter = self._adapters.get(host)
+        if adapter is None:
+            return 0
+        pools = adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def get_stats(self, hosts: Optional[Iterable[str]] = None) -> Dict[str, HttpHostStatsDTO]:
+        """
+        Returns the transport statistics per host.
+
+        Args:
+            hosts (Optional[Iterable[str]]): URLs or hosts to report on; all hosts when omitted.
+        """
+        with self._lock:
+            known_hosts = list(self._stats)
+        wanted = {self._host_of(host) for host in hosts} if hosts is not None else set(known_hosts)
+        result = {}
+        for host in known_hosts:
+            if host not in wanted:
+                continue
+            with self._lock:
+                stats = dict(self._stats[host])
+            result[host] = HttpHostStatsDTO(
+                host=host,
+                requests=int(stats["requests"]),
+                errors=int(stats["errors"]),
+                total_latency_seconds=stats["latency"],
+                connections_opened=self._connections_opened(host)
+            )
+        return result
+
+    def log_stats(self):
+        """Logs the transport statistics of every host called so far, one line per host."""
+        if not self._logger:
+            return
+        for stats in self.get_stats().values():
+            self._logger.log_info(
+                f"HTTP {stats.host}: {stats.requests} requests, {stats.errors} errors, "
+                f"{stats.average_latency_seconds * 1000:.0f} ms average latency, "
+                f"{stats.connections_opened} connections opened, {stats.reused_connections} reused"
+            )
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._adapters.clear()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+class RequestRateLimiter:
+    """
+    A token bucket shared by every caller of a rate-limited API.
+
+    The bucket holds up to `burst` tokens and refills at `requests_per_minute / 60` tokens
+    per second; each request takes one token and waits for it when the bucket is empty.
+    It is thread-safe, and its async variant waits on the event loop instead of a thread.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60.0,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._rate = max(float(requests_per_minute or 60.0), 1e-6) / 60.0
+        self._capacity = float(max(1, int(burst or 1)))
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            # The balance may go negative: later callers queue behind the reservations already made.
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a random delay between 0 and
+    min(max_delay, base_delay * 2 ** (n - 1)) seconds, so throttled callers do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 60.0,
+        random_source: Callable[[float, float], float] = random.uniform
+    ):
+        self.max_attempts = max(1, int(max_attempts or 5))
+        self._base_delay = float(base_delay_seconds or 1.0)
+        self._max_delay = float(max_delay_seconds or 60.0)
+        self._uniform = random_source
+
+    def delay(self, retry_number: int) -> float:
+        return self._uniform(0.0, min(self._max_delay, self._base_delay * 2 ** (max(retry_number, 1) - 1)))
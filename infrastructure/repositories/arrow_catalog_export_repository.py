@@ -0,0 +1,83 @@
+import os
+import sys
+from dataclasses import fields
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import DataCatalogRowDTO
+from domain.contracts.catalog_export_repository import CatalogExportRepository
+
+_COLUMNS = [field.name for field in fields(DataCatalogRowDTO)]
+# Columns with few distinct values (one view/form name per form, a handful of types) are dictionary encoded.
+_DICTIONARY_COLUMNS = {"formview_name", "xlsform_name", "sql_type", "odk_type"}
+
+CATALOG_SCHEMA = pa.schema([
+    pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name in _DICTIONARY_COLUMNS else pa.string())
+    for name in _COLUMNS
+])
+# The same columns as plain strings, for CSV (no dictionary type) and Feather (IPC files allow a
+# single dictionary per column, while every streamed batch carries its own).
+_PLAIN_SCHEMA = pa.schema([pa.field(name, pa.string()) for name in _COLUMNS])
+
+class ArrowCatalogExportRepository(CatalogExportRepository):
+    """
+    An implementation of the CatalogExportRepository that turns catalog rows into Arrow record
+    batches and streams them to Parquet, Feather (Arrow IPC) or CSV writers.
+
+    Feather files are written uncompressed so that `read_table` can memory-map them without a copy.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self._batch_size = max(1, int(batch_size or 10000))
+
+    def record_batches(self, rows: Iterable[DataCatalogRowDTO], schema: pa.Schema = CATALOG_SCHEMA) -> Iterator[pa.RecordBatch]:
+        """Yields the rows as record batches of at most `batch_size` rows, built column by column."""
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, self._batch_size))
+            if not chunk:
+                return
+            yield pa.RecordBatch.from_arrays(
+                [pa.array([getattr(row, field.name) for row in chunk], type=field.type) for field in schema],
+                schema=schema
+            )
+
+    def to_table(self, rows: Iterable[DataCatalogRowDTO]) -> pa.Table:
+        return pa.Table.from_batches(list(self.record_batches(rows)), schema=CATALOG_SCHEMA)
+
+    def export(self, rows: Iterable[DataCatalogRowDTO], destination: Union[str, BinaryIO], file_format: str = "parquet"):
+        if file_format == "parquet":
+            with pq.ParquetWriter(destination, CATALOG_SCHEMA, compression="zstd") as writer:
+                for batch in self.record_batches(rows):
+                    writer.write_batch(batch)
+        elif file_format == "feather":
+            with pa.ipc.new_file(destination, _PLAIN_SCHEMA) as writer:
+                for batch in self.record_batches(rows, _PLAIN_SCHEMA):
+                    writer.write_batch(batch)
+        elif file_format == "csv":
+            with pa_csv.CSVWriter(destination, _PLAIN_SCHEMA) as writer:
+                for batch in self.record_batches(rows, _PLAIN_SCHEMA):
+                    writer.write_batch(batch)
+        else:
+            raise ValueError(f"Unsupported catalog format '{file_format}'. Expected one of {', '.join(self.FORMATS)}.")
+
+    @staticmethod
+    def read_table(path: str) -> pa.Table:
+        """
+        Opens an exported catalog. Parquet and Feather files are memory-mapped, so a catalog
+        that spans every country is loaded without reading it into memory first.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".parquet":
+            return pq.read_table(path, memory_map=True)
+        if extension in (".feather", ".arrow"):
+            return pa.ipc.open_file(pa.memory_map(path)).read_all()
+        if extension == ".csv":
+            return pa_csv.read_csv(path)
+        raise ValueError(f"Cannot tell the format of '{path}' from its extension.")
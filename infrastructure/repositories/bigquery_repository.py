@@ -2,6 +2,8 @@ from google.cloud import bigquery
 from google.api_core import exceptions
 import sys
 import os
+import threading
+from typing import Dict, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
@@ -15,6 +17,9 @@ class BigQueryRepository(DataWarehouseRepository):
 
     def __init__(self, logger: Logger):
         self._logger = logger
+        # View definitions loaded in bulk, per (project_id, dataset_id).
+        self._view_index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._view_index_lock = threading.Lock()
         try:
             self._client = bigquery.Client()
             self._logger.log_info("BigQuery client initialized successfully.")
@@ -22,11 +27,45 @@ class BigQueryRepository(DataWarehouseRepository):
             self._logger.log_exception("Failed to initialize BigQuery client.")
             raise Exception(f"Failed to initialize BigQuery client. Ensure you are authenticated. Error: {e}")
 
+    def load_view_queries(self, project_id: str, dataset_id: str) -> Dict[str, str]:
+        if not all([project_id, dataset_id]):
+            raise ValueError("Project ID and Dataset ID cannot be empty.")
+
+        dataset_ref = f"{project_id}.{dataset_id}"
+        # Every call re-queries the dataset, so views created or changed since the last load are seen.
+        # The previous index is dropped first: if the reload fails, lookups fall back to get_table instead of stale SQL.
+        with self._view_index_lock:
+            self._view_index.pop((project_id, dataset_id), None)
+        self._logger.log_info(f"Loading all view queries for dataset: {dataset_ref}")
+        query = f"SELECT table_name, view_definition FROM `{dataset_ref}.INFORMATION_SCHEMA.VIEWS`"
+        try:
+            rows = self._client.query(query).result()
+            view_queries = {row["table_name"]: row["view_definition"] for row in rows}
+        except exceptions.NotFound:
+            self._logger.log_warning(f"The dataset '{dataset_ref}' was not found in BigQuery.")
+            raise FileNotFoundError(f"The dataset '{dataset_ref}' was not found in BigQuery.")
+        except exceptions.GoogleAPICallError as e:
+            self._logger.log_error(f"An API error occurred while loading views of '{dataset_ref}': {e}")
+            raise Exception(f"An API error occurred while loading the views: {e}") from e
+
+        with self._view_index_lock:
+            self._view_index[(project_id, dataset_id)] = view_queries
+        self._logger.log_info(f"Loaded {len(view_queries)} view queries for dataset: {dataset_ref}")
+        return dict(view_queries)
+
     def get_view_query(self, project_id: str, dataset_id: str, view_id: str) -> str:
         if not all([project_id, dataset_id, view_id]):
             raise ValueError("Project ID, Dataset ID, and View ID cannot be empty.")
 
         view_ref = f"{project_id}.{dataset_id}.{view_id}"
+
+        view_queries = self._view_index.get((project_id, dataset_id))
+        if view_queries is not None:
+            if view_id not in view_queries:
+                self._logger.log_warning(f"The view '{view_ref}' was not found in BigQuery.")
+                raise FileNotFoundError(f"The view '{view_ref}' was not found in BigQuery.")
+            return view_queries[view_id]
+
         self._logger.log_info(f"Fetching view query for: {view_ref}")
 
         try:
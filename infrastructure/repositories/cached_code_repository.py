@@ -0,0 +1,256 @@
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.contracts.code_repository import CodeRepository
+from domain.contracts.logger import Logger
+from application.dtos import CommitDTO
+from infrastructure.repositories.lazy_file_mapping import LazyFileMapping
+
+def git_blob_sha(content: bytes) -> str:
+    """Computes the SHA git assigns to a blob with the given content."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+class CachedCodeRepository(CodeRepository):
+    """
+    A CodeRepository decorator that keeps downloaded files in a content-addressed
+    on-disk cache keyed by git blob SHA.
+
+    Freshness is checked with a single directory listing per branch/directory, which
+    returns the current blob SHA of every file; only blobs that are not already cached
+    are downloaded from the wrapped repository. The cache is bounded in size and evicts
+    the least recently used blobs. In offline mode no network call is made at all and
+    files are served from the last known branch/path -> blob mapping.
+
+    The index is written when blobs are added or evicted, once per directory load and at
+    exit; cache hits only update it in memory.
+    """
+
+    def __init__(
+        self,
+        inner: CodeRepository,
+        cache_dir: str,
+        logger: Logger,
+        max_size_mb: int = 512,
+        offline: bool = False,
+        listing_ttl_seconds: int = 60
+    ):
+        self._inner = inner
+        self._logger = logger
+        self._cache_dir = os.path.abspath(cache_dir or ".cache/github_blobs")
+        self._max_size_bytes = int(max_size_mb or 512) * 1024 * 1024
+        self._offline = bool(offline)
+        self._listing_ttl_seconds = listing_ttl_seconds if listing_ttl_seconds is not None else 60
+        self._index_path = os.path.join(self._cache_dir, "index.json")
+        self._lock = threading.RLock()
+        self._listings: Dict[Tuple[str, str], Tuple[float, Dict[str, str]]] = {}
+
+        os.makedirs(os.path.join(self._cache_dir, "blobs"), exist_ok=True)
+        self._index = self._load_index()
+        self._index_dirty = False
+        atexit.register(self._flush_index)
+        self._logger.log_info(f"CachedCodeRepository initialized at {self._cache_dir} (offline={self._offline})")
+
+    # --- Index persistence ---
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+            return {"blobs": index.get("blobs", {}), "refs": index.get("refs", {})}
+        except (FileNotFoundError, ValueError):
+            return {"blobs": {}, "refs": {}}
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _flush_index(self):
+        """Writes the index if it changed since it was last written."""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+                self._index_dirty = False
+
+    def _set_ref(self, branch: str, file_path: str, sha: str):
+        ref = self._ref_key(branch, file_path)
+        if self._index["refs"].get(ref) != sha:
+            self._index["refs"][ref] = sha
+            self._index_dirty = True
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self._cache_dir, "blobs", sha[:2], sha[2:])
+
+    @staticmethod
+    def _ref_key(branch: str, file_path: str) -> str:
+        return f"{branch}:{file_path}"
+
+    # --- Blob store ---
+
+    def _read_blob(self, sha: str) -> Optional[bytes]:
+        """Reads a cached blob. Its access time is only updated in memory, and written with the next index flush."""
+        with self._lock:
+            if sha not in self._index["blobs"]:
+                return None
+            try:
+                with open(self._blob_path(sha), 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                del self._index["blobs"][sha]
+                self._index_dirty = True
+                return None
+            self._index["blobs"][sha]["last_access"] = time.time()
+            self._index_dirty = True
+            return content
+
+    def _write_blob(self, branch: str, file_path: str, content: bytes, flush: bool = True) -> str:
+        sha = git_blob_sha(content)
+        with self._lock:
+            blob_path = self._blob_path(sha)
+            if sha not in self._index["blobs"]:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                with open(blob_path, 'wb') as f:
+                    f.write(content)
+            self._index["blobs"][sha] = {"size": len(content), "last_access": time.time()}
+            self._index["refs"][self._ref_key(branch, file_path)] = sha
+            self._index_dirty = True
+            self._evict()
+            if flush:
+                self._flush_index()
+        return sha
+
+    def _evict(self):
+        blobs = self._index["blobs"]
+        total_size = sum(entry["size"] for entry in blobs.values())
+        if total_size <= self._max_size_bytes:
+            return
+
+        for sha, entry in sorted(blobs.items(), key=lambda item: item[1]["last_access"]):
+            if total_size <= self._max_size_bytes:
+                break
+            try:
+                os.unlink(self._blob_path(sha))
+            except FileNotFoundError:
+                pass
+            total_size -= entry["size"]
+            del blobs[sha]
+            self._logger.log_info(f"Evicted blob {sha} from the code cache.")
+
+        self._index["refs"] = {ref: sha for ref, sha in self._index["refs"].items() if sha in blobs}
+
+    # --- Revalidation ---
+
+    def _get_listing(self, branch: str, directory: str) -> Dict[str, str]:
+        key = (branch, directory)
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached and time.monotonic() - cached[0] < self._listing_ttl_seconds:
+                return cached[1]
+
+        listing = self._inner.list_directory(branch, directory)
+        with self._lock:
+            self._listings[key] = (time.monotonic(), listing)
+        return listing
+
+    # --- CodeRepository contract ---
+
+    def download_file(self, branch: str, file_path: str) -> bytes:
+        if not branch or not file_path:
+            raise ValueError("Branch and file path cannot be empty.")
+
+        if self._offline:
+            sha = self._index["refs"].get(self._ref_key(branch, file_path))
+            content = self._read_blob(sha) if sha else None
+            if content is None:
+                raise FileNotFoundError(f"File '{file_path}' not found in branch '{branch}' (offline code cache).")
+            return content
+
+        try:
+            listing = self._get_listing(branch, os.path.dirname(file_path))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File '{file_path}' not found in branch '{branch}'.")
+        except Exception as e:
+            self._logger.log_warning(f"Could not revalidate '{file_path}' against GitHub, downloading directly. Error: {e}")
+            content = self._inner.download_file(branch, file_path)
+            self._write_blob(branch, file_path, content)
+            return content
+
+        if file_path not in listing:
+            raise FileNotFoundError(f"File '{file_path}' not found in branch '{branch}'.")
+
+        sha = listing[file_path]
+        content = self._read_blob(sha)
+        if content is not None:
+            self._logger.log_info(f"Code cache hit for {file_path} ({sha[:10]})")
+            with self._lock:
+                self._set_ref(branch, file_path, sha)
+            return content
+
+        self._logger.log_info(f"Code cache miss for {file_path} ({sha[:10]})")
+        content = self._inner.download_file(branch, file_path)
+        stored_sha = self._write_blob(branch, file_path, content)
+        if stored_sha != sha:
+            self._logger.log_warning(f"Blob SHA of {file_path} changed during download ({sha[:10]} -> {stored_sha[:10]}).")
+        return content
+
+    def download_directory(self, branch: str, directory: str) -> Mapping[str, bytes]:
+        listing = self.list_directory(branch, directory)
+        if self._offline:
+            return LazyFileMapping(listing.keys(), lambda: {path: self.download_file(branch, path) for path in listing})
+        return LazyFileMapping(listing.keys(), lambda: self._load_directory(branch, directory.rstrip('/'), listing))
+
+    def _load_directory(self, branch: str, directory: str, listing: Dict[str, str]) -> Dict[str, bytes]:
+        contents, missing_paths = {}, []
+        for path, sha in listing.items():
+            content = self._read_blob(sha)
+            if content is None:
+                missing_paths.append(path)
+            else:
+                contents[path] = content
+
+        if missing_paths:
+            # One bulk download for everything that is not cached yet.
+            self._logger.log_info(f"Code cache miss for {len(missing_paths)} of {len(listing)} files in {directory}, downloading in bulk.")
+            remote_contents = self._inner.download_directory(branch, directory)
+            for path in missing_paths:
+                if path not in remote_contents:
+                    continue
+                try:
+                    contents[path] = remote_contents[path]
+                except FileNotFoundError as e:
+                    # Listed but absent from the archive: left missing, so only this file falls back to a per-file download.
+                    self._logger.log_warning(str(e))
+                    continue
+                # The blob and its ref are stored under the SHA of the bytes actually downloaded.
+                stored_sha = self._write_blob(branch, path, contents[path], flush=False)
+                if stored_sha != listing[path]:
+                    # The branch moved between the listing and the archive: the listing is stale.
+                    self._logger.log_warning(f"Blob SHA of {path} changed during download ({listing[path][:10]} -> {stored_sha[:10]}).")
+                    with self._lock:
+                        self._listings.pop((branch, directory), None)
+
+        # The index is written once for the whole directory, not once per file read or written.
+        with self._lock:
+            for path in contents:
+                if path not in missing_paths:
+                    self._set_ref(branch, path, listing[path])
+            self._flush_index()
+        return contents
+
+    def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        if self._offline:
+            prefix = self._ref_key(branch, directory.rstrip('/') + '/')
+            return {ref.split(':', 1)[1]: sha for ref, sha in self._index["refs"].items() if ref.startswith(prefix)}
+        return dict(self._get_listing(branch, directory.rstrip('/')))
+
+    def get_file_history(self, branch: str, file_path: str) -> List[CommitDTO]:
+        return self._inner.get_file_history(branch, file_path)
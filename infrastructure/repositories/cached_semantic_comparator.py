@@ -0,0 +1,289 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import SemanticCacheStatsDTO
+from domain.contracts.semantic_comparator_repository import SemanticComparatorRepository
+from domain.contracts.async_semantic_comparator_repository import AsyncSemanticComparatorRepository
+from domain.contracts.logger import Logger
+
+class SemanticResponseCache:
+    """
+    A persistent key/value store of model responses in a single SQLite file.
+
+    Entries expire `ttl_seconds` after they were written and the store keeps at most
+    `max_entries` of them, evicting the least recently read first. It is safe to share
+    between threads and between the synchronous and asynchronous comparators.
+    """
+
+    def __init__(self, path: str, logger: Logger, ttl_seconds: Optional[float] = 30 * 24 * 3600, max_entries: int = 100000):
+        self._path = os.path.abspath(path or ".cache/semantic_responses.sqlite")
+        self._logger = logger
+        self._ttl_seconds = ttl_seconds if ttl_seconds is not None else 30 * 24 * 3600
+        self._max_entries = int(max_entries or 100000)
+        self._lock = threading.Lock()
+        self._hits, self._misses = 0, 0
+
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._logger.log_info(f"SemanticResponseCache opened at {self._path}")
+
+    # Keys per SELECT/UPDATE statement, under SQLite's default limit of 999 bound parameters.
+    _KEYS_PER_STATEMENT = 500
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Returns the cached values of the known, unexpired keys, read with one SELECT per batch of keys.
+        The reads are recorded and the expired entries deleted in a single transaction.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+        now = time.time()
+        found, expired = {}, []
+        with self._lock:
+            for start in range(0, len(unique_keys), self._KEYS_PER_STATEMENT):
+                batch = unique_keys[start:start + self._KEYS_PER_STATEMENT]
+                placeholders = ", ".join("?" * len(batch))
+                for key, value, created_at in self._connection.execute(f"SELECT key, value, created_at FROM responses WHERE key IN ({placeholders})", batch):
+                    if now - created_at > self._ttl_seconds:
+                        expired.append(key)
+                    else:
+                        found[key] = json.loads(value)
+            if found or expired:
+                with self._connection:
+                    self._connection.executemany("UPDATE responses SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+                    self._connection.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in expired])
+            self._hits += len(found)
+            self._misses += len(unique_keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if the key is unknown or expired."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Sequence[Tuple[str, Any]]):
+        """Stores several values in one transaction, then evicts the least recently read entries over the limit."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value), now, now) for key, value in items]
+            )
+            count = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self._max_entries:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (count - self._max_entries,)
+                )
+
+    def put(self, key: str, value: Any):
+        self.put_many([(key, value)])
+
+    def get_stats(self) -> SemanticCacheStatsDTO:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return SemanticCacheStatsDTO(hits=self._hits, misses=self._misses, entries=entries)
+
+    def log_stats(self):
+        """Logs the hits, misses and hit ratio of the lookups made so far, and the number of stored entries."""
+        stats = self.get_stats()
+        self._logger.log_info(
+            f"Semantic response cache: {stats.hits} hits, {stats.misses} misses "
+            f"({stats.hit_ratio:.0%} hit ratio), {stats.entries} entries"
+        )
+
+def _normalize(value: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", value or "").strip()
+
+def _is_cacheable_descriptions(descriptions: Dict[str, str]) -> bool:
+    # Failed generations are reported in-band as "Error: ..." and must be retried on the next run.
+    return not any(str(text).startswith("Error:") for text in descriptions.values())
+
+class _SemanticCacheKeys:
+    """Cache keys and the per-item bookkeeping of batched calls, shared by the cached comparators."""
+
+    def __init__(self, inner: Any, cache: SemanticResponseCache, model_id: Optional[str], prompt_version: Optional[str]):
+        self._inner = inner
+        self._cache = cache
+        self._model_id = model_id or getattr(inner, "model_id", type(inner).__name__)
+        self._prompt_version = prompt_version or getattr(inner, "prompt_version", "1")
+
+    def _key(self, method: str, *inputs: Optional[str]) -> str:
+        payload = json.dumps([self._model_id, self._prompt_version, method] + [_normalize(value) for value in inputs])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup_matrix(self, method: str, items1: List[str], items2: List[str]) -> Tuple[List[List[Optional[float]]], List[int], List[int]]:
+        """Returns the cached scores (None where missing) and the rows/columns that still need scoring."""
+        keys = [[self._key(method, a, b) for b in items2] for a in items1]
+        cached = self._cache.get_many([key for row in keys for key in row])
+        matrix = [[cached.get(key) for key in row] for row in keys]
+        rows = [i for i, scores in enumerate(matrix) if any(score is None for score in scores)]
+        columns = [j for j in range(len(items2)) if any(matrix[i][j] is None for i in rows)]
+        return matrix, rows, columns
+
+    def _store_matrix(self, method: str, items1: List[str], items2: List[str], matrix, rows: List[int], columns: List[int], scores: List[List[float]]):
+        entries = []
+        for row, i in enumerate(rows):
+            for column, j in enumerate(columns):
+                if matrix[i][j] is None:
+                    matrix[i][j] = scores[row][column]
+                    # Pairs the model failed to score are NaN and must be retried on the next run.
+                    if not math.isnan(scores[row][column]):
+                        entries.append((self._key(method, items1[i], items2[j]), scores[row][column]))
+        self._cache.put_many(entries)
+
+    def _lookup_descriptions(self, formulas: List[str], form_context: str) -> Tuple[List[Optional[Dict[str, str]]], List[int]]:
+        """Returns the cached descriptions (None where missing) and the indexes of the formulas still to describe."""
+        keys = [self._key("descriptions_with_context", formula, form_context) for formula in formulas]
+        cached = self._cache.get_many(keys)
+        results = [cached.get(key) for key in keys]
+        return results, [i for i, descriptions in enumerate(results) if descriptions is None]
+
+    def _store_descriptions(self, formulas: List[str], form_context: str, results, missing: List[int], generated: List[Dict[str, str]]):
+        entries = []
+        for i, descriptions in zip(missing, generated):
+            results[i] = descriptions
+            if _is_cacheable_descriptions(descriptions):
+                entries.append((self._key("descriptions_with_context", formulas[i], form_context), descriptions))
+        self._cache.put_many(entries)
+
+    def get_cache_stats(self) -> SemanticCacheStatsDTO:
+        return self._cache.get_stats()
+
+class CachedSemanticComparator(_SemanticCacheKeys, SemanticComparatorRepository):
+    """
+    A SemanticComparatorRepository decorator that answers repeated requests from a
+    persistent SemanticResponseCache.
+
+    Keys are a hash of the model id, the prompt version and the whitespace-normalized
+    inputs, so re-running a comparison or an enrichment on an unchanged form makes no
+    model call. Similarity matrices are cached pair by pair and only the missing pairs
+    are sent to the wrapped repository. Failed calls are never cached: yes/no comparisons
+    that raise, NaN similarity scores and descriptions that report an error.
+    """
+
+    def __init__(self, inner: SemanticComparatorRepository, cache: SemanticResponseCache, model_id: Optional[str] = None, prompt_version: Optional[str] = None):
+        super().__init__(inner, cache, model_id, prompt_version)
+
+    def _cached(self, key: str, compute, cacheable=lambda value: True):
+        value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            if cacheable(value):
+                self._cache.put(key, value)
+        return value
+
+    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        return self._cached(self._key("titles", title1, title2), lambda: self._inner.are_titles_semantically_similar(title1, title2))
+
+    def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return self._cached(self._key("formulas", formula1, formula2), lambda: self._inner.are_formulas_semantically_similar(formula1, formula2))
+
+    def generate_descriptions_from_formula(self, formula: str, context_description: Optional[str] = None) -> Dict[str, str]:
+        return self._cached(
+            self._key("descriptions", formula, context_description),
+            lambda: self._inner.generate_descriptions_from_formula(formula, context_description),
+            _is_cacheable_descriptions
+        )
+
+    def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        return self._cached(
+            self._key("descriptions_with_context", formula, form_context),
+            lambda: self._inner.get_formula_description_with_context(formula=formula, form_context=form_context),
+            _is_cacheable_descriptions
+        )
+
+    def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        results, missing = self._lookup_descriptions(formulas, form_context)
+        if missing:
+            generated = self._inner.get_formula_descriptions_with_context([formulas[i] for i in missing], form_context)
+            self._store_descriptions(formulas, form_context, results, missing, generated)
+        return results
+
+    def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        return self._score("title_similarity", titles1, titles2, self._inner.score_title_similarities)
+
+    def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        return self._score("formula_similarity", formulas1, formulas2, self._inner.score_formula_similarities)
+
+    def _score(self, method: str, items1: List[str], items2: List[str], score_similarities) -> List[List[float]]:
+        matrix, rows, columns = self._lookup_matrix(method, items1, items2)
+        if rows:
+            scores = score_similarities([items1[i] for i in rows], [items2[j] for j in columns])
+            self._store_matrix(method, items1, items2, matrix, rows, columns, scores)
+        return matrix
+
+class CachedAsyncSemanticComparator(_SemanticCacheKeys, AsyncSemanticComparatorRepository):
+    """
+    The AsyncSemanticComparatorRepository counterpart of CachedSemanticComparator. Both
+    can share the same SemanticResponseCache, so the synchronous and asynchronous paths
+    reuse each other's responses.
+    """
+
+    def __init__(self, inner: AsyncSemanticComparatorRepository, cache: SemanticResponseCache, model_id: Optional[str] = None, prompt_version: Optional[str] = None):
+        super().__init__(inner, cache, model_id, prompt_version)
+
+    async def _cached(self, key: str, compute, cacheable=lambda value: True):
+        value = self._cache.get(key)
+        if value is None:
+            value = await compute()
+            if cacheable(value):
+                self._cache.put(key, value)
+        return value
+
+    async def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        return await self._cached(self._key("titles", title1, title2), lambda: self._inner.are_titles_semantically_similar(title1, title2))
+
+    async def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return await self._cached(self._key("formulas", formula1, formula2), lambda: self._inner.are_formulas_semantically_similar(formula1, formula2))
+
+    async def generate_descriptions_from_formula(self, formula: str, context_description: Optional[str] = None) -> Dict[str, str]:
+        return await self._cached(
+            self._key("descriptions", formula, context_description),
+            lambda: self._inner.generate_descriptions_from_formula(formula, context_description),
+            _is_cacheable_descriptions
+        )
+
+    async def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        return await self._cached(
+            self._key("descriptions_with_context", formula, form_context),
+            lambda: self._inner.get_formula_description_with_context(formula=formula, form_context=form_context),
+            _is_cacheable_descriptions
+        )
+
+    async def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        results, missing = self._lookup_descriptions(formulas, form_context)
+        if missing:
+            generated = await self._inner.get_formula_descriptions_with_context([formulas[i] for i in missing], form_context)
+            self._store_descriptions(formulas, form_context, results, missing, generated)
+        return results
+
+    async def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        return await self._score("title_similarity", titles1, titles2, self._inner.score_title_similarities)
+
+    async def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        return await self._score("formula_similarity", formulas1, formulas2, self._inner.score_formula_similarities)
+
+    async def _score(self, method: str, items1: List[str], items2: List[str], score_similarities) -> List[List[float]]:
+        matrix, rows, columns = self._lookup_matrix(method, items1, items2)
+        if rows:
+            scores = await score_similarities([items1[i] for i in rows], [items2[j] for j in columns])
+            self._store_matrix(method, items1, items2, matrix, rows, columns, scores)
+        return matrix
@@ -1,6 +1,7 @@
 import requests
 import os
 import sys
+from typing import Optional
 import google.auth
 import google.auth.transport.requests
 
@@ -8,14 +9,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 
 from domain.contracts.xform_api_repository import XFormApiRepository
 from domain.contracts.logger import Logger
+from infrastructure.http.pooled_http_client import PooledHttpClient
 
 class CloudFunctionXFormApiRepository(XFormApiRepository):
     """
     An implementation of the XFormApiRepository contract that interacts with Google Cloud Functions.
     """
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, http_client: Optional[PooledHttpClient] = None):
         self._logger = logger
+        self._http = http_client or PooledHttpClient(logger)
         self._base_urls = {
             "mali": "https://us-central1-musohealth.cloudfunctions.net/gcf-xform-question",
             "rci": "https://us-central1-musohealth.cloudfunctions.net/gcf-xform-question-rci"
@@ -46,7 +49,7 @@ class CloudFunctionXFormApiRepository(XFormApiRepository):
             headers = {"Authorization": f"Bearer {id_token}", "Content-Type": "application/json"}
             payload = {"xml_name": xml_name, "bigquery_extraction": True}
 
-            response = requests.post(url, headers=headers, json=payload)
+            response = self._http.post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             response_json = response.json()
@@ -1,13 +1,14 @@
 import requests
 import os
 import sys
-from typing import List
+from typing import List, Optional
 import math
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from domain.contracts.cicd_repository import CICDRepository
 from domain.contracts.logger import Logger
+from infrastructure.http.pooled_http_client import PooledHttpClient
 from application.dtos import WorkflowRunDTO
 
 class GitHubActionsRepository(CICDRepository):
@@ -15,8 +16,9 @@ class GitHubActionsRepository(CICDRepository):
     An implementation of the CICDRepository contract that interacts with the GitHub Actions API.
     """
 
-    def __init__(self, owner: str, repo_name: str, logger: Logger):
+    def __init__(self, owner: str, repo_name: str, logger: Logger, http_client: Optional[PooledHttpClient] = None):
         self._logger = logger
+        self._http = http_client or PooledHttpClient(logger)
         self._owner = owner
         self._repo_name = repo_name
         self._token = os.getenv("GITHUB_PAT")
@@ -42,7 +44,7 @@ class GitHubActionsRepository(CICDRepository):
             if workflow_name: params['workflow_id'] = workflow_name
 
             try:
-                response = requests.get(url, headers=self._headers, params=params)
+                response = self._http.get(url, headers=self._headers, params=params)
                 response.raise_for_status()
                 response_json = response.json()
 
@@ -2,21 +2,25 @@ import requests
 import os
 import base64
 import sys
-from typing import List
+import tarfile
+from typing import Dict, List, Mapping, Optional
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from domain.contracts.code_repository import CodeRepository
 from domain.contracts.logger import Logger
+from infrastructure.http.pooled_http_client import PooledHttpClient
 from application.dtos import CommitDTO
+from infrastructure.repositories.lazy_file_mapping import LazyFileMapping
 
 class GitHubRepository(CodeRepository):
     """
     An implementation of the CodeRepository contract that interacts with a GitHub repository.
     """
 
-    def __init__(self, owner: str, repo_name: str, logger: Logger):
+    def __init__(self, owner: str, repo_name: str, logger: Logger, http_client: Optional[PooledHttpClient] = None):
         self._logger = logger
+        self._http = http_client or PooledHttpClient(logger)
         self._owner = owner
         self._repo_name = repo_name
         self._token = os.getenv("GITHUB_PAT")
@@ -35,7 +39,7 @@ class GitHubRepository(CodeRepository):
         url = f"{self._api_base_url}/contents/{file_path}?ref={branch}"
         self._logger.log_info(f"Downloading file from GitHub: {url}")
         try:
-            response = requests.get(url, headers=self._headers)
+            response = self._http.get(url, headers=self._headers)
             response.raise_for_status()
             response_json = response.json()
             
@@ -56,6 +60,73 @@ class GitHubRepository(CodeRepository):
             self._logger.log_error(f"Network error downloading from GitHub: {e}")
             raise Exception(f"A network error occurred while downloading file: {e}") from e
 
+    def download_directory(self, branch: str, directory: str) -> Mapping[str, bytes]:
+        paths = self.list_directory(branch, directory)
+        return LazyFileMapping(paths.keys(), lambda: self._download_archive_files(branch, set(paths.keys())))
+
+    def _download_archive_files(self, branch: str, paths: set) -> Dict[str, bytes]:
+        """
+        Streams the branch tarball once and keeps only the requested files. Unlike the
+        Contents API, the archive is not limited to 1 MB per file.
+        """
+        url = f"{self._api_base_url}/tarball/{branch}"
+        self._logger.log_info(f"Downloading archive from GitHub: {url} ({len(paths)} files requested)")
+        contents = {}
+        try:
+            with self._http.get(url, headers=self._headers, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with tarfile.open(fileobj=response.raw, mode='r|gz') as archive:
+                    for member in archive:
+                        if not member.isfile():
+                            continue
+                        # Archive members are prefixed with a '<owner>-<repo>-<sha>/' root folder.
+                        repo_path = member.name.split('/', 1)[-1]
+                        if repo_path in paths:
+                            contents[repo_path] = archive.extractfile(member).read()
+                            if len(contents) == len(paths):
+                                break
+            self._logger.log_info(f"Extracted {len(contents)} files from the {branch} archive.")
+            return contents
+
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                self._logger.log_warning(f"Branch not found in GitHub repo: {branch}")
+                raise FileNotFoundError(f"Branch '{branch}' not found.") from e
+            else:
+                self._logger.log_error(f"HTTP error downloading archive from GitHub: {e}")
+                raise Exception(f"HTTP error {e.response.status_code} occurred while downloading archive: {e}") from e
+        except requests.exceptions.RequestException as e:
+            self._logger.log_error(f"Network error downloading archive from GitHub: {e}")
+            raise Exception(f"A network error occurred while downloading archive: {e}") from e
+
+    def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        if not branch or not directory:
+            raise ValueError("Branch and directory cannot be empty.")
+
+        url = f"{self._api_base_url}/contents/{directory.rstrip('/')}?ref={branch}"
+        self._logger.log_info(f"Listing directory on GitHub: {url}")
+        try:
+            response = self._http.get(url, headers=self._headers)
+            response.raise_for_status()
+            response_json = response.json()
+
+            if not isinstance(response_json, list):
+                raise Exception(f"'{directory}' is not a directory in branch '{branch}'.")
+
+            return {entry['path']: entry['sha'] for entry in response_json if entry.get('type') == 'file'}
+
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                self._logger.log_warning(f"Directory not found in GitHub repo: {directory}")
+                raise FileNotFoundError(f"Directory '{directory}' not found in branch '{branch}'.") from e
+            else:
+                self._logger.log_error(f"HTTP error listing directory on GitHub: {e}")
+                raise Exception(f"HTTP error {e.response.status_code} occurred while listing directory: {e}") from e
+        except requests.exceptions.RequestException as e:
+            self._logger.log_error(f"Network error listing directory on GitHub: {e}")
+            raise Exception(f"A network error occurred while listing directory: {e}") from e
+
     def get_file_history(self, branch: str, file_path: str) -> List[CommitDTO]:
         # ... (implementation remains the same, can add logging if needed)
         return []
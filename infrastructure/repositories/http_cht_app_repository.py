@@ -1,20 +1,22 @@
 import requests
 import os
 import sys
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from domain.contracts.cht_app_repository import CHTAppRepository
 from domain.contracts.logger import Logger
+from infrastructure.http.pooled_http_client import PooledHttpClient
 
 class HttpCHTAppRepository(CHTAppRepository):
     """
     An implementation of the CHTAppRepository that interacts with a CHT instance via HTTP.
     """
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, http_client: Optional[PooledHttpClient] = None):
         self._logger = logger
+        self._http = http_client or PooledHttpClient(logger)
         self._credentials: Dict[str, tuple] = {
             "MALI": (os.getenv("CHT_MALI_USERNAME"), os.getenv("CHT_MALI_PASSWORD")),
             "RCI": (os.getenv("CHT_RCI_USERNAME"), os.getenv("CHT_RCI_PASSWORD"))
@@ -39,7 +41,7 @@ class HttpCHTAppRepository(CHTAppRepository):
 
         try:
             self._logger.log_info(f"Fetching installed forms from {url}")
-            response = requests.get(url, auth=auth_credentials)
+            response = self._http.get(url, auth=auth_credentials)
             response.raise_for_status()
 
             form_files = response.json()
@@ -0,0 +1,65 @@
+import os
+import sys
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import (
+    DbDocGroupAuditResultDTO, FormAuditRecordDTO, NotFoundElementDTO, RepeatGroupAuditResultDTO, SingleFormComparisonResultDTO
+)
+from domain.contracts.audit_result_repository import AuditResultRepository
+from domain.contracts.logger import Logger
+from domain.entities.CHTElement import CHTElement
+from infrastructure.repositories.json_file_store import JsonFileStore
+
+# Bump whenever the stored layout changes; records of another version are ignored.
+_FORMAT_VERSION = 1
+
+def _element(data: Dict[str, Any]) -> CHTElement:
+    return CHTElement(**data)
+
+def _not_found(data: Dict[str, Any]) -> NotFoundElementDTO:
+    return NotFoundElementDTO(**data)
+
+def _result(data: Optional[Dict[str, Any]]) -> Optional[SingleFormComparisonResultDTO]:
+    if data is None:
+        return None
+    return SingleFormComparisonResultDTO(
+        form_id=data["form_id"],
+        not_found_elements=[_not_found(item) for item in data["not_found_elements"]],
+        repeat_groups=[
+            RepeatGroupAuditResultDTO(
+                repeat_group_name=group["repeat_group_name"],
+                handling_method=group["handling_method"],
+                elements=[_element(item) for item in group["elements"]],
+                not_found_elements=[_not_found(item) for item in group["not_found_elements"]]
+            ) for group in data["repeat_groups"]
+        ],
+        db_doc_groups=[
+            DbDocGroupAuditResultDTO(
+                group_name=group["group_name"],
+                view_found=group["view_found"],
+                elements=[_element(item) for item in group["elements"]],
+                not_found_elements=[_not_found(item) for item in group["not_found_elements"]]
+            ) for group in data["db_doc_groups"]
+        ]
+    )
+
+def _record(data: Dict[str, Any]) -> FormAuditRecordDTO:
+    return FormAuditRecordDTO(**{**data, "result": _result(data.get("result"))})
+
+class JsonAuditResultRepository(AuditResultRepository):
+    """
+    An implementation of the AuditResultRepository that keeps the records of each country
+    in one JSON file of a local directory, replaced atomically on every save.
+    """
+
+    def __init__(self, directory: Optional[str] = None, logger: Optional[Logger] = None):
+        self._store = JsonFileStore(directory or ".cache/audit_results", "records", decode=_record, encode=asdict, logger=logger)
+
+    def load_records(self, country_code: str) -> Dict[str, FormAuditRecordDTO]:
+        return self._store.load(country_code.lower(), {"version": _FORMAT_VERSION}, f"audit results for {country_code}")
+
+    def save_records(self, country_code: str, records: Dict[str, FormAuditRecordDTO]):
+        self._store.save(country_code.lower(), {"version": _FORMAT_VERSION}, records)
@@ -0,0 +1,32 @@
+import os
+import sys
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import CatalogFormRecordDTO, DataCatalogRowDTO
+from domain.contracts.catalog_store_repository import CatalogStoreRepository
+from domain.contracts.logger import Logger
+from infrastructure.repositories.json_file_store import JsonFileStore
+
+# Bump whenever the stored layout changes; catalogs of another version are ignored.
+_FORMAT_VERSION = 1
+
+def _record(data: Dict[str, Any]) -> CatalogFormRecordDTO:
+    return CatalogFormRecordDTO(**{**data, "rows": [DataCatalogRowDTO(**row) for row in data["rows"]]})
+
+class JsonCatalogStoreRepository(CatalogStoreRepository):
+    """
+    An implementation of the CatalogStoreRepository that keeps the catalog of each country
+    in one JSON file of a local directory, replaced atomically on every save.
+    """
+
+    def __init__(self, directory: Optional[str] = None, logger: Optional[Logger] = None):
+        self._store = JsonFileStore(directory or ".cache/catalog_store", "forms", decode=_record, encode=asdict, logger=logger)
+
+    def load_forms(self, country_code: str) -> Dict[str, CatalogFormRecordDTO]:
+        return self._store.load(country_code.lower(), {"version": _FORMAT_VERSION}, f"catalog store for {country_code}")
+
+    def save_forms(self, country_code: str, records: Dict[str, CatalogFormRecordDTO]):
+        self._store.save(country_code.lower(), {"version": _FORMAT_VERSION}, records)
@@ -0,0 +1,36 @@
+import hashlib
+import os
+import sys
+from typing import Dict, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.contracts.enrichment_checkpoint_repository import EnrichmentCheckpointRepository
+from domain.contracts.logger import Logger
+from infrastructure.repositories.json_file_store import JsonFileStore
+
+class JsonEnrichmentCheckpointRepository(EnrichmentCheckpointRepository):
+    """
+    An implementation of the EnrichmentCheckpointRepository that keeps one JSON file per run
+    in a local directory. Files are replaced atomically, so a run killed mid-write leaves the
+    previous checkpoint intact.
+    """
+
+    def __init__(self, directory: Optional[str] = None, logger: Optional[Logger] = None):
+        self._store: JsonFileStore[Dict[str, str]] = JsonFileStore(directory or ".cache/enrichment_checkpoints", "descriptions", logger=logger)
+
+    @staticmethod
+    def _file_name(run_key: str) -> str:
+        return hashlib.sha256(run_key.encode("utf-8")).hexdigest()
+
+    def load(self, run_key: str) -> Dict[str, Dict[str, str]]:
+        return self._store.load(self._file_name(run_key), {"run_key": run_key}, f"enrichment checkpoint for '{run_key}'")
+
+    def save(self, run_key: str, descriptions: Dict[str, Dict[str, str]]):
+        with self._store.lock:
+            saved = self._store.read(self._file_name(run_key), {"run_key": run_key}, f"enrichment checkpoint for '{run_key}'")
+            saved.update(descriptions)
+            self._store.write(self._file_name(run_key), {"run_key": run_key}, saved)
+
+    def clear(self, run_key: str):
+        self._store.remove(self._file_name(run_key))
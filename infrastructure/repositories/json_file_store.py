@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.contracts.logger import Logger
+
+T = TypeVar("T")
+
+class JsonFileStore(Generic[T]):
+    """
+    A directory of JSON files, each holding a header (e.g. a format version) and a dict of
+    records under one key, shared by the JSON-backed repositories.
+
+    Files are replaced atomically, so a process killed mid-write leaves the previous file
+    intact. A file that is missing, unreadable or whose header does not match loads as empty;
+    only the unreadable case is logged.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        records_key: str,
+        decode: Callable[[Any], T] = lambda data: data,
+        encode: Callable[[T], Any] = lambda record: record,
+        logger: Optional[Logger] = None
+    ):
+        self._directory = directory
+        self._records_key = records_key
+        self._decode = decode
+        self._encode = encode
+        self._logger = logger
+        # Held by load() and save(); callers that read, modify and write a file hold it around read() and write().
+        self.lock = threading.Lock()
+        os.makedirs(self._directory, exist_ok=True)
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self._directory, f"{file_name}.json")
+
+    def read(self, file_name: str, header: Dict[str, Any], description: str) -> Dict[str, T]:
+        """Reads the records of a file without taking the lock; `description` names the file in the warning."""
+        try:
+            with open(self._path(file_name), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if any(payload.get(key) != value for key, value in header.items()):
+                return {}
+            return {key: self._decode(record) for key, record in payload[self._records_key].items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            if self._logger:
+                self._logger.log_warning(f"Ignoring unreadable {description}: {e}")
+            return {}
+
+    def write(self, file_name: str, header: Dict[str, Any], records: Dict[str, T]):
+        """Replaces a file with the header and the records, without taking the lock."""
+        payload = {**header, self._records_key: {key: self._encode(record) for key, record in records.items()}}
+        path = self._path(file_name)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(temporary_path, path)
+
+    def load(self, file_name: str, header: Dict[str, Any], description: str) -> Dict[str, T]:
+        with self.lock:
+            return self.read(file_name, header, description)
+
+    def save(self, file_name: str, header: Dict[str, Any], records: Dict[str, T]):
+        with self.lock:
+            self.write(file_name, header, records)
+
+    def remove(self, file_name: str):
+        with self.lock:
+            try:
+                os.remove(self._path(file_name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,48 @@
+import threading
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator
+
+class LazyFileMapping(Mapping):
+    """
+    A read-only mapping of file path to file content whose keys are known upfront
+    (e.g. from a directory listing) but whose contents are only fetched, in a single
+    call to `loader`, the first time any value is accessed.
+    """
+
+    def __init__(self, paths: Iterable[str], loader: Callable[[], Dict[str, bytes]]):
+        self._paths = list(paths)
+        self._path_set = set(self._paths)
+        self._loader = loader
+        self._contents: Dict[str, bytes] = None
+        self._load_error: Exception = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, bytes]:
+        with self._lock:
+            # A failed bulk download is not retried for every key.
+            if self._load_error is not None:
+                raise self._load_error
+            if self._contents is None:
+                try:
+                    self._contents = self._loader()
+                except Exception as e:
+                    self._load_error = e
+                    raise
+            return self._contents
+
+    def __getitem__(self, path: str) -> bytes:
+        if path not in self._path_set:
+            raise KeyError(path)
+        contents = self._load()
+        if path not in contents:
+            raise FileNotFoundError(f"File '{path}' is listed but was not found in the downloaded content.")
+        return contents[path]
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._path_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
@@ -0,0 +1,36 @@
+import os
+from typing import List, Dict, Any
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.contracts.xlsform_repository import XLSFormRepository
+from domain.contracts.rich_xlsform_repository import RichXLSFormRepository
+from domain.entities.CHTElement import CHTElement
+from domain.entities.RichCHTElement import RichCHTElement
+from infrastructure.repositories.xlsform_model import load_xlsform_model
+from infrastructure.repositories.pandas_rich_xlsform_repository import PandasRichXLSFormRepository
+
+class OpenpyxlXLSFormRepository(XLSFormRepository, RichXLSFormRepository):
+    """
+    An implementation of the XLSFormRepository that reads the .xlsx file from memory
+    with openpyxl in read-only mode and walks the rows as plain tuples.
+
+    It produces the same structure as PandasXLSFormRepository without the temporary file,
+    the DataFrame construction and the per-row Series of DataFrame.iterrows(). Both element
+    views are projections of one XLSFormModel, so asking for both parses the form once.
+    """
+
+    def get_elements_from_file(self, file_content: bytes) -> Dict[str, Any]:
+        return load_xlsform_model(file_content, engine="openpyxl").cht_element_groups()
+
+    def get_rich_elements_from_file(self, file_content: bytes) -> List[RichCHTElement]:
+        return load_xlsform_model(file_content, engine="openpyxl").rich_elements()
+
+    def get_formula_context_as_markdown(self, file_content: bytes, formulas: List[str]) -> str:
+        # The context is a Markdown table of the memoized survey sheet, the same whichever engine parses the elements.
+        return PandasRichXLSFormRepository().get_formula_context_as_markdown(file_content, formulas)
+
+    # Obsolete methods, kept only to satisfy the abstract class contract.
+    def get_repeat_groups_from_file(self, file_content: bytes) -> Dict[str, Dict[str, Any]]: return {}
+    def get_db_doc_groups_from_file(self, file_content: bytes) -> Dict[str, List[CHTElement]]: return {}
@@ -1,4 +1,3 @@
-import re
 from typing import List
 import sys
 import os
@@ -7,55 +6,39 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from domain.contracts.sql_parser_repository import SQLParserRepository
+from domain.services.sql_extraction_index import get_sql_extraction_index
 from application.dtos import ParsedColumnDTO
 
 class RegexSQLParserRepository(SQLParserRepository):
     """
-    A concrete implementation of the SQLParserRepository that uses regular expressions
-    to parse SQL content and extract column information.
+    A concrete implementation of the SQLParserRepository that reads column information
+    from the tokenizing SQL extraction index, so a cast type is never taken for an alias.
     """
 
-    def __init__(self):
-        # This pattern handles extractions with an explicit SAFE_CAST, capturing the type.
-        # e.g., SAFE_CAST(JSON_VALUE(f.doc, '$.path.to.field') AS STRING) AS column_name
-        self.pattern_with_cast = re.compile(
-            r"SAFE_CAST\s*\(\s*JSON_(?:VALUE|EXTRACT_SCALAR)\s*\([^,]+,\s*'([^']+)'\s*\)\s+AS\s+([A-Z0-9_]+)\s*\)\s+AS\s+([a-zA-Z0-9_]+)",
-            re.IGNORECASE
-        )
-
-        # This pattern handles simple extractions without a cast.
-        # e.g., JSON_VALUE(f.doc, '$.path.to.field') AS column_name
-        self.pattern_simple = re.compile(
-            r"JSON_(?:VALUE|EXTRACT_SCALAR)\s*\([^,]+,\s*'([^']+)'\s*\)\s+AS\s+([a-zA-Z0-9_]+)",
-            re.IGNORECASE
-        )
-
     def parse_columns(self, sql_content: str) -> List[ParsedColumnDTO]:
         """
-        Parses SQL content to extract column information using two regex patterns.
-        It prioritizes matches with explicit casts to get the data type.
+        Parses SQL content to extract the aliased JSON_VALUE / JSON_EXTRACT_SCALAR columns.
+        It prioritizes extractions with an explicit (SAFE_)CAST to get the data type.
         """
         parsed_columns = {}
+        extracted_columns = get_sql_extraction_index(sql_content).extracted_columns()
+
+        # First pass: extractions with an explicit cast give the SQL type.
+        for reference in extracted_columns:
+            if reference.cast_type:
+                parsed_columns[reference.alias.lower()] = ParsedColumnDTO(
+                    column_name=reference.alias,
+                    json_path=reference.json_path,
+                    sql_type=reference.cast_type
+                )
 
-        # First pass: Find all matches with an explicit SAFE_CAST to get the SQL type.
-        matches_with_cast = self.pattern_with_cast.findall(sql_content)
-        for match in matches_with_cast:
-            json_path, sql_type, column_name = match
-            parsed_columns[column_name.lower()] = ParsedColumnDTO(
-                column_name=column_name,
-                json_path=json_path,
-                sql_type=sql_type.upper()
-            )
-
-        # Second pass: Find all simple matches.
-        matches_simple = self.pattern_simple.findall(sql_content)
-        for match in matches_simple:
-            json_path, column_name = match
-            # Only add if this column hasn't already been parsed by the more specific regex.
-            if column_name.lower() not in parsed_columns:
-                parsed_columns[column_name.lower()] = ParsedColumnDTO(
-                    column_name=column_name,
-                    json_path=json_path,
+        # Second pass: simple extractions.
+        for reference in extracted_columns:
+            # Only add if this column hasn't already been parsed with a cast.
+            if not reference.cast_type and reference.alias.lower() not in parsed_columns:
+                parsed_columns[reference.alias.lower()] = ParsedColumnDTO(
+                    column_name=reference.alias,
+                    json_path=reference.json_path,
                     sql_type='STRING'  # Default to STRING as type is not specified
                 )
 
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+from typing import Dict, List, Mapping
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.dtos import CommitDTO
+from domain.contracts.async_cht_app_repository import AsyncCHTAppRepository
+from domain.contracts.async_code_repository import AsyncCodeRepository
+from domain.contracts.async_data_warehouse_repository import AsyncDataWarehouseRepository
+from domain.contracts.cht_app_repository import CHTAppRepository
+from domain.contracts.code_repository import CodeRepository
+from domain.contracts.data_warehouse_repository import DataWarehouseRepository
+
+class ThreadedAsyncCodeRepository(AsyncCodeRepository):
+    """Runs the calls of a synchronous CodeRepository in the event loop's default thread pool."""
+
+    def __init__(self, inner: CodeRepository):
+        self._inner = inner
+
+    async def download_file(self, branch: str, file_path: str) -> bytes:
+        return await asyncio.to_thread(self._inner.download_file, branch=branch, file_path=file_path)
+
+    async def download_directory(self, branch: str, directory: str) -> Mapping[str, bytes]:
+        return await asyncio.to_thread(self._inner.download_directory, branch=branch, directory=directory)
+
+    async def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        return await asyncio.to_thread(self._inner.list_directory, branch, directory)
+
+    async def get_file_history(self, branch: str, file_path: str) -> List[CommitDTO]:
+        return await asyncio.to_thread(self._inner.get_file_history, branch, file_path)
+
+class ThreadedAsyncDataWarehouseRepository(AsyncDataWarehouseRepository):
+    """Runs the calls of a synchronous DataWarehouseRepository in the event loop's default thread pool."""
+
+    def __init__(self, inner: DataWarehouseRepository):
+        self._inner = inner
+
+    async def get_view_query(self, project_id: str, dataset_id: str, view_id: str) -> str:
+        return await asyncio.to_thread(self._inner.get_view_query, project_id, dataset_id, view_id)
+
+    async def load_view_queries(self, project_id: str, dataset_id: str) -> Dict[str, str]:
+        return await asyncio.to_thread(self._inner.load_view_queries, project_id, dataset_id)
+
+class ThreadedAsyncCHTAppRepository(AsyncCHTAppRepository):
+    """Runs the calls of a synchronous CHTAppRepository in the event loop's default thread pool."""
+
+    def __init__(self, inner: CHTAppRepository):
+        self._inner = inner
+
+    async def get_installed_xform_ids(self, country_code: str) -> List[str]:
+        return await asyncio.to_thread(self._inner.get_installed_xform_ids, country_code)
@@ -1,29 +1,99 @@
+import asyncio
 import sys
 import os
 import json
-from typing import Dict, Optional
+import math
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from domain.contracts.semantic_comparator_repository import SemanticComparatorRepository
+from domain.contracts.async_semantic_comparator_repository import AsyncSemanticComparatorRepository
 from domain.contracts.logger import Logger
+from domain.services.xpath_canonicalizer import are_formulas_equivalent
+from infrastructure.http.request_rate_limiter import RequestRateLimiter, RetryPolicy
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
-class VertexAISemanticComparator(SemanticComparatorRepository):
+def _is_retryable(error: Exception) -> bool:
+    # Throttling (429) and server-side failures (5xx) are transient; other API errors are not.
+    code = getattr(error, "code", None) if isinstance(error, errors.APIError) else None
+    return code == 429 or (isinstance(code, int) and code >= 500)
+
+def _estimate_tokens(text: str) -> int:
+    # About four characters per token; good enough to size batches without a tokenizer call.
+    return len(text or "") // 4 + 1
+
+class _SimilarityChunk(NamedTuple):
+    """A block of the similarity matrix scored by a single prompt."""
+    rows: List[int]  # Indexes in the first candidate set.
+    columns: List[int]  # Indexes in the second candidate set.
+
+class _PromptCall(NamedTuple):
+    """One model call of an operation: its prompt, and the pure steps that turn its outcome into a result."""
+    prompt: str
+    config: types.GenerateContentConfig
+    on_response: Callable[[Any], Any]  # Parses the response.
+    on_error: Callable[[Exception, Any], Any]  # Gets the error and the response, if any; returns a fallback or raises.
+
+class _Operation(NamedTuple):
+    """The calls a comparator method makes, and how their results combine into its return value."""
+    calls: List[_PromptCall]
+    finish: Callable[[List[Any]], Any]
+
+def _answered(value: Any) -> _Operation:
+    # An operation settled locally, without any model call.
+    return _Operation([], lambda results: value)
+
+_EMPTY_DESCRIPTIONS = {"fr": "", "en": "", "bm": ""}
+
+# Role, compared items and matching criterion of the batched similarity prompts.
+_SIMILARITY_SUBJECTS = {
+    "titles": ("You are an expert in French language.", "field labels written in French", "refer to the same concept, even if the wording is different"),
+    "formulas": ("You are an ODK XForm expert and developer.", "ODK XForms calculation formulas of calculate type fields", "achieve the same result, even if the formulas are different"),
+}
+
+class _VertexAIPrompts:
     """
-    An implementation of the SemanticComparatorRepository that uses the new Google Gen AI SDK.
+    Client setup, prompts and response parsing shared by the synchronous and
+    asynchronous Vertex AI comparators.
+
+    Every comparator method is built here as an _Operation; the subclasses only
+    send its calls to the model, one after the other or concurrently.
     """
+    # Bump whenever a prompt changes, so that cached responses to the old prompts are not reused.
+    PROMPT_VERSION = "1"
+    # Batched description prompts stay under this many input tokens, the shared form context included.
+    BATCH_INPUT_TOKEN_BUDGET = 100000
+    # Output tokens reserved per formula of a batch (three one-sentence descriptions and the JSON around them).
+    OUTPUT_TOKENS_PER_DESCRIPTION = 256
 
-    def __init__(self, logger: Logger):
+    def __init__(
+        self,
+        logger: Logger,
+        similarity_chunk_size: int = 40,
+        rate_limiter: Optional[RequestRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
         self._logger = logger
+        # Every model call takes a token from the (shared) limiter, if any, and transient errors are retried.
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy or RetryPolicy()
         self._client = genai.Client(vertexai=True, project='musohealth')
         self._model_id = "gemini-2.5-flash"
+        # At most this many items of each candidate set go into one batched similarity prompt.
+        self._similarity_chunk_size = max(1, int(similarity_chunk_size or 40))
+        self._max_output_tokens = 16384
         self._config = types.GenerateContentConfig(
-            max_output_tokens=16384
+            max_output_tokens=self._max_output_tokens
+        )
+        self._json_config = types.GenerateContentConfig(
+            max_output_tokens=self._max_output_tokens,
+            response_mime_type="application/json",
         )
-        
+
         # Load the static prompt template for XPath-like formulas
         try:
             prompt_path = os.path.join(os.path.dirname(__file__), '..', '..', 'xpath_inputs_prompt.txt')
@@ -33,56 +103,89 @@ class VertexAISemanticComparator(SemanticComparatorRepository):
             self._logger.log_error("xpath_input_prompt.txt not found. Contextual prompts will be disabled.")
             self._xpath_prompt_template = None
 
-    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
-        if not title1 or not title2:
-            return False
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """How long to wait before retrying a failed call, or None when it must not be retried."""
+        if attempt >= self._retry_policy.max_attempts or not _is_retryable(error):
+            return None
+        delay = self._retry_policy.delay(attempt)
+        self._logger.log_warning(f"Vertex AI call failed ({error}); retry {attempt} in {delay:.1f}s.")
+        return delay
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
 
-        prompt = f"""You are an expert in French language. 
+    @property
+    def prompt_version(self) -> str:
+        return self.PROMPT_VERSION
+
+    def _titles_prompt(self, title1: str, title2: str) -> str:
+        return f"""You are an expert in French language.
         Consider the following two field labels written in French:
         Label 1: '{title1}'
         Label 2: '{title2}'
-        Do these two labels refer to the same concept, even if the wording is different? 
+        Do these two labels refer to the same concept, even if the wording is different?
         Answer only with 'YES' or 'NO'."""
 
-        try:
-            response = self._client.models.generate_content(
-                model=self._model_id,
-                contents=[prompt],
-                config=self._config
-            )
-            return "YES" in response.text.upper()
-        except Exception as e:
-            self._logger.log_error(f"An error occurred while calling Vertex AI for title comparison: {e}")
-            return False
-
-    def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
-        if not formula1 or not formula2:
-            return False
-
-        prompt = f"""You are an ODK XForm expert and developer.
-        You are comparing two calculation formulas from two calculate type fields of a form. 
+    def _formulas_prompt(self, formula1: str, formula2: str) -> str:
+        return f"""You are an ODK XForm expert and developer.
+        You are comparing two calculation formulas from two calculate type fields of a form.
         The syntax is ODK XForms.
         Formula 1: '{formula1}'
         Formula 2: '{formula2}'
-        Do these two formulas achieve the same result, even if the formulas are different? 
+        Do these two formulas achieve the same result, even if the formulas are different?
         Answer only with 'YES' or 'NO'."""
 
-        try:
-            response = self._client.models.generate_content(
-                model=self._model_id,
-                contents=[prompt],
-                config=self._config
-            )
-            return "YES" in response.text.upper()
-        except Exception as e:
-            self._logger.log_error(f"An error occurred while calling Vertex AI for formula comparison: {e}")
-            return False
+    def _similarity_chunks(self, items1: List[str], items2: List[str]) -> List[_SimilarityChunk]:
+        # Empty items are never similar to anything, so they are not sent to the model.
+        rows = [i for i, item in enumerate(items1) if item]
+        columns = [j for j, item in enumerate(items2) if item]
+        size = self._similarity_chunk_size
+        return [
+            _SimilarityChunk(rows[r:r + size], columns[c:c + size])
+            for r in range(0, len(rows), size)
+            for c in range(0, len(columns), size)
+        ]
 
-    def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
-        if not formula or not form_context:
-            return {"fr": "", "en": "", "bm": ""}
+    def _similarity_prompt(self, kind: str, items1: List[str], items2: List[str], chunk: _SimilarityChunk) -> str:
+        role, subject, criterion = _SIMILARITY_SUBJECTS[kind]
+        list_a = "\n".join(f"        A{n}: '{items1[i]}'" for n, i in enumerate(chunk.rows))
+        list_b = "\n".join(f"        B{n}: '{items2[j]}'" for n, j in enumerate(chunk.columns))
+        return f"""{role}
+        Consider the following two lists of {subject}.
+        List A:
+{list_a}
+        List B:
+{list_b}
+        For every pair made of one item of list A and one item of list B, score whether they {criterion},
+        from 0.0 (unrelated) to 1.0 (certainly the same).
+
+        Your response MUST be a valid JSON object with a single key "matches".
+        Its value MUST be a list of objects with the keys "a" (the number of the A item), "b" (the number of the B item) and "score".
+        Only include the pairs with a score of at least 0.5.
+
+        Correct format example:
+        {{
+            "matches": [{{"a": 0, "b": 3, "score": 0.9}}]
+        }}
+        """
 
-        prompt = f"""
+    @staticmethod
+    def _apply_similarity_scores(matrix: List[List[float]], chunk: _SimilarityChunk, response) -> None:
+        for match in json.loads(response.text).get("matches", []):
+            a, b, score = int(match["a"]), int(match["b"]), float(match["score"])
+            if 0 <= a < len(chunk.rows) and 0 <= b < len(chunk.columns):
+                matrix[chunk.rows[a]][chunk.columns[b]] = min(max(score, 0.0), 1.0)
+
+    @staticmethod
+    def _mark_unscored(matrix: List[List[float]], chunk: _SimilarityChunk) -> None:
+        # NaN, not 0.0: the pairs of a failed prompt are unknown, so they must be neither matched nor cached.
+        for i in chunk.rows:
+            for j in chunk.columns:
+                matrix[i][j] = math.nan
+
+    def _context_description_prompt(self, formula: str, form_context: str) -> str:
+        return f"""
         You are an expert ODK XForms developer. Your task is to explain a calculation formula using the entire form as context.
 
         The full context of the form's 'survey' sheet is provided below in Markdown format:
@@ -94,7 +197,7 @@ class VertexAISemanticComparator(SemanticComparatorRepository):
         `{formula}`
 
         Based on the context, generate a brief, one-sentence description for each language explaining what this calculated field represents.
-        
+
         Your response MUST be a valid JSON object.
         The JSON object MUST have exactly three keys: "fr", "en", and "bm".
         The value for each key MUST be a simple string. DO NOT use nested objects.
@@ -107,59 +210,80 @@ class VertexAISemanticComparator(SemanticComparatorRepository):
         }}
         """
 
-        json_config = types.GenerateContentConfig(
-            max_output_tokens=16384,
-            response_mime_type="application/json",
-        )
-        try:
-            self._logger.log_info(f"Generating descriptions for formula: {formula} with full context.")
-            response = self._client.models.generate_content(
-                model=self._model_id,
-                contents=[prompt],
-                config=json_config
-            )
-            
-            descriptions = json.loads(response.text)
-
-            self._logger.log_info(f"Generated description (fr): {descriptions.get('fr', '')}")
-            return {
-                "fr": descriptions.get("fr", ""),
-                "en": descriptions.get("en", ""),
-                "bm": descriptions.get("bm", "")
-            }
-        except Exception as e:
-            self._logger.log_exception(f"An error occurred while generating descriptions for formula '{formula}': {e}")
-            try:
-                self._logger.log_error(f"Raw AI response text: {response.text}")
-            except:
-                pass
-            return {"fr": f"Error: {e}", "en": f"Error: {e}", "bm": f"Error: {e}"}
+    def _description_batches(self, formulas: List[str], form_context: str) -> List[List[int]]:
+        """Splits the indexes of the non-empty formulas into batches whose prompt and answer fit the token budgets."""
+        context_tokens = _estimate_tokens(form_context)
+        max_per_batch = max(1, self._max_output_tokens // self.OUTPUT_TOKENS_PER_DESCRIPTION)
+        batches, current, current_tokens = [], [], context_tokens
+        for i, formula in enumerate(formulas):
+            if not formula:
+                continue
+            formula_tokens = _estimate_tokens(formula) + 8
+            if current and (len(current) >= max_per_batch or current_tokens + formula_tokens > self.BATCH_INPUT_TOKEN_BUDGET):
+                batches.append(current)
+                current, current_tokens = [], context_tokens
+            current.append(i)
+            current_tokens += formula_tokens
+        if current:
+            batches.append(current)
+        return batches
 
-    def generate_descriptions_from_formula(
-        self, 
-        formula: str, 
-        context_description: Optional[str] = None
-    ) -> Dict[str, str]:
-        # This is the old method, kept to satisfy the abstract class contract.
-        if not formula:
-            return {"fr": "", "en": "", "bm": ""}
+    def _batch_description_prompt(self, formulas: List[str], form_context: str) -> str:
+        formula_list = "\n".join(f"        F{n}: `{formula}`" for n, formula in enumerate(formulas))
+        return f"""
+        You are an expert ODK XForms developer. Your task is to explain several calculation formulas of the same form, using the entire form as context.
 
-        simplified_formula = formula.replace('""', "'")
+        The full context of the form's 'survey' sheet is provided below in Markdown format:
+        ---
+        {form_context}
+        ---
+
+        The formulas you need to describe are:
+{formula_list}
 
+        Based on the context, generate for each formula a brief, one-sentence description for each language explaining what this calculated field represents.
+
+        Your response MUST be a valid JSON object with a single key "descriptions".
+        Its value MUST be a list with one object per formula, with exactly the keys "id" (the formula number, e.g. 0 for F0), "fr", "en" and "bm".
+        The values of "fr", "en" and "bm" MUST be simple strings. DO NOT use nested objects.
+
+        Correct format example:
+        {{
+            "descriptions": [
+                {{"id": 0, "fr": "Description in French.", "en": "Description in English.", "bm": "Description in Bamanankan."}}
+            ]
+        }}
+        """
+
+    def _apply_batch_descriptions(self, results: List[Dict[str, str]], indexes: List[int], response) -> None:
+        parsed: Dict[int, Dict[str, str]] = {}
+        for item in json.loads(response.text).get("descriptions", []):
+            n = int(item.get("id", -1))
+            if 0 <= n < len(indexes):
+                parsed[n] = {lang: str(item.get(lang, "")) for lang in ("fr", "en", "bm")}
+        for n, i in enumerate(indexes):
+            if n in parsed:
+                results[i] = parsed[n]
+            else:
+                self._logger.log_error(f"The batched response has no description for formula F{n}.")
+                results[i] = {lang: "Error: missing from the batched response" for lang in ("fr", "en", "bm")}
+
+    def _formula_description_prompt(self, simplified_formula: str, context_description: Optional[str]) -> str:
         if context_description and self._xpath_prompt_template:
-            prompt = self._xpath_prompt_template.format(
+            self._logger.log_info(f"using prompt: INPUTS")
+            return self._xpath_prompt_template.format(
                 explanation=context_description
             )
-            self._logger.log_info(f"using prompt: INPUTS")
-        else:
-            prompt = f"""
+
+        self._logger.log_info(f"using prompt: STANDARD")
+        return f"""
             You are an expert ODK XForms developer. Your task is to explain a calculation formula.
 
             The formula is:
             `{simplified_formula}`
 
             Generate a brief, one-sentence description for each language explaining what this calculated field represents.
-            
+
             Your response MUST be a valid JSON object.
             The JSON object MUST have exactly three keys: "fr", "en", and "bm".
             The value for each key MUST be a simple string. DO NOT use nested objects.
@@ -171,32 +295,228 @@ class VertexAISemanticComparator(SemanticComparatorRepository):
                 "bm": "Description in Bamanankan."
             }}
             """
-            self._logger.log_info(f"using prompt: STANDARD")
 
-        json_config = types.GenerateContentConfig(
-            max_output_tokens=16384,
-            response_mime_type="application/json",
-        )
-        try:
-            self._logger.log_info(f"Generating descriptions for simplified formula: {simplified_formula}")
-            response = self._client.models.generate_content(
-                model=self._model_id,
-                contents=[prompt],
-                config=json_config
-            )
-            
-            descriptions = json.loads(response.text)
-
-            self._logger.log_info(f"description: {descriptions.get('fr', '')}")
-            return {
-                "fr": descriptions.get("fr", ""),
-                "en": descriptions.get("en", ""),
-                "bm": descriptions.get("bm", "")
-            }
-        except Exception as e:
-            self._logger.log_exception(f"An error occurred while generating descriptions for formula '{formula}': {e}")
+    @staticmethod
+    def _parse_descriptions(response) -> Dict[str, str]:
+        descriptions = json.loads(response.text)
+        return {
+            "fr": descriptions.get("fr", ""),
+            "en": descriptions.get("en", ""),
+            "bm": descriptions.get("bm", "")
+        }
+
+    def _log_description_error(self, formula: str, error: Exception, response) -> Dict[str, str]:
+        self._logger.log_exception(f"An error occurred while generating descriptions for formula '{formula}': {error}")
+        if response is not None:
             try:
                 self._logger.log_error(f"Raw AI response text: {response.text}")
             except:
                 pass
-            return {"fr": f"Error: {e}", "en": f"Error: {e}", "bm": f"Error: {e}"}
+        return {"fr": f"Error: {error}", "en": f"Error: {error}", "bm": f"Error: {error}"}
+
+    def _yes_no_operation(self, prompt: str, subject: str) -> _Operation:
+        def on_error(error: Exception, response) -> bool:
+            # Re-raised so that a failed call is not taken, or cached, as a 'NO'.
+            self._logger.log_error(f"An error occurred while calling Vertex AI for {subject} comparison: {error}")
+            raise error
+        call = _PromptCall(prompt, self._config, lambda response: "YES" in response.text.upper(), on_error)
+        return _Operation([call], lambda results: results[0])
+
+    def _titles_operation(self, title1: str, title2: str) -> _Operation:
+        if not title1 or not title2:
+            return _answered(False)
+        return self._yes_no_operation(self._titles_prompt(title1, title2), "title")
+
+    def _formulas_operation(self, formula1: str, formula2: str) -> _Operation:
+        if not formula1 or not formula2:
+            return _answered(False)
+        if are_formulas_equivalent(formula1, formula2):
+            return _answered(True) # Same canonical expression: no model call needed.
+        return self._yes_no_operation(self._formulas_prompt(formula1, formula2), "formula")
+
+    def _similarity_operation(self, kind: str, items1: List[str], items2: List[str]) -> _Operation:
+        matrix = [[0.0] * len(items2) for _ in items1]
+
+        def chunk_call(chunk: _SimilarityChunk) -> _PromptCall:
+            def on_error(error: Exception, response):
+                self._logger.log_error(f"An error occurred while calling Vertex AI for batched {kind} comparison: {error}")
+                self._mark_unscored(matrix, chunk)
+            return _PromptCall(
+                self._similarity_prompt(kind, items1, items2, chunk), self._json_config,
+                lambda response: self._apply_similarity_scores(matrix, chunk, response), on_error
+            )
+
+        return _Operation([chunk_call(chunk) for chunk in self._similarity_chunks(items1, items2)], lambda results: matrix)
+
+    def _descriptions_call(self, prompt: str, formula: str, log_prefix: str) -> _PromptCall:
+        def on_response(response) -> Dict[str, str]:
+            descriptions = self._parse_descriptions(response)
+            self._logger.log_info(f"{log_prefix}: {descriptions['fr']}")
+            return descriptions
+        return _PromptCall(prompt, self._json_config, on_response, lambda error, response: self._log_description_error(formula, error, response))
+
+    def _context_description_operation(self, formula: str, form_context: str) -> _Operation:
+        if not formula or not form_context:
+            return _answered(dict(_EMPTY_DESCRIPTIONS))
+        self._logger.log_info(f"Generating descriptions for formula: {formula} with full context.")
+        call = self._descriptions_call(self._context_description_prompt(formula, form_context), formula, "Generated description (fr)")
+        return _Operation([call], lambda results: results[0])
+
+    def _batch_descriptions_operation(self, formulas: List[str], form_context: str) -> _Operation:
+        results = [dict(_EMPTY_DESCRIPTIONS) for _ in formulas]
+        if not form_context:
+            return _answered(results)
+
+        def batch_call(indexes: List[int]) -> _PromptCall:
+            def on_error(error: Exception, response):
+                description_error = self._log_description_error(f"batch of {len(indexes)}", error, response)
+                for i in indexes:
+                    results[i] = dict(description_error)
+            self._logger.log_info(f"Generating descriptions for {len(indexes)} formulas with one shared context.")
+            return _PromptCall(
+                self._batch_description_prompt([formulas[i] for i in indexes], form_context), self._json_config,
+                lambda response: self._apply_batch_descriptions(results, indexes, response), on_error
+            )
+
+        return _Operation([batch_call(indexes) for indexes in self._description_batches(formulas, form_context)], lambda _: results)
+
+    def _formula_description_operation(self, formula: str, context_description: Optional[str]) -> _Operation:
+        if not formula:
+            return _answered(dict(_EMPTY_DESCRIPTIONS))
+        simplified_formula = formula.replace('""', "'")
+        prompt = self._formula_description_prompt(simplified_formula, context_description)
+        self._logger.log_info(f"Generating descriptions for simplified formula: {simplified_formula}")
+        call = self._descriptions_call(prompt, formula, "description")
+        return _Operation([call], lambda results: results[0])
+
+class VertexAISemanticComparator(_VertexAIPrompts, SemanticComparatorRepository):
+    """
+    An implementation of the SemanticComparatorRepository that uses the new Google Gen AI SDK.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        similarity_chunk_size: int = 40,
+        rate_limiter: Optional[RequestRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        super().__init__(logger, similarity_chunk_size, rate_limiter, retry_policy)
+
+    def _generate(self, contents: List[str], config: types.GenerateContentConfig):
+        attempt = 1
+        while True:
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            try:
+                return self._client.models.generate_content(model=self._model_id, contents=contents, config=config)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _call(self, call: _PromptCall):
+        response = None
+        try:
+            response = self._generate([call.prompt], call.config)
+            return call.on_response(response)
+        except Exception as e:
+            return call.on_error(e, response)
+
+    def _run(self, operation: _Operation):
+        return operation.finish([self._call(call) for call in operation.calls])
+
+    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        return self._run(self._titles_operation(title1, title2))
+
+    def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return self._run(self._formulas_operation(formula1, formula2))
+
+    def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        return self._run(self._similarity_operation("titles", titles1, titles2))
+
+    def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        return self._run(self._similarity_operation("formulas", formulas1, formulas2))
+
+    def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        return self._run(self._context_description_operation(formula, form_context))
+
+    def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        return self._run(self._batch_descriptions_operation(formulas, form_context))
+
+    def generate_descriptions_from_formula(
+        self,
+        formula: str,
+        context_description: Optional[str] = None
+    ) -> Dict[str, str]:
+        # This is the old method, kept to satisfy the abstract class contract.
+        return self._run(self._formula_description_operation(formula, context_description))
+
+class AsyncVertexAISemanticComparator(_VertexAIPrompts, AsyncSemanticComparatorRepository):
+    """
+    An implementation of the AsyncSemanticComparatorRepository on the Gen AI SDK's native
+    asyncio client (`client.aio`), so concurrent model calls do not each hold a thread.
+    Prompts and error handling are the same as VertexAISemanticComparator; the calls of
+    one operation (similarity chunks, description batches) are sent concurrently.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        similarity_chunk_size: int = 40,
+        rate_limiter: Optional[RequestRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        super().__init__(logger, similarity_chunk_size, rate_limiter, retry_policy)
+
+    async def _generate(self, contents: List[str], config: types.GenerateContentConfig):
+        attempt = 1
+        while True:
+            if self._rate_limiter:
+                await self._rate_limiter.acquire_async()
+            try:
+                return await self._client.aio.models.generate_content(model=self._model_id, contents=contents, config=config)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _call(self, call: _PromptCall):
+        response = None
+        try:
+            response = await self._generate([call.prompt], call.config)
+            return call.on_response(response)
+        except Exception as e:
+            return call.on_error(e, response)
+
+    async def _run(self, operation: _Operation):
+        return operation.finish(await asyncio.gather(*(self._call(call) for call in operation.calls)))
+
+    async def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        return await self._run(self._titles_operation(title1, title2))
+
+    async def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return await self._run(self._formulas_operation(formula1, formula2))
+
+    async def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        return await self._run(self._similarity_operation("titles", titles1, titles2))
+
+    async def score_formula_similarities(self, formulas1: List[str], formulas2: List[str]) -> List[List[float]]:
+        return await self._run(self._similarity_operation("formulas", formulas1, formulas2))
+
+    async def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        return await self._run(self._context_description_operation(formula, form_context))
+
+    async def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        return await self._run(self._batch_descriptions_operation(formulas, form_context))
+
+    async def generate_descriptions_from_formula(
+        self,
+        formula: str,
+        context_description: Optional[str] = None
+    ) -> Dict[str, str]:
+        return await self._run(self._formula_description_operation(formula, context_description))
@@ -0,0 +1,288 @@
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from domain.entities.CHTElement import CHTElement
+from domain.entities.RichCHTElement import RichCHTElement
+from infrastructure.repositories.xlsform_workbook import XLSFormWorkbook, load_xlsform_workbook
+
+DB_DOC_TRUE_VALUES = ['true', '1', 'yes', '1.0']
+# Cell texts pd.read_excel reads as NaN by default.
+NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+TITLE_COLUMNS = {'fr': 'label::fr', 'en': 'label::en', 'bm': 'label::bm'}
+
+class SurveyRow(NamedTuple):
+    """One row of the 'survey' sheet, reduced to the cells the element views need."""
+    line: int
+    type: str
+    name: str
+    has_name: bool
+    is_db_doc: bool
+    titles: Dict[str, str]
+    calculation: str
+
+class XLSFormModel:
+    """
+    A compact, engine-independent model of an XLSForm, built in a single pass over its
+    'survey' sheet. Both element views are projections of it:
+
+    - `cht_element_groups()` gives the CHTElement structure with repeat and db-doc awareness;
+    - `rich_elements()` gives the RichCHTElement list with titles and calculations.
+    """
+
+    def __init__(self, form_name: Any, rows: List[SurveyRow]):
+        self.form_name = form_name
+        self.rows = rows
+
+    # --- Builders ---
+
+    @classmethod
+    def from_dataframe(cls, form_name: Any, survey_df: pd.DataFrame) -> "XLSFormModel":
+        """Builds the model from a 'survey' sheet read by pandas."""
+        survey_df = survey_df.fillna('')
+        columns = list(survey_df.columns)
+
+        def position(column: str) -> Optional[int]:
+            return columns.index(column) if column in columns else None
+
+        type_pos, name_pos = position('type'), position('name')
+        db_doc_pos, calculation_pos = position('instance::db-doc'), position('calculation')
+        title_pos = {lang: position(column) for lang, column in TITLE_COLUMNS.items()}
+
+        def text(values: tuple, pos: Optional[int], default: str = '') -> str:
+            return str(values[pos]) if pos is not None else default
+
+        rows = []
+        for index, *values in survey_df.itertuples(index=True, name=None):
+            rows.append(SurveyRow(
+                line=index + 2,
+                type=text(values, type_pos),
+                name=text(values, name_pos),
+                has_name=name_pos is not None,
+                is_db_doc=text(values, db_doc_pos, 'false').lower() in DB_DOC_TRUE_VALUES,
+                titles={lang: text(values, pos) for lang, pos in title_pos.items()},
+                calculation=text(values, calculation_pos)
+            ))
+        return cls(form_name, rows)
+
+    @classmethod
+    def from_rows(cls, settings_rows: Optional[List[Sequence[Any]]], survey_rows: List[Sequence[Any]]) -> "XLSFormModel":
+        """
+        Builds the model from raw openpyxl row tuples (header row first), rendering cells
+        exactly as the pandas engine does after fillna('').
+        """
+        form_name = cls._form_name_from_rows(settings_rows)
+
+        columns = _column_indexes(survey_rows[0] if survey_rows else ())
+        data_rows = _trim_trailing_empty_rows(survey_rows[1:])
+        wanted = ['type', 'name', 'instance::db-doc', 'calculation'] + list(TITLE_COLUMNS.values())
+        texts = {column: _render_column(data_rows, columns[column]) for column in wanted if column in columns}
+        empty = [''] * len(data_rows)
+
+        rows = []
+        for i in range(len(data_rows)):
+            db_doc_val = texts['instance::db-doc'][i].lower() if 'instance::db-doc' in texts else 'false'
+            rows.append(SurveyRow(
+                line=i + 2,
+                type=texts.get('type', empty)[i],
+                name=texts.get('name', empty)[i],
+                has_name='name' in texts,
+                is_db_doc=db_doc_val in DB_DOC_TRUE_VALUES,
+                titles={lang: texts.get(column, empty)[i] for lang, column in TITLE_COLUMNS.items()},
+                calculation=texts.get('calculation', empty)[i]
+            ))
+        return cls(form_name, rows)
+
+    @staticmethod
+    def _form_name_from_rows(settings_rows: Optional[List[Sequence[Any]]]) -> Any:
+        if not settings_rows:
+            return 'my_form'
+        columns = _column_indexes(settings_rows[0])
+        data_rows = _trim_trailing_empty_rows(settings_rows[1:])
+        if 'form_id' not in columns or not data_rows:
+            return 'my_form'
+        value = _convert_cell(_cell(data_rows[0], columns['form_id']))
+        # pandas reports an empty first settings row as NaN, which the paths then render as 'nan'.
+        return value if value is not None else 'nan'
+
+    # --- Projections ---
+
+    def cht_element_groups(self) -> Dict[str, Any]:
+        """
+        Runs the XLSForm state machine over the survey rows and correctly handles all
+        nested group, repeat and db-doc contexts.
+
+        Returns:
+            Dict[str, Any]: The "main_elements", "repeat_groups" and "db_doc_groups" of the form.
+        """
+        form_name = self.form_name
+        main_elements, repeats_data, db_docs_data = [], {}, {}
+        group_stack = []
+        active_repeat = None
+        active_db_doc = None
+
+        for row in self.rows:
+            excel_line_number, q_type, q_name = row.line, row.type, row.name
+
+            # --- STATE TRANSITIONS ---
+            if 'begin group' in q_type:
+                group_name = q_name if q_name and q_name != 'nan' else f'unnamed_group_{excel_line_number}'
+                if active_db_doc:
+                    active_db_doc['group_stack'].append(group_name)
+                elif active_repeat:
+                    active_repeat['group_stack'].append(group_name)
+                else:
+                    group_stack.append(group_name)
+
+                if row.is_db_doc and not active_db_doc:
+                    active_db_doc = {"name": group_name, "elements": [], "group_stack": []}
+                continue
+
+            elif 'end group' in q_type:
+                if active_db_doc:
+                    if active_db_doc['group_stack']:
+                        active_db_doc['group_stack'].pop()
+                    else:
+                        db_docs_data[active_db_doc['name']] = active_db_doc['elements']
+                        active_db_doc = None
+                        group_stack.pop()
+                elif active_repeat:
+                    if active_repeat['group_stack']:
+                        active_repeat['group_stack'].pop()
+                elif group_stack:
+                    group_stack.pop()
+                continue
+
+            elif 'begin repeat' in q_type:
+                parent_json_path = '$.fields.' + '.'.join(group_stack + [q_name])
+                active_repeat = {"name": q_name, "elements": [], "group_stack": [], "json_path_in_parent": parent_json_path}
+                continue
+            elif 'end repeat' in q_type:
+                if active_repeat:
+                    repeats_data[active_repeat["name"]] = {"elements": active_repeat["elements"], "json_path_in_parent": active_repeat["json_path_in_parent"]}
+                active_repeat = None
+                continue
+
+            # --- ELEMENT PROCESSING ---
+            if not row.has_name or not q_name or q_name == 'nan':
+                continue
+
+            if active_db_doc:
+                path_parts = active_db_doc["group_stack"] + [q_name]
+                path = f"/{form_name}/{active_db_doc['name']}/{'/'.join(path_parts)}"
+                json_path = '$.' + '.'.join(path_parts) if q_type != 'note' else None
+                active_db_doc["elements"].append(CHTElement(q_name, False, q_type, path, excel_line_number, json_path))
+            elif active_repeat:
+                path_parts = active_repeat["group_stack"] + [q_name]
+                path = f"/{active_repeat['name']}/{'/'.join(path_parts)}"
+                json_path = '$.' + '.'.join(path_parts) if q_type != 'note' else None
+                active_repeat["elements"].append(CHTElement(q_name, False, q_type, path, excel_line_number, json_path))
+            else:
+                path_parts = group_stack + [q_name]
+                path = f"/{form_name}/{'/'.join(path_parts)}"
+                json_path = None
+                if q_type != 'note':
+                    if group_stack and group_stack[0] == 'inputs':
+                        json_path = '$.' + '.'.join(path_parts)
+                    else:
+                        json_path = '$.fields.' + '.'.join(path_parts)
+                main_elements.append(CHTElement(q_name, False, q_type, path, excel_line_number, json_path))
+
+        return {"main_elements": main_elements, "repeat_groups": repeats_data, "db_doc_groups": db_docs_data}
+
+    def rich_elements(self) -> List[RichCHTElement]:
+        """Returns every survey row as a RichCHTElement with its titles and calculation (groups included, no repeat awareness)."""
+        form_name = self.form_name
+        elements = []
+        group_stack = []
+
+        for row in self.rows:
+            q_type, q_name = row.type, row.name
+            is_group = 'begin group' in q_type
+
+            if 'begin group' in q_type:
+                path = f"/{form_name}/{'/'.join(group_stack)}/{q_name}" if group_stack else f"/{form_name}/{q_name}"
+                group_stack.append(q_name)
+            elif 'end group' in q_type:
+                if group_stack:
+                    group_stack.pop()
+                continue
+            else:
+                path = f"/{form_name}/{'/'.join(group_stack)}/{q_name}" if group_stack else f"/{form_name}/{q_name}"
+
+            elements.append(RichCHTElement(
+                question_name=q_name,
+                group=is_group,
+                odk_type=q_type,
+                path=path,
+                excel_line_number=row.line,
+                titles=dict(row.titles),
+                calculation=row.calculation if row.calculation else None
+            ))
+
+        return elements
+
+def load_xlsform_model(file_content: bytes, engine: str = "pandas") -> XLSFormModel:
+    """
+    Returns the XLSFormModel of the given file, built once per workbook and engine.
+
+    Args:
+        file_content (bytes): The binary content of the .xlsx file.
+        engine (str): "pandas" to read the sheets as DataFrames, "openpyxl" to walk raw row tuples.
+
+    Raises:
+        ValueError: If the workbook has no 'survey' sheet or the engine is unknown.
+    """
+    workbook = load_xlsform_workbook(file_content)
+    if engine == "pandas":
+        return workbook.memoize("model:pandas", lambda: XLSFormModel.from_dataframe(workbook.form_name, workbook.get_sheet('survey')))
+    if engine == "openpyxl":
+        return workbook.memoize("model:openpyxl", lambda: _model_from_workbook_rows(workbook))
+    raise ValueError(f"Unknown XLSForm engine '{engine}'.")
+
+def _model_from_workbook_rows(workbook: XLSFormWorkbook) -> XLSFormModel:
+    settings_rows = workbook.get_rows('settings') if 'settings' in workbook.sheet_names else None
+    return XLSFormModel.from_rows(settings_rows, workbook.get_rows('survey'))
+
+# --- Cell rendering helpers for raw openpyxl rows ---
+
+def _column_indexes(header: Sequence[Any]) -> Dict[str, int]:
+    columns = {}
+    for index, value in enumerate(header):
+        if value is not None:
+            # Like pandas, a duplicated header keeps its first column.
+            columns.setdefault(str(value), index)
+    return columns
+
+def _cell(row: Sequence[Any], index: int) -> Any:
+    return row[index] if index < len(row) else None
+
+def _trim_trailing_empty_rows(rows: List[Sequence[Any]]) -> List[Sequence[Any]]:
+    end = len(rows)
+    while end and all(value is None or value == '' for value in rows[end - 1]):
+        end -= 1
+    return rows[:end]
+
+def _convert_cell(value: Any) -> Any:
+    # pandas turns integral floats into ints when reading a cell.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    return value
+
+def _render_column(rows: List[Sequence[Any]], index: int) -> List[str]:
+    """Renders one column as str(cell) after fillna(''), honouring the dtype pandas would infer for it."""
+    values = [_convert_cell(_cell(row, index)) for row in rows]
+    present = [value for value in values if value is not None]
+    is_numeric = bool(present) and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present)
+    # A numeric column with blanks or fractional values becomes float64, so integers render as "1.0".
+    as_float = is_numeric and (len(present) < len(values) or any(isinstance(value, float) for value in present))
+    return ['' if value is None else str(float(value)) if as_float else str(value) for value in values]
@@ -0,0 +1,97 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+class XLSFormWorkbook:
+    """
+    A parsed .xlsx file that is opened once and exposes its sheets lazily.
+
+    The zip archive and workbook metadata are read a single time when the object is built;
+    each sheet is then parsed on first access only, either as a DataFrame (pandas engines)
+    or as plain row tuples (openpyxl engine), and kept for later callers. Returned objects
+    are shared and must be treated as read-only.
+    """
+
+    def __init__(self, file_content: bytes):
+        self._excel_file = pd.ExcelFile(io.BytesIO(file_content), engine='openpyxl')
+        self._sheets: Dict[str, pd.DataFrame] = {}
+        self._rows: Dict[str, List[Tuple[Any, ...]]] = {}
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return self._excel_file.sheet_names
+
+    def get_sheet(self, sheet_name: str) -> pd.DataFrame:
+        """
+        Returns a sheet as read by pd.read_excel (first row as header, empty cells as NaN).
+
+        Raises:
+            ValueError: If the workbook has no sheet with that name.
+        """
+        with self._lock:
+            if sheet_name not in self._sheets:
+                self._sheets[sheet_name] = self._excel_file.parse(sheet_name=sheet_name)
+            return self._sheets[sheet_name]
+
+    def get_rows(self, sheet_name: str) -> List[Tuple[Any, ...]]:
+        """
+        Returns the raw cell values of a sheet, header row included, as plain tuples.
+
+        Raises:
+            ValueError: If the workbook has no sheet with that name.
+        """
+        with self._lock:
+            if sheet_name not in self._rows:
+                if sheet_name not in self.sheet_names:
+                    raise ValueError(f"Worksheet named '{sheet_name}' not found")
+                sheet = self._excel_file.book[sheet_name]
+                # Some writers store a wrong sheet dimension, which would truncate a read-only sheet.
+                sheet.reset_dimensions()
+                self._rows[sheet_name] = list(sheet.iter_rows(values_only=True))
+            return self._rows[sheet_name]
+
+    def memoize(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Builds an object derived from this workbook (e.g. a parsed form model) once and returns it on later calls."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory()
+            return self._derived[key]
+
+    @property
+    def form_name(self) -> Any:
+        """The form_id of the 'settings' sheet, or 'my_form' when it cannot be read."""
+        try:
+            return self.get_sheet('settings').iloc[0]['form_id']
+        except (ValueError, KeyError, IndexError):
+            return 'my_form'
+
+_CACHE_SIZE = 32
+_cache: "OrderedDict[str, XLSFormWorkbook]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def load_xlsform_workbook(file_content: bytes) -> XLSFormWorkbook:
+    """
+    Returns the parsed workbook for the given file content, memoized by content hash so that
+    every parser of the same form within a run shares a single load.
+    """
+    content_hash = hashlib.sha256(file_content).hexdigest()
+    with _cache_lock:
+        workbook = _cache.get(content_hash)
+        if workbook is not None:
+            _cache.move_to_end(content_hash)
+            return workbook
+
+    workbook = XLSFormWorkbook(file_content)
+    with _cache_lock:
+        # Another thread may have loaded the same content meanwhile; keep a single instance.
+        workbook = _cache.setdefault(content_hash, workbook)
+        _cache.move_to_end(content_hash)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return workbook
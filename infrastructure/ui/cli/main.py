@@ -1,15 +1,21 @@
 import click
+import json
 import sys
 import os
+from dataclasses import asdict
+from typing import Iterable
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 # Import service contracts and DTOs
 from application.contracts.form_comparator_service import FormComparatorService
+from application.contracts.data_catalog_service import DataCatalogService
+from application.contracts.bulk_audit_service import BulkAuditService
+from domain.contracts.catalog_export_repository import CatalogExportRepository
 from domain.contracts.code_repository import CodeRepository
 from domain.contracts.data_warehouse_repository import DataWarehouseRepository
-from application.dtos import ComparisonResultDTO
+from application.dtos import ComparisonResultDTO, ProgressEventDTO
 
 @click.group()
 @click.pass_context
@@ -73,10 +79,71 @@ def compare_sql(ctx, country, github_form, bigquery_view):
         click.secho(f"Error during comparison: {e}", fg="red", err=True)
         sys.exit(1)
 
+@cli.command("export-catalog")
+@click.option('--country', 'countries', required=True, multiple=True, help='Country code (e.g., RCI, MALI). Repeat the option to export several countries to one file.')
+@click.option('--output', required=True, type=click.Path(dir_okay=False), help='Path of the file to write.')
+@click.option('--format', 'file_format', type=click.Choice(CatalogExportRepository.FORMATS), default='parquet', show_default=True, help='Output format. Parquet and Feather files can be memory-mapped.')
+@click.option('--incremental/--full', default=True, show_default=True, help='Only regenerate the forms changed since the stored catalog.')
+@click.pass_context
+def export_catalog(ctx, countries, output, file_format, incremental):
+    """Generates the data catalog of one or more countries and writes it to a file."""
+    data_catalog_service: DataCatalogService = ctx.obj['data_catalog_service']
+    catalog_export_repository: CatalogExportRepository = ctx.obj['catalog_export_repository']
+
+    def catalog_rows():
+        # Countries are generated one at a time, and each one's rows are streamed to the writer before the next.
+        for country in countries:
+            click.echo(f"Generating the data catalog for '{country}'...", err=True)
+            result = data_catalog_service.generate_catalog(country.upper(), incremental=incremental)
+            click.echo(f"{len(result.catalog_rows)} entries ({len(result.added_rows)} added, {len(result.removed_rows)} removed).", err=True)
+            yield from result.catalog_rows
+
+    try:
+        catalog_export_repository.export(catalog_rows(), output, file_format)
+        click.secho(f"Data catalog written to '{output}'.", fg="green")
+    except Exception as e:
+        click.secho(f"Error during catalog export: {e}", fg="red", err=True)
+        sys.exit(1)
+
+def _echo_ndjson(events: Iterable[ProgressEventDTO]):
+    """Writes each progress event as one JSON line on stdout, flushed as soon as it happens."""
+    for event in events:
+        click.echo(json.dumps(asdict(event), ensure_ascii=False, default=str))
+        sys.stdout.flush()
+
+@cli.command("audit")
+@click.option('--country', required=True, help='Country code (e.g., RCI, MALI).')
+@click.option('--incremental/--full', default=True, show_default=True, help='Only re-audit the forms changed since the last audit.')
+@click.pass_context
+def audit(ctx, country, incremental):
+    """Audits every installed form of a country, streaming progress and per-form results as NDJSON."""
+    bulk_audit_service: BulkAuditService = ctx.obj['bulk_audit_service']
+    try:
+        _echo_ndjson(bulk_audit_service.stream_audit(country.upper(), incremental=incremental))
+    except Exception as e:
+        click.secho(f"Error during audit: {e}", fg="red", err=True)
+        sys.exit(1)
+
+@cli.command("catalog")
+@click.option('--country', required=True, help='Country code (e.g., RCI, MALI).')
+@click.option('--incremental/--full', default=True, show_default=True, help='Only regenerate the forms changed since the stored catalog.')
+@click.pass_context
+def catalog(ctx, country, incremental):
+    """Generates the data catalog of a country, streaming progress and each form's rows as NDJSON."""
+    data_catalog_service: DataCatalogService = ctx.obj['data_catalog_service']
+    try:
+        _echo_ndjson(data_catalog_service.stream_catalog(country.upper(), incremental=incremental))
+    except Exception as e:
+        click.secho(f"Error during catalog generation: {e}", fg="red", err=True)
+        sys.exit(1)
+
 def build_ui(
     form_comparator_service: FormComparatorService,
     code_repository: CodeRepository,
     data_warehouse_repository: DataWarehouseRepository,
+    bulk_audit_service: BulkAuditService,
+    data_catalog_service: DataCatalogService,
+    catalog_export_repository: CatalogExportRepository,
     # Add other services as needed for future CLI commands
     **kwargs # Catch any extra services not explicitly used by the CLI for now
 ):
@@ -90,6 +157,9 @@ def build_ui(
         'form_comparator_service': form_comparator_service,
         'code_repository': code_repository,
         'data_warehouse_repository': data_warehouse_repository,
+        'bulk_audit_service': bulk_audit_service,
+        'data_catalog_service': data_catalog_service,
+        'catalog_export_repository': catalog_export_repository,
         # Add other services here as they become relevant to CLI commands
     })
     
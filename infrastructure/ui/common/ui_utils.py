@@ -0,0 +1,27 @@
+# Display helpers shared by the Streamlit and PyQt UIs; nothing here depends on either toolkit.
+from application.dtos import NotFoundElementDTO, ProgressEventDTO, SingleFormComparisonResultDTO
+
+def is_critical_missing_element(item: NotFoundElementDTO, country_code: str) -> bool:
+    """Whether a missing main-body element counts as a discrepancy: inputs, prescription_summary and RCI `_bm` fields do not."""
+    return not (
+        item.json_path.startswith('$.inputs')
+        or 'prescription_summary' in item.json_path
+        or (country_code == 'RCI' and item.element_name.endswith('_bm'))
+    )
+
+def has_critical_discrepancies(form: SingleFormComparisonResultDTO, country_code: str) -> bool:
+    """Whether an audited form is marked ❌: a repeat or db-doc group without a view or with missing elements, or a critical missing element."""
+    return (
+        any(rg.handling_method == 'NOT_FOUND' or rg.not_found_elements for rg in form.repeat_groups)
+        or any(not dbg.view_found or dbg.not_found_elements for dbg in form.db_doc_groups)
+        or any(is_critical_missing_element(item, country_code) for item in form.not_found_elements)
+    )
+
+def describe_progress(event: ProgressEventDTO) -> str:
+    """One-line text for the progress bar of a streamed operation: stage, forms done and time left."""
+    text = f"{event.stage.capitalize()}: {event.forms_done}/{event.forms_total} forms"
+    if event.form_id:
+        text += f" (last: {event.form_id})"
+    if event.eta_seconds is not None:
+        text += f" - about {int(event.eta_seconds // 60)} min {int(event.eta_seconds % 60)} s left"
+    return text
@@ -1,9 +1,113 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+import sys
+import os
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox,
+                             QComboBox, QLabel, QTextEdit, QProgressBar, QMessageBox)
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from application.contracts.bulk_audit_service import BulkAuditService
+from application.dtos import BulkAuditResultDTO, ProgressEventDTO
+from infrastructure.ui.common.ui_utils import describe_progress, has_critical_discrepancies
+
+class AuditWorker(QThread):
+    """Runs a streamed audit off the UI thread and forwards each progress event as a signal."""
+    progress = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, bulk_audit_service: BulkAuditService, country_code: str, incremental: bool, parent=None):
+        super().__init__(parent)
+        self.bulk_audit_service = bulk_audit_service
+        self.country_code = country_code
+        self.incremental = incremental
+
+    def run(self):
+        try:
+            for event in self.bulk_audit_service.stream_audit(self.country_code, incremental=self.incremental):
+                self.progress.emit(event)
+        except Exception as e:
+            self.failed.emit(str(e))
 
 class BulkAuditTab(QWidget):
-    def __init__(self, bulk_audit_service, parent=None):
+    def __init__(self, bulk_audit_service: BulkAuditService, parent=None):
         super().__init__(parent)
-        self.bulk_audit_service = bulk_audit_service # Store service for future use
-        layout = QVBoxLayout()
-        layout.addWidget(QLabel("Bulk Audit Tab Content (Coming Soon)"))
-        self.setLayout(layout)
+        self.bulk_audit_service = bulk_audit_service
+        self.worker = None
+
+        self.init_ui()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout()
+
+        # --- Options Section ---
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Country:"))
+        self.country_combo = QComboBox()
+        self.country_combo.addItems(["MALI", "RCI"])
+        options_layout.addWidget(self.country_combo)
+        self.chk_incremental = QCheckBox("Only re-audit forms changed since the last audit")
+        self.chk_incremental.setChecked(True)
+        options_layout.addWidget(self.chk_incremental)
+        main_layout.addLayout(options_layout)
+
+        # --- Run Button ---
+        self.btn_run = QPushButton("Run Full Audit")
+        self.btn_run.clicked.connect(self.run_audit)
+        main_layout.addWidget(self.btn_run)
+
+        # --- Progress ---
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_label = QLabel("")
+        main_layout.addWidget(self.progress_bar)
+        main_layout.addWidget(self.progress_label)
+
+        # --- Results Display ---
+        self.results_text_edit = QTextEdit()
+        self.results_text_edit.setReadOnly(True)
+        main_layout.addWidget(self.results_text_edit)
+
+        self.setLayout(main_layout)
+
+    def run_audit(self):
+        self.btn_run.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.results_text_edit.clear()
+
+        self.worker = AuditWorker(self.bulk_audit_service, self.country_combo.currentText(), self.chk_incremental.isChecked(), self)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.finished.connect(lambda: self.btn_run.setEnabled(True))
+        self.worker.start()
+
+    def on_progress(self, event: ProgressEventDTO):
+        self.progress_bar.setValue(int(event.fraction_done * 100))
+        self.progress_label.setText(describe_progress(event))
+
+        if event.stage == "auditing" and event.form_result is not None:
+            form = event.form_result
+            self.results_text_edit.append(f"{'❌' if has_critical_discrepancies(form, self.worker.country_code) else '✅'} {form.form_id}")
+        elif event.stage == "done":
+            self.display_summary(event.result, self.worker.country_code)
+
+    def on_failed(self, message: str):
+        QMessageBox.critical(self, "Audit Error", f"An error occurred during the audit: {message}")
+
+    def display_summary(self, result: BulkAuditResultDTO, country_code: str):
+        # Only the forms the live list marks ❌ are counted and detailed, as in the Streamlit summary.
+        critical_forms = [form for form in result.compared_forms if has_critical_discrepancies(form, country_code)]
+        report = ["", "--- Audit Summary ---"]
+        report.append(f"Forms with discrepancies: {len(critical_forms)}")
+        report.append(f"Missing XLSForms: {', '.join(result.missing_xlsforms) or 'none'}")
+        report.append(f"Invalid XLSForms: {', '.join(result.invalid_xlsforms) or 'none'}")
+        report.append(f"Missing views: {', '.join(result.missing_views) or 'none'}")
+        for form in critical_forms:
+            report.append(f"\n- {form.form_id}")
+            for item in form.not_found_elements:
+                report.append(f"  Not found: {item.element_name} ({item.json_path})")
+            for group in form.repeat_groups:
+                report.append(f"  Repeat group '{group.repeat_group_name}': {group.handling_method}, {len(group.not_found_elements)} not found")
+            for group in form.db_doc_groups:
+                report.append(f"  db-doc group '{group.group_name}': {'view found' if group.view_found else 'view missing'}, {len(group.not_found_elements)} not found")
+        self.results_text_edit.append("\n".join(report))
@@ -5,6 +5,7 @@ from application.contracts.bulk_audit_service import BulkAuditService
 from application.contracts.xlsform_comparator_service import XLSFormComparatorService
 from application.contracts.data_catalog_service import DataCatalogService
 from application.contracts.data_catalog_enrichment_service import DataCatalogEnrichmentService
+from domain.contracts.catalog_export_repository import CatalogExportRepository
 from domain.contracts.code_repository import CodeRepository
 from domain.contracts.cicd_repository import CICDRepository
 from domain.contracts.data_warehouse_repository import DataWarehouseRepository
@@ -27,7 +28,8 @@ def build_ui(
     code_repository: CodeRepository, 
     cicd_repository: CICDRepository, 
     data_warehouse_repository: DataWarehouseRepository, 
-    xform_api_repository: XFormApiRepository
+    xform_api_repository: XFormApiRepository,
+    catalog_export_repository: CatalogExportRepository
 ):
     st.set_page_config(layout="wide")
     st.title(_("XLSForm Data Source Tools"))
@@ -54,4 +56,4 @@ def build_ui(
     with tab5:
         build_tab_compare_xlsforms(xlsform_comparator_service)
     with tab6:
-        build_tab_data_catalog(data_catalog_service, data_catalog_enrichment_service)
+        build_tab_data_catalog(data_catalog_service, data_catalog_enrichment_service, catalog_export_repository)
@@ -3,6 +3,7 @@ from streamlit_tree_select import tree_select
 
 from application.contracts.bulk_audit_service import BulkAuditService
 from application.dtos import SingleFormComparisonResultDTO
+from infrastructure.ui.common.ui_utils import describe_progress, has_critical_discrepancies
 from infrastructure.ui.streamlit.ui_utils import build_tree_from_results, _
 
 def build_tab_bulk_audit(bulk_audit_service: BulkAuditService):
@@ -15,28 +16,32 @@ def build_tab_bulk_audit(bulk_audit_service: BulkAuditService):
 
     audit_country = st.selectbox(_("Select country to audit"), options=["MALI", "RCI"], on_change=clear_audit_results, key="refactor_audit_country_selector")
 
+    incremental = st.checkbox(_("Only re-audit forms changed since the last audit"), value=True, key="refactor_incremental_audit")
+
     if st.button(_("Run Full Audit"), key="refactor_run_full_audit"):
-        with st.spinner(f"Running full audit for {audit_country}... This may take several minutes."):
-            try:
-                st.session_state.bulk_audit_result = bulk_audit_service.perform_audit(audit_country)
-            except Exception as e:
-                st.error(f"An error occurred during the audit: {e}")
+        # Forms are listed as soon as they are audited; the full results below replace the list once the audit ends.
+        progress_bar = st.progress(0.0, text=f"Running full audit for {audit_country}...")
+        live_results = st.empty()
+        audited_lines = []
+        try:
+            for event in bulk_audit_service.stream_audit(audit_country, incremental=incremental):
+                progress_bar.progress(event.fraction_done, text=describe_progress(event))
+                if event.stage == "auditing" and event.form_result is not None:
+                    form = event.form_result
+                    audited_lines.append(f"{'❌' if has_critical_discrepancies(form, audit_country) else '✅'} {form.form_id}")
+                    live_results.markdown("  \n".join(audited_lines))
+                elif event.stage == "done":
+                    st.session_state.bulk_audit_result = event.result
+            progress_bar.empty()
+            live_results.empty()
+        except Exception as e:
+            st.error(f"An error occurred during the audit: {e}")
     
     if st.session_state.bulk_audit_result:
         result_dto = st.session_state.bulk_audit_result
         st.subheader("Audit Summary")
         
-        critical_forms_set = set()
-        if result_dto.compared_forms:
-            for form in result_dto.compared_forms:
-                is_critical = False
-                if any(rg.handling_method == 'NOT_FOUND' or rg.not_found_elements for rg in form.repeat_groups): is_critical = True
-                if any(not dbg.view_found or dbg.not_found_elements for dbg in form.db_doc_groups): is_critical = True
-                if not is_critical:
-                    for item in form.not_found_elements:
-                        if not item.json_path.startswith('$.inputs') and 'prescription_summary' not in item.json_path and not (audit_country == 'RCI' and item.element_name.endswith('_bm')):
-                            is_critical = True; break
-                if is_critical: critical_forms_set.add(form.form_id)
+        critical_forms_set = {form.form_id for form in result_dto.compared_forms if has_critical_discrepancies(form, audit_country)}
         
         critical_discrepancies_count = len(critical_forms_set) + len(result_dto.missing_views)
         total_audited_count = len(result_dto.compared_forms) + len(result_dto.missing_views) + len(result_dto.missing_xlsforms) + len(result_dto.invalid_xlsforms)
@@ -67,7 +72,7 @@ def build_tab_bulk_audit(bulk_audit_service: BulkAuditService):
                 elif audit_country == 'RCI' and item.element_name.endswith('_bm'): bm.append(item)
                 else: critical.append(item)
             
-            has_critical = bool(critical) or any(rg.handling_method == 'NOT_FOUND' or rg.not_found_elements for rg in form_result.repeat_groups) or any(not dbg.view_found or dbg.not_found_elements for dbg in form_result.db_doc_groups)
+            has_critical = has_critical_discrepancies(form_result, audit_country)
             has_any_issue = bool(form_result.not_found_elements or any(rg.handling_method == 'NOT_FOUND' or rg.not_found_elements for rg in form_result.repeat_groups) or any(not dbg.view_found or dbg.not_found_elements for dbg in form_result.db_doc_groups))
 
             with st.expander(f"{( '❌' if has_critical else '✅' )} {form_result.form_id}", expanded=has_any_issue):
@@ -1,13 +1,42 @@
+import io
+
 import streamlit as st
 import pandas as pd
 
 from application.contracts.data_catalog_service import DataCatalogService
 from application.contracts.data_catalog_enrichment_service import DataCatalogEnrichmentService
-from infrastructure.ui.streamlit.ui_utils import _
+from domain.contracts.catalog_export_repository import CatalogExportRepository
+from infrastructure.ui.common.ui_utils import describe_progress
+
+# Format -> (button label, MIME type) of the download buttons.
+_DOWNLOAD_FORMATS = {"csv": ("CSV", "text/csv"), "parquet": ("Parquet", "application/vnd.apache.parquet")}
+
+def _set_catalog_result(result, country_code: str):
+    # The DataFrame and exports of a catalog are built once per result, not on every rerun.
+    # The country is kept with the result so that enrichment and saving use the country it was generated for,
+    # whatever the selectbox shows now.
+    st.session_state.data_catalog_result = result
+    st.session_state.data_catalog_country = country_code
+    st.session_state.data_catalog_frame = None
+    st.session_state.data_catalog_exports = {}
+
+def _catalog_frame(result) -> pd.DataFrame:
+    if st.session_state.get('data_catalog_frame') is None:
+        st.session_state.data_catalog_frame = pd.DataFrame([row.__dict__ for row in result.catalog_rows])
+    return st.session_state.data_catalog_frame
+
+def _catalog_export(catalog_export_repository: CatalogExportRepository, result, file_format: str) -> bytes:
+    exports = st.session_state.setdefault('data_catalog_exports', {})
+    if file_format not in exports:
+        buffer = io.BytesIO()
+        catalog_export_repository.export(result.catalog_rows, buffer, file_format)
+        exports[file_format] = buffer.getvalue()
+    return exports[file_format]
 
 def build_tab_data_catalog(
     data_catalog_service: DataCatalogService, 
-    data_catalog_enrichment_service: DataCatalogEnrichmentService
+    data_catalog_enrichment_service: DataCatalogEnrichmentService,
+    catalog_export_repository: CatalogExportRepository
 ):
     st.header("Data Catalog Generator")
     st.write("This tool generates a master mapping of all BigQuery columns to their original XLSForm labels.")
@@ -17,23 +46,44 @@ def build_tab_data_catalog(
 
     country = st.selectbox("Select country to generate catalog for:", ["MALI", "RCI"], key="catalog_country")
 
+    incremental = st.checkbox("Only regenerate forms changed since the last catalog", value=True, key="catalog_incremental")
+
     if st.button("Generate Data Catalog", key="generate_catalog_button"):
-        with st.spinner(f"Generating catalog for {country}... This may take several minutes."):
-            try:
-                result_dto = data_catalog_service.generate_catalog(country)
-                st.session_state.data_catalog_result = result_dto
-                st.success("Data catalog generated successfully!")
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+        progress_bar = st.progress(0.0, text=f"Generating catalog for {country}...")
+        try:
+            rows_found = 0
+            for event in data_catalog_service.stream_catalog(country, incremental=incremental):
+                if event.stage == "cataloging" and event.form_result:
+                    rows_found += len(event.form_result)
+                progress_bar.progress(event.fraction_done, text=f"{describe_progress(event)}, {rows_found} entries")
+                if event.stage == "done":
+                    result_dto = event.result
+            progress_bar.empty()
+            _set_catalog_result(result_dto, country)
+            st.success("Data catalog generated successfully!")
+            if result_dto.reused_forms:
+                st.info(f"Kept {len(result_dto.reused_forms)} unchanged forms; regenerated {len(result_dto.regenerated_forms)}.")
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
 
     if st.session_state.data_catalog_result:
         result = st.session_state.data_catalog_result
+        catalog_country = st.session_state.data_catalog_country
         if result.catalog_rows:
-            df = pd.DataFrame([row.__dict__ for row in result.catalog_rows])
+            df = _catalog_frame(result)
             
-            st.subheader("Generated Data Catalog")
+            st.subheader(f"Generated Data Catalog ({catalog_country})")
             st.dataframe(df)
 
+            if result.added_rows or result.removed_rows:
+                with st.expander(f"Changes since the last catalog: {len(result.added_rows)} added, {len(result.removed_rows)} removed"):
+                    if result.added_rows:
+                        st.write("Added columns")
+                        st.dataframe(pd.DataFrame([row.__dict__ for row in result.added_rows])[["xlsform_name", "column_name", "json_path"]])
+                    if result.removed_rows:
+                        st.write("Removed columns")
+                        st.dataframe(pd.DataFrame([row.__dict__ for row in result.removed_rows])[["xlsform_name", "column_name", "json_path"]])
+
             # --- AI Enrichment Section ---
             st.divider()
             st.subheader("AI-Powered Description Generation")
@@ -57,24 +107,27 @@ def build_tab_data_catalog(
                     try:
                         enriched_result = data_catalog_enrichment_service.enrich_catalog(
                             catalog=st.session_state.data_catalog_result,
-                            country_code=country,
+                            country_code=catalog_country,
                             mode=mode_map[enrich_mode],
                             form_filter=form_filter
                         )
-                        st.session_state.data_catalog_result = enriched_result
+                        _set_catalog_result(enriched_result, catalog_country)
+                        # Stored so that the next incremental generation keeps the descriptions.
+                        data_catalog_service.save_catalog(catalog_country, enriched_result)
                         st.success("Enrichment complete!")
                         # Rerun to update the dataframe with new descriptions
                         st.experimental_rerun()
                     except Exception as e:
                         st.error(f"An error occurred during enrichment: {e}")
 
-            # --- Download Button ---
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Download Catalog as CSV",
-                data=csv,
-                file_name=f"{country.lower()}_data_catalog.csv",
-                mime="text/csv",
-            )
+            # --- Download Buttons ---
+            for file_format, (format_label, mime) in _DOWNLOAD_FORMATS.items():
+                st.download_button(
+                    label=f"Download Catalog as {format_label}",
+                    data=_catalog_export(catalog_export_repository, result, file_format),
+                    file_name=f"{catalog_country.lower()}_data_catalog.{file_format}",
+                    mime=mime,
+                    key=f"download_catalog_{file_format}"
+                )
         else:
             st.warning("No data catalog entries were generated. This might be due to missing forms or views.")
@@ -24,6 +24,11 @@ def main():
     # that already has all its dependencies injected.
     try:
         container.build_ui()
+        # Per-host latency and connection reuse of the calls made by the HTTP repositories during this run.
+        container.http_client().log_stats()
+        # How many model calls the semantic response cache answered during this run.
+        if container.config.repositories.semantic_comparator_repository.implementation() == "cached_vertex_ai":
+            container.semantic_response_cache().log_stats()
         logger.log_info("Application finished.")
     except Exception as e:
         logger.log_exception(f"A critical error occurred while running the UI: {e}")
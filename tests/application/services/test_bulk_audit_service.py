@@ -1,18 +1,24 @@
 import pytest
 import sys
 import os
+import asyncio
+import threading
+import time
 from typing import List
+from unittest.mock import MagicMock
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from application.services.bulk_audit_service_impl import BulkAuditServiceImpl
+from infrastructure.repositories.threaded_async_adapters import ThreadedAsyncCHTAppRepository, ThreadedAsyncCodeRepository, ThreadedAsyncDataWarehouseRepository
 from application.dtos import BulkAuditResultDTO
 from domain.contracts.cht_app_repository import CHTAppRepository
 from domain.contracts.code_repository import CodeRepository
 from domain.contracts.data_warehouse_repository import DataWarehouseRepository
 from domain.contracts.xlsform_repository import XLSFormRepository
 from domain.entities.CHTElement import CHTElement
+from infrastructure.logging.dummy_logger import DummyLogger
 
 # --- FAKE REPOSITORIES FOR TESTING ---
 
@@ -26,6 +32,12 @@ class FakeCodeRepository(CodeRepository):
             raise FileNotFoundError(f"File not found: {file_path}")
         return b''
 
+    def download_directory(self, branch: str, directory: str) -> dict:
+        return {}
+
+    def list_directory(self, branch: str, directory: str) -> dict:
+        return {}
+
     def get_file_history(self, branch: str, file_path: str) -> List[any]:
         return []
 
@@ -35,6 +47,9 @@ class FakeDataWarehouseRepository(DataWarehouseRepository):
             raise FileNotFoundError(f"View not found: {view_id}")
         return "SELECT JSON_EXTRACT_SCALAR(doc, '$.fields.group.question') FROM table"
 
+    def load_view_queries(self, project_id: str, dataset_id: str) -> dict:
+        return {}
+
 class FakeXLSFormRepository(XLSFormRepository):
     def get_elements_from_file(self, file_content: bytes) -> List[CHTElement]:
         # Updated to include new constructor arguments
@@ -52,9 +67,9 @@ class FakeXLSFormRepository(XLSFormRepository):
 def bulk_audit_service() -> BulkAuditServiceImpl:
     """This pytest fixture creates and injects all the fake repositories into the service."""
     return BulkAuditServiceImpl(
-        cht_app_repo=FakeCHTAppRepository(),
-        code_repo=FakeCodeRepository(),
-        dw_repo=FakeDataWarehouseRepository(),
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(FakeCHTAppRepository()),
+        async_code_repo=ThreadedAsyncCodeRepository(FakeCodeRepository()),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(FakeDataWarehouseRepository()),
         xlsform_repo=FakeXLSFormRepository()
     )
 
@@ -70,3 +85,218 @@ def test_perform_audit_identifies_missing_xlsform(bulk_audit_service: BulkAuditS
     assert len(result.missing_views) == 1
     assert len(result.compared_forms) == 1
     assert result.compared_forms[0].form_id == "form1_ok"
+
+# --- CONCURRENT PIPELINE TESTS ---
+
+class DelayedXLSFormRepository(XLSFormRepository):
+    """Parses forms with varying delays so that workers finish out of order."""
+    def get_elements_from_file(self, file_content: bytes):
+        form_id = file_content.decode()
+        time.sleep({"form_a": 0.05, "form_b": 0.02, "form_c": 0.0}.get(form_id, 0.0))
+        shared_doc = [CHTElement("stock", False, "integer", f"/{form_id}/shared_doc/stock", 2, "$.stock")]
+        return {
+            "main_elements": [CHTElement("q", False, "text", f"/{form_id}/q", 3, "$.fields.q")],
+            "repeat_groups": {},
+            "db_doc_groups": {"shared_doc": shared_doc} if form_id != "form_a" else {},
+        }
+
+class ContentCodeRepository(FakeCodeRepository):
+    def download_file(self, branch: str, file_path: str) -> bytes:
+        return os.path.basename(file_path).replace(".xlsx", "").encode()
+
+class MissingFieldDataWarehouseRepository(DataWarehouseRepository):
+    def get_view_query(self, project_id: str, dataset_id: str, view_id: str) -> str:
+        return "SELECT 1"
+
+    def load_view_queries(self, project_id: str, dataset_id: str) -> dict:
+        return {}
+
+def test_perform_audit_with_workers_keeps_order_and_db_doc_dedup():
+    """Concurrent workers must produce the same ordered result as a sequential run."""
+    cht_app_repo = MagicMock(spec=CHTAppRepository)
+    cht_app_repo.get_installed_xform_ids.return_value = ["form_a", "form_b", "form_c"]
+
+    def run(max_workers):
+        return BulkAuditServiceImpl(
+            async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+            async_code_repo=ThreadedAsyncCodeRepository(ContentCodeRepository()),
+            async_dw_repo=ThreadedAsyncDataWarehouseRepository(MissingFieldDataWarehouseRepository()),
+            xlsform_repo=DelayedXLSFormRepository(),
+            logger=DummyLogger(),
+            max_workers=max_workers
+        ).perform_audit("MALI")
+
+    sequential, concurrent = run(1), run(3)
+
+    assert [form.form_id for form in concurrent.compared_forms] == ["form_a", "form_b", "form_c"]
+    assert concurrent == sequential
+    # The shared db-doc group is only audited by the first form that declares it.
+    assert [group.group_name for group in concurrent.compared_forms[1].db_doc_groups] == ["shared_doc"]
+    assert concurrent.compared_forms[2].db_doc_groups == []
+
+def test_perform_audit_downloads_xlsforms_in_bulk():
+    """All XLSForms come from one directory download instead of one request per form."""
+    cht_app_repo = MagicMock(spec=CHTAppRepository)
+    cht_app_repo.get_installed_xform_ids.return_value = ["form_a", "form_b", "form_missing"]
+    code_repo = MagicMock(spec=CodeRepository)
+    code_repo.download_directory.return_value = {
+        "muso-mali/forms/app/form_a.xlsx": b"form_a",
+        "muso-mali/forms/app/form_b.xlsx": b"form_b",
+    }
+    code_repo.download_file.side_effect = FileNotFoundError
+
+    result = BulkAuditServiceImpl(
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+        async_code_repo=ThreadedAsyncCodeRepository(code_repo),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(MissingFieldDataWarehouseRepository()),
+        xlsform_repo=DelayedXLSFormRepository(),
+        logger=DummyLogger(),
+        max_workers=2
+    ).perform_audit("MALI")
+
+    code_repo.download_directory.assert_called_once_with(branch="master", directory="muso-mali/forms/app")
+    code_repo.download_file.assert_called_once_with(branch="master", file_path="muso-mali/forms/app/form_missing.xlsx")
+    assert [form.form_id for form in result.compared_forms] == ["form_a", "form_b"]
+    assert result.missing_xlsforms == ["form_missing"]
+
+class ConcurrencyTrackingCodeRepository(ContentCodeRepository):
+    """Records how many downloads are in flight at the same time."""
+    def __init__(self):
+        self.in_flight, self.max_in_flight = 0, 0
+        self._lock = threading.Lock()
+
+    def download_file(self, branch: str, file_path: str) -> bytes:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        return super().download_file(branch, file_path)
+
+def test_perform_audit_async_caps_concurrency_and_matches_sync():
+    """The async audit never runs more than max_workers forms at once and returns the sync result."""
+    cht_app_repo = MagicMock(spec=CHTAppRepository)
+    cht_app_repo.get_installed_xform_ids.return_value = [f"form_{i}" for i in range(8)]
+    code_repo = ConcurrencyTrackingCodeRepository()
+
+    service = BulkAuditServiceImpl(
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+        async_code_repo=ThreadedAsyncCodeRepository(code_repo),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(MissingFieldDataWarehouseRepository()),
+        xlsform_repo=DelayedXLSFormRepository(),
+        logger=DummyLogger(),
+        max_workers=3
+    )
+
+    async_result = asyncio.run(service.perform_audit_async("MALI"))
+
+    assert 1 < code_repo.max_in_flight <= 3
+    assert async_result == service.perform_audit("MALI")
+    assert [form.form_id for form in async_result.compared_forms] == [f"form_{i}" for i in range(8)]
+
+# --- INCREMENTAL AUDIT TESTS ---
+
+class VersionedXLSFormRepository(XLSFormRepository):
+    """Parses 'form_id:version' contents and counts the parsed forms; version 2 of form_a declares the shared db-doc."""
+    def __init__(self):
+        self.parsed: List[str] = []
+
+    def get_elements_from_file(self, file_content: bytes):
+        form_id, version = file_content.decode().split(":")
+        self.parsed.append(form_id)
+        declares_shared_doc = form_id != "form_a" or version == "2"
+        shared_doc = [CHTElement("stock", False, "integer", f"/{form_id}/shared_doc/stock", 2, "$.stock")]
+        return {
+            "main_elements": [CHTElement("q", False, "text", f"/{form_id}/q", 3, "$.fields.q")],
+            "repeat_groups": {},
+            "db_doc_groups": {"shared_doc": shared_doc} if declares_shared_doc else {},
+        }
+
+class VersionedCodeRepository(FakeCodeRepository):
+    def __init__(self):
+        self.versions = {"form_a": 1, "form_b": 1, "form_c": 1}
+
+    def download_file(self, branch: str, file_path: str) -> bytes:
+        form_id = os.path.basename(file_path).replace(".xlsx", "")
+        return f"{form_id}:{self.versions[form_id]}".encode()
+
+    def list_directory(self, branch: str, directory: str) -> dict:
+        return {f"{directory}/{form_id}.xlsx": f"sha-{form_id}-{version}" for form_id, version in self.versions.items()}
+
+class EditableDataWarehouseRepository(DataWarehouseRepository):
+    def __init__(self):
+        self.views = {"formview_form_a": "SELECT 1", "formview_form_b": "SELECT 1", "formview_form_c": "SELECT 1"}
+
+    def get_view_query(self, project_id: str, dataset_id: str, view_id: str) -> str:
+        if view_id not in self.views:
+            raise FileNotFoundError(view_id)
+        return self.views[view_id]
+
+    def load_view_queries(self, project_id: str, dataset_id: str) -> dict:
+        return dict(self.views)
+
+def test_incremental_audit_only_reaudits_forms_whose_inputs_changed(tmp_path):
+    from infrastructure.repositories.json_audit_result_repository import JsonAuditResultRepository
+
+    cht_app_repo = MagicMock(spec=CHTAppRepository)
+    cht_app_repo.get_installed_xform_ids.return_value = ["form_a", "form_b", "form_c"]
+    code_repo, dw_repo, xlsform_repo = VersionedCodeRepository(), EditableDataWarehouseRepository(), VersionedXLSFormRepository()
+    service = BulkAuditServiceImpl(
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+        async_code_repo=ThreadedAsyncCodeRepository(code_repo),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(dw_repo),
+        xlsform_repo=xlsform_repo,
+        logger=DummyLogger(),
+        max_workers=2,
+        audit_result_repo=JsonAuditResultRepository(directory=str(tmp_path), logger=DummyLogger())
+    )
+
+    def audit():
+        xlsform_repo.parsed.clear()
+        return service.perform_audit("MALI", incremental=True)
+
+    full = service.perform_audit("MALI")
+
+    # Nothing changed: every stored result is reused.
+    assert audit() == full
+    assert xlsform_repo.parsed == []
+
+    # A new XLSForm version or view definition only re-audits that form.
+    code_repo.versions["form_c"] = 2
+    dw_repo.views["formview_form_a"] = "SELECT JSON_VALUE(doc, '$.fields.q')"
+    result = audit()
+    assert sorted(xlsform_repo.parsed) == ["form_a", "form_c"]
+    # form_a's field is now extracted by its view, so it has nothing left to report.
+    assert [form.form_id for form in result.compared_forms] == ["form_b", "form_c"]
+
+    # form_a now declares the shared db-doc group first, so form_b no longer audits it.
+    code_repo.versions["form_a"] = 2
+    result = audit()
+    assert sorted(xlsform_repo.parsed) == ["form_a", "form_b"]
+    assert [group.group_name for group in result.compared_forms[0].db_doc_groups] == ["shared_doc"]
+    assert result.compared_forms[1].db_doc_groups == []
+    assert result == service.perform_audit("MALI")
+
+def test_stream_audit_yields_each_form_then_the_full_result():
+    cht_app_repo = MagicMock(spec=CHTAppRepository)
+    cht_app_repo.get_installed_xform_ids.return_value = ["form_a", "form_b", "form_c"]
+    service = BulkAuditServiceImpl(
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+        async_code_repo=ThreadedAsyncCodeRepository(ContentCodeRepository()),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(MissingFieldDataWarehouseRepository()),
+        xlsform_repo=DelayedXLSFormRepository(),
+        logger=DummyLogger(),
+        max_workers=3
+    )
+
+    events = list(service.stream_audit("MALI"))
+
+    assert [event.stage for event in events][0] == "preparing"
+    audited = [event for event in events if event.stage == "auditing" and event.form_id]
+    assert sorted(event.form_id for event in audited) == ["form_a", "form_b", "form_c"]
+    assert [event.forms_done for event in audited] == [1, 2, 3]
+    assert all(event.forms_total == 3 and event.eta_seconds is not None for event in audited)
+    assert {event.form_id: event.form_result.form_id for event in audited} == {"form_a": "form_a", "form_b": "form_b", "form_c": "form_c"}
+    assert events[-1].stage == "done"
+    assert events[-1].result == service.perform_audit("MALI")
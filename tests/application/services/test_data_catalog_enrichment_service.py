@@ -0,0 +1,168 @@
+import pytest
+import sys
+import os
+import asyncio
+from typing import Dict, List, Optional
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from application.services.data_catalog_enrichment_service_impl import DataCatalogEnrichmentServiceImpl
+from application.dtos import DataCatalogRowDTO, DataCatalogResultDTO
+from domain.contracts.async_semantic_comparator_repository import AsyncSemanticComparatorRepository
+from infrastructure.repositories.threaded_async_adapters import ThreadedAsyncCodeRepository
+from infrastructure.logging.dummy_logger import DummyLogger
+from infrastructure.repositories.json_enrichment_checkpoint_repository import JsonEnrichmentCheckpointRepository
+
+class FakeAsyncSemanticComparator(AsyncSemanticComparatorRepository):
+    """Answers after a short await and records the batched calls and their peak concurrency."""
+    def __init__(self):
+        self.in_flight, self.max_in_flight = 0, 0
+        self.batches: List[List[str]] = []
+
+    async def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        return title1 == title2
+
+    async def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return formula1 == formula2
+
+    async def generate_descriptions_from_formula(self, formula: str, context_description: Optional[str] = None) -> Dict[str, str]:
+        return {"fr": formula, "en": formula, "bm": formula}
+
+    async def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"fr": f"fr:{formula}", "en": f"en:{formula}", "bm": f"bm:{formula}"}
+
+    async def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        self.batches.append(list(formulas))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [{"fr": f"fr:{formula}", "en": f"en:{formula}", "bm": f"bm:{formula}"} for formula in formulas]
+
+def _row(form_id: str, column: str, calculation: str = "", label_fr: str = "", odk_type: str = "calculate") -> DataCatalogRowDTO:
+    return DataCatalogRowDTO(
+        formview_name=f"formview_{form_id}", xlsform_name=form_id, column_name=column, sql_type="STRING",
+        json_path=f"$.fields.{column}", odk_type=odk_type, calculation=calculation, label_fr=label_fr
+    )
+
+@pytest.fixture
+def catalog() -> DataCatalogResultDTO:
+    return DataCatalogResultDTO(catalog_rows=[
+        _row(form_id, f"{form_id}_calc_{i}", calculation=f"${{{form_id}_x}} + {i}") for form_id in ("form_a", "form_b", "form_c") for i in range(3)
+    ] + [
+        _row("form_a", "same_formula", calculation="${form_a_x} + 0"),
+        # The same formula in two forms, written differently.
+        _row("form_b", "age_in_months", calculation="${age} * 12"),
+        _row("form_c", "age_months", calculation="${ age }*12"),
+        _row("form_a", "already_labelled", calculation="1 + 1", label_fr="Déjà décrit"),
+        _row("form_a", "question", odk_type="text"),
+        _row("form_missing", "calc", calculation="2 + 2"),
+    ])
+
+def _service(semantic: AsyncSemanticComparatorRepository, max_workers: int, xlsform_repo: Optional[MagicMock] = None, checkpoint_repo=None) -> DataCatalogEnrichmentServiceImpl:
+    code_repo = MagicMock()
+    code_repo.download_file.side_effect = lambda branch, file_path: (_ for _ in ()).throw(FileNotFoundError(file_path)) if "form_missing" in file_path else b"xls"
+    if xlsform_repo is None:
+        xlsform_repo = MagicMock()
+        xlsform_repo.get_formula_context_as_markdown.return_value = "| type | name |"
+    return DataCatalogEnrichmentServiceImpl(
+        async_semantic_repo=semantic,
+        async_code_repo=ThreadedAsyncCodeRepository(code_repo),
+        xlsform_repo=xlsform_repo,
+        path_interpreter_factory=MagicMock(),
+        form_context_config=MagicMock(),
+        logger=DummyLogger(),
+        max_workers=max_workers,
+        checkpoint_repo=checkpoint_repo
+    )
+
+def test_enrich_catalog_async_describes_each_form_in_one_batch_with_bounded_concurrency(catalog):
+    semantic = FakeAsyncSemanticComparator()
+
+    result = asyncio.run(_service(semantic, max_workers=2).enrich_catalog_async(catalog, "MALI", "fill", "All"))
+
+    rows = {row.column_name: row for row in result.catalog_rows}
+    assert all(rows[f"{form_id}_calc_{i}"].label_fr == f"fr:${{{form_id}_x}} + {i}" for form_id in ("form_a", "form_b", "form_c") for i in range(3))
+    assert rows["same_formula"].label_en == "en:${form_a_x} + 0"
+    # One request per form; a formula shared by two rows, even across forms, is only sent once.
+    assert sorted(semantic.batches) == [
+        ["${form_a_x} + 0", "${form_a_x} + 1", "${form_a_x} + 2"],
+        ["${form_b_x} + 0", "${form_b_x} + 1", "${form_b_x} + 2", "${age} * 12"],
+        ["${form_c_x} + 0", "${form_c_x} + 1", "${form_c_x} + 2"],
+    ]
+    assert rows["age_months"].label_fr == "fr:${age} * 12"
+    assert rows["already_labelled"].label_fr == "Déjà décrit"
+    assert rows["question"].label_fr == ""
+    # The form whose XLSForm cannot be downloaded is skipped.
+    assert rows["calc"].label_fr == ""
+    assert semantic.max_in_flight == 2
+
+def test_enrich_catalog_sync_wrapper_overwrites(catalog):
+    result = _service(FakeAsyncSemanticComparator(), max_workers=4).enrich_catalog(catalog, "MALI", "overwrite", "All")
+
+    rows = {row.column_name: row for row in result.catalog_rows}
+    assert rows["already_labelled"].label_fr == "fr:1 + 1"
+    assert rows["already_labelled"].label_bm == "bm:1 + 1"
+
+def test_enrich_catalog_requests_context_sliced_to_the_formulas_of_each_form(catalog):
+    xlsform_repo = MagicMock()
+    xlsform_repo.get_formula_context_as_markdown.side_effect = lambda content, formulas: f"context of {len(formulas)} formulas"
+
+    _service(FakeAsyncSemanticComparator(), max_workers=1, xlsform_repo=xlsform_repo).enrich_catalog(catalog, "MALI", "fill", "All")
+
+    requested = sorted(call.args[1] for call in xlsform_repo.get_formula_context_as_markdown.call_args_list)
+    assert requested == [
+        ["${form_a_x} + 0", "${form_a_x} + 1", "${form_a_x} + 2"],
+        ["${form_b_x} + 0", "${form_b_x} + 1", "${form_b_x} + 2", "${age} * 12"],
+        ["${form_c_x} + 0", "${form_c_x} + 1", "${form_c_x} + 2"],
+    ]
+    xlsform_repo.get_survey_sheet_as_markdown.assert_not_called()
+
+class FailingFormSemanticComparator(FakeAsyncSemanticComparator):
+    """Fails the batch of one form, like a run interrupted by quota errors."""
+    def __init__(self, failing_formula: str):
+        super().__init__()
+        self.failing_formula = failing_formula
+
+    async def get_formula_descriptions_with_context(self, formulas: List[str], form_context: str) -> List[Dict[str, str]]:
+        if self.failing_formula in formulas:
+            self.batches.append(list(formulas))
+            raise RuntimeError("429 Resource exhausted")
+        return await super().get_formula_descriptions_with_context(formulas, form_context)
+
+def test_interrupted_run_resumes_from_its_checkpoint(tmp_path):
+    checkpoint_repo = JsonEnrichmentCheckpointRepository(directory=str(tmp_path), logger=DummyLogger())
+    def catalog():
+        return DataCatalogResultDTO(catalog_rows=[_row("form_a", "a", calculation="${a}"), _row("form_b", "b", calculation="${b}")])
+
+    first = FailingFormSemanticComparator("${b}")
+    _service(first, max_workers=1, checkpoint_repo=checkpoint_repo).enrich_catalog(catalog(), "MALI", "overwrite", "All")
+    assert list(checkpoint_repo.load("MALI|overwrite|All")) == ["form_a|formview_form_a|a|${a}"]
+
+    second = FakeAsyncSemanticComparator()
+    result = _service(second, max_workers=1, checkpoint_repo=checkpoint_repo).enrich_catalog(catalog(), "MALI", "overwrite", "All")
+
+    # Only the form that failed is described again; the other one comes from the checkpoint.
+    assert second.batches == [["${b}"]]
+    assert [row.label_fr for row in result.catalog_rows] == ["fr:${a}", "fr:${b}"]
+    # The completed run removes its checkpoint.
+    assert checkpoint_repo.load("MALI|overwrite|All") == {}
+
+def test_formula_of_a_failed_form_is_described_with_another_form_using_it():
+    catalog = DataCatalogResultDTO(catalog_rows=[
+        _row("form_a", "a_only", calculation="${a}"),
+        _row("form_a", "shared", calculation="${age} * 12"),
+        _row("form_b", "shared", calculation="${age}*12"),
+    ])
+    semantic = FailingFormSemanticComparator("${a}")
+
+    result = _service(semantic, max_workers=1).enrich_catalog(catalog, "MALI", "overwrite", "All")
+
+    assert semantic.batches == [["${a}", "${age} * 12"], ["${age}*12"]]
+    assert [row.label_fr for row in result.catalog_rows] == ["", "fr:${age}*12", "fr:${age}*12"]
@@ -1,14 +1,20 @@
 import pytest
 import sys
 import os
+import asyncio
+import copy
+import time
 from unittest.mock import MagicMock, patch
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from application.services.data_catalog_service_impl import DataCatalogServiceImpl
+from infrastructure.repositories.threaded_async_adapters import ThreadedAsyncCHTAppRepository, ThreadedAsyncCodeRepository, ThreadedAsyncDataWarehouseRepository
 from application.dtos import ParsedColumnDTO, DataCatalogRowDTO, DataCatalogResultDTO
+from domain.contracts.catalog_store_repository import CatalogStoreRepository
 from domain.entities.RichCHTElement import RichCHTElement
+from application.utils import get_xlsform_path
 
 @pytest.fixture
 def mock_dependencies():
@@ -22,9 +28,21 @@ def mock_dependencies():
         "logger": MagicMock()
     }
 
+def _service(dependencies, **kwargs) -> DataCatalogServiceImpl:
+    """Builds the service on the synchronous mocks, driven through the threaded adapters as the container does."""
+    return DataCatalogServiceImpl(
+        async_cht_app_repo=ThreadedAsyncCHTAppRepository(dependencies["cht_app_repo"]),
+        async_code_repo=ThreadedAsyncCodeRepository(dependencies["code_repo"]),
+        async_dw_repo=ThreadedAsyncDataWarehouseRepository(dependencies["dw_repo"]),
+        xlsform_repo=dependencies["xlsform_repo"],
+        sql_parser_repo=dependencies["sql_parser_repo"],
+        logger=dependencies["logger"],
+        **kwargs
+    )
+
 def test_generate_catalog_happy_path(mock_dependencies):
     # Arrange
-    service = DataCatalogServiceImpl(**mock_dependencies)
+    service = _service(mock_dependencies)
 
     # Mock repository responses
     mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a"]
@@ -70,7 +88,7 @@ def test_generate_catalog_happy_path(mock_dependencies):
 
 def test_generate_catalog_handles_filenotfound_gracefully(mock_dependencies):
     # Arrange
-    service = DataCatalogServiceImpl(**mock_dependencies)
+    service = _service(mock_dependencies)
     
     mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a", "form_b"]
     # Let the first form succeed and the second one fail
@@ -92,7 +110,7 @@ def test_generate_catalog_handles_filenotfound_gracefully(mock_dependencies):
 
 def test_generate_catalog_handles_unmatched_sql_columns(mock_dependencies):
     # Arrange
-    service = DataCatalogServiceImpl(**mock_dependencies)
+    service = _service(mock_dependencies)
 
     mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a"]
     mock_dependencies["code_repo"].download_file.return_value = b"xls_content"
@@ -114,3 +132,156 @@ def test_generate_catalog_handles_unmatched_sql_columns(mock_dependencies):
     assert len(result.catalog_rows) == 0
     # A warning should be logged about the unmatched column
     mock_dependencies["logger"].log_warning.assert_called_with("Could not find matching XLSForm element for column 'unrelated_column' with path '$.data.some_other_field' in form 'form_a'")
+
+def test_generate_catalog_async_keeps_installed_form_order(mock_dependencies):
+    # Arrange: the first form is the slowest to download, so forms complete out of order
+    service = _service(mock_dependencies, max_workers=3)
+
+    mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a", "form_b", "form_c"]
+
+    def download_file(branch, file_path):
+        form_id = os.path.basename(file_path).replace(".xlsx", "")
+        time.sleep({"form_a": 0.05, "form_b": 0.02}.get(form_id, 0.0))
+        return form_id.encode()
+
+    mock_dependencies["code_repo"].download_file.side_effect = download_file
+    mock_dependencies["dw_repo"].get_view_query.return_value = "sql_content"
+    mock_dependencies["xlsform_repo"].get_rich_elements_from_file.side_effect = lambda content: [
+        RichCHTElement(question_name="q", group=False, odk_type="text", path=f"/{content.decode()}/q", excel_line_number=1)
+    ]
+    mock_dependencies["sql_parser_repo"].parse_columns.return_value = [
+        ParsedColumnDTO(column_name="q", json_path="$.fields.q", sql_type="STRING")
+    ]
+
+    # Act
+    result = asyncio.run(service.generate_catalog_async("MALI"))
+
+    # Assert
+    assert [row.xlsform_name for row in result.catalog_rows] == ["form_a", "form_b", "form_c"]
+
+class InMemoryCatalogStoreRepository(CatalogStoreRepository):
+    def __init__(self):
+        self.forms = {}
+
+    def load_forms(self, country_code):
+        return {form_id: copy.deepcopy(record) for form_id, record in self.forms.get(country_code, {}).items()}
+
+    def save_forms(self, country_code, records):
+        self.forms[country_code] = copy.deepcopy(records)
+
+def test_generate_catalog_incremental_regenerates_only_changed_forms(mock_dependencies):
+    # Arrange: two forms with a calculate column each; the store keeps the catalog between runs
+    store = InMemoryCatalogStoreRepository()
+    service = _service(mock_dependencies, catalog_store_repo=store)
+
+    xlsform_shas = {get_xlsform_path("MALI", "form_a"): "sha-a1", get_xlsform_path("MALI", "form_b"): "sha-b1"}
+    form_columns = {"form_a": ["total"], "form_b": ["score"]}
+    mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a", "form_b"]
+    mock_dependencies["code_repo"].list_directory.side_effect = lambda branch, directory: dict(xlsform_shas)
+    mock_dependencies["code_repo"].download_file.side_effect = lambda branch, file_path: os.path.basename(file_path).replace(".xlsx", "").encode()
+    mock_dependencies["dw_repo"].get_view_query.side_effect = lambda project, dataset, view: f"sql of {view}"
+    mock_dependencies["xlsform_repo"].get_rich_elements_from_file.side_effect = lambda content: [
+        RichCHTElement(question_name=column, group=False, odk_type="calculate", path=f"/{content.decode()}/{column}", excel_line_number=1, calculation="${a} + 1")
+        for column in form_columns[content.decode()]
+    ]
+    mock_dependencies["sql_parser_repo"].parse_columns.side_effect = lambda sql: [
+        ParsedColumnDTO(column_name=column, json_path=f"$.fields.{column}", sql_type="INT64")
+        for column in form_columns[sql.replace("sql of formview_", "")]
+    ]
+
+    first = service.generate_catalog("MALI", incremental=True)
+    assert [(row.xlsform_name, row.column_name) for row in first.added_rows] == [("form_a", "total"), ("form_b", "score")]
+    assert first.removed_rows == []
+
+    # An enrichment run describes both calculations, and its result is saved to the store
+    for row in first.catalog_rows:
+        row.label_en = f"AI description of {row.column_name}"
+    service.save_catalog("MALI", first)
+
+    # form_b's XLSForm changes: a column is added next to the unchanged one
+    xlsform_shas[get_xlsform_path("MALI", "form_b")] = "sha-b2"
+    form_columns["form_b"] = ["score", "bonus"]
+    mock_dependencies["code_repo"].download_file.reset_mock()
+
+    # Act
+    second = service.generate_catalog("MALI", incremental=True)
+
+    # Assert: form_a is not downloaded again and every unchanged row keeps its description
+    mock_dependencies["code_repo"].download_file.assert_called_once_with(branch="master", file_path=get_xlsform_path("MALI", "form_b"))
+    assert second.reused_forms == ["form_a"]
+    assert second.regenerated_forms == ["form_b"]
+    assert {row.column_name: row.label_en for row in second.catalog_rows} == {
+        "total": "AI description of total", "score": "AI description of score", "bonus": ""
+    }
+    assert [(row.xlsform_name, row.column_name) for row in second.added_rows] == [("form_b", "bonus")]
+    assert second.removed_rows == []
+
+    # A full regeneration rebuilds every form, keeps the descriptions of unchanged rows and reports removed columns
+    form_columns["form_a"] = []
+    third = service.generate_catalog("MALI")
+    assert third.reused_forms == []
+    assert {row.column_name: row.label_en for row in third.catalog_rows} == {"score": "AI description of score", "bonus": ""}
+    assert [(row.xlsform_name, row.column_name) for row in third.removed_rows] == [("form_a", "total")]
+
+def test_generate_catalog_keeps_the_stored_rows_of_forms_that_fail(mock_dependencies):
+    # Arrange: a first run catalogs and describes two forms
+    store = InMemoryCatalogStoreRepository()
+    service = _service(mock_dependencies, catalog_store_repo=store)
+
+    failing_forms = set()
+
+    def download_file(branch, file_path):
+        form_id = os.path.basename(file_path).replace(".xlsx", "")
+        if form_id in failing_forms:
+            raise Exception("GitHub is unavailable")
+        return form_id.encode()
+
+    mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a", "form_b"]
+    mock_dependencies["code_repo"].download_file.side_effect = download_file
+    mock_dependencies["dw_repo"].get_view_query.side_effect = lambda project, dataset, view: f"sql of {view}"
+    mock_dependencies["xlsform_repo"].get_rich_elements_from_file.side_effect = lambda content: [
+        RichCHTElement(question_name="total", group=False, odk_type="calculate", path=f"/{content.decode()}/total", excel_line_number=1, calculation="${a} + 1")
+    ]
+    mock_dependencies["sql_parser_repo"].parse_columns.return_value = [
+        ParsedColumnDTO(column_name="total", json_path="$.fields.total", sql_type="INT64")
+    ]
+
+    first = service.generate_catalog("MALI")
+    for row in first.catalog_rows:
+        row.label_en = f"AI description of {row.xlsform_name}"
+    service.save_catalog("MALI", first)
+
+    # Act: form_b cannot be downloaded on the next full run
+    failing_forms.add("form_b")
+    second = service.generate_catalog("MALI")
+
+    # Assert: form_b's rows are neither removed from the store nor reported as removed
+    assert [row.xlsform_name for row in second.catalog_rows] == ["form_a"]
+    assert second.removed_rows == []
+    stored = store.load_forms("MALI")
+    assert {form_id: [row.label_en for row in record.rows] for form_id, record in stored.items()} == {
+        "form_a": ["AI description of form_a"], "form_b": ["AI description of form_b"]
+    }
+
+def test_stream_catalog_async_yields_each_form_rows_then_the_result(mock_dependencies):
+    service = _service(mock_dependencies, max_workers=2)
+
+    mock_dependencies["cht_app_repo"].get_installed_xform_ids.return_value = ["form_a", "form_b"]
+    mock_dependencies["code_repo"].download_file.side_effect = lambda branch, file_path: os.path.basename(file_path).replace(".xlsx", "").encode()
+    mock_dependencies["dw_repo"].get_view_query.return_value = "sql_content"
+    mock_dependencies["xlsform_repo"].get_rich_elements_from_file.side_effect = lambda content: [
+        RichCHTElement(question_name="q", group=False, odk_type="text", path=f"/{content.decode()}/q", excel_line_number=1)
+    ]
+    mock_dependencies["sql_parser_repo"].parse_columns.return_value = [
+        ParsedColumnDTO(column_name="q", json_path="$.fields.q", sql_type="STRING")
+    ]
+
+    async def collect():
+        return [event async for event in service.stream_catalog_async("MALI")]
+
+    events = asyncio.run(collect())
+
+    cataloged = [event for event in events if event.stage == "cataloging" and event.form_id]
+    assert sorted((event.form_id, [row.xlsform_name for row in event.form_result]) for event in cataloged) == [("form_a", ["form_a"]), ("form_b", ["form_b"])]
+    assert events[-1].stage == "done"
+    assert [row.xlsform_name for row in events[-1].result.catalog_rows] == ["form_a", "form_b"]
@@ -0,0 +1,41 @@
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from application.services.form_comparator_service_impl import FormComparatorServiceImpl
+from application.dtos import FoundReferenceDTO, NotFoundElementDTO
+from domain.entities.CHTElement import CHTElement
+
+def _element(name: str, json_path: str) -> CHTElement:
+    return CHTElement(name, False, 'text', f'/form/{name}', 2, json_path)
+
+def test_compare_elements_to_sql_reports_counts_and_lines():
+    """Each json_path is reported with all its exact literal occurrences and their 1-based lines."""
+    sql = (
+        "SELECT\n"
+        "  JSON_EXTRACT_SCALAR(doc, '$.fields.age') AS age,\n"
+        "  JSON_EXTRACT_SCALAR(doc, '$.fields.age_months') AS age_months\n"
+        "FROM table\n"
+        "WHERE JSON_EXTRACT_SCALAR(doc, '$.fields.age') IS NOT NULL"
+    )
+    elements = [
+        _element('age', '$.fields.age'),
+        _element('age_months', '$.fields.age_months'),
+        _element('name_bm', '$.fields.name_bm'),
+        _element('weight', '$.fields.weight'),
+        CHTElement('intro', False, 'note', '/form/intro', 3, None),
+    ]
+    service = FormComparatorServiceImpl(xlsform_repository=MagicMock(), dw_repository=MagicMock())
+
+    result = service._compare_elements_to_sql(elements, sql, 'RCI')
+
+    assert result.founds == [
+        FoundReferenceDTO('age', '$.fields.age', 2, [2, 5]),
+        FoundReferenceDTO('age_months', '$.fields.age_months', 1, [3]),
+    ]
+    assert result.not_founds == [NotFoundElementDTO('weight', '$.fields.weight')]
+    assert result.not_found_bm_elements == [NotFoundElementDTO('name_bm', '$.fields.name_bm')]
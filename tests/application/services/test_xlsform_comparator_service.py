@@ -24,6 +24,9 @@ class FakeRichXLSFormRepository(RichXLSFormRepository):
             return self._old
         return self._new
 
+    def get_formula_context_as_markdown(self, file_content: bytes, formulas: List[str]) -> str:
+        return ""
+
 class FakeSemanticComparator(SemanticComparatorRepository):
     def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
         # Simulate a positive match only for a specific pair
@@ -88,3 +91,182 @@ def test_compare_finds_semantic_matches():
     assert len(result.modified_elements) == 2
     assert result.modified_elements[0].reason == "Reworded (Title Match)"
     assert result.modified_elements[1].reason == "Reworded (Formula Match)"
+
+class BatchScoringSemanticComparator(FakeSemanticComparator):
+    """Scores title pairs from a fixed (title1, title2) table, 0.0 when absent, and records every batched call."""
+    def __init__(self, title_scores):
+        self.title_scores = title_scores
+        self.calls = []
+
+    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        raise AssertionError("Layer 3 must use the batched API")
+
+    def score_title_similarities(self, titles1, titles2):
+        self.calls.append(("titles", list(titles1), list(titles2)))
+        return [[self.title_scores.get((title1, title2), 0.0) for title2 in titles2] for title1 in titles1]
+
+    def score_formula_similarities(self, formulas1, formulas2):
+        self.calls.append(("formulas", list(formulas1), list(formulas2)))
+        return [[1.0 if f1 == "1+1" and f2 == "2-1" else 0.0 for f2 in formulas2] for f1 in formulas1]
+
+    def generate_descriptions_from_formula(self, formula, context_description=None):
+        return {"fr": "", "en": "", "bm": ""}
+
+def test_semantic_matching_scores_only_shortlisted_pairs_and_keeps_best_match():
+    # Arrange
+    old_elements = [
+        RichCHTElement("a", False, "text", "/data/a", 1, {"fr": "Âge"}),
+        RichCHTElement("b", False, "text", "/data/b", 2, {"fr": "Poids"}),
+        RichCHTElement("c", False, "calculate", "/data/c", 3, calculation="1+1"),
+    ]
+    new_elements = [
+        RichCHTElement("x", False, "text", "/data/x", 1, {"fr": "Poids en kg"}),
+        RichCHTElement("y", False, "text", "/data/y", 2, {"fr": "Âge en années"}),
+        RichCHTElement("z", False, "calculate", "/data/z", 3, calculation="2-1"),
+    ]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={
+        ("Âge", "Poids en kg"): 0.6, ("Âge", "Âge en années"): 0.9,
+        ("Poids", "Poids en kg"): 0.8, ("Poids", "Âge en années"): 0.7,
+    })
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo
+    )
+
+    # Act
+    result = service.compare_forms(b'old', b'new', False, False, False, True, True)
+
+    # Assert: both titles are scored in one call, but each only shares words with one candidate,
+    # so the cross pairs (0.6 and 0.7) cannot be matched.
+    assert [call for call in semantic_repo.calls if call[0] == "titles"] == [
+        ("titles", ["Âge", "Poids"], ["Poids en kg", "Âge en années"]),
+    ]
+    assert [kind for kind, _, _ in semantic_repo.calls].count("formulas") == 1
+    pairs = [(m.old_element.question_name, m.new_element.question_name, m.reason) for m in result.modified_elements]
+    assert pairs == [
+        ("a", "y", "Reworded (Title Match)"),
+        ("b", "x", "Reworded (Title Match)"),
+        ("c", "z", "Reworded (Formula Match)"),
+    ]
+    assert result.new_elements == [] and result.deleted_elements == []
+
+def test_lexical_tier_accepts_near_identical_pairs_and_prunes_ai_candidates():
+    # Arrange: "q_weight" shares nothing with "Date du jour", so with k=1 only
+    # its closest candidate "Poids (kg)" is sent to the model.
+    old_elements = [
+        RichCHTElement("q_age", False, "text", "/data/g1/q_age", 1, {"fr": "Âge du patient"}),
+        RichCHTElement("q_weight", False, "text", "/data/q_weight", 2, {"fr": "Poids"}),
+    ]
+    new_elements = [
+        RichCHTElement("q_age", False, "text", "/data/g1/q_age_renamed/q_age", 1, {"fr": "age du PATIENT"}),
+        RichCHTElement("q_poids", False, "text", "/data/q_poids", 2, {"fr": "Poids (kg)"}),
+        RichCHTElement("q_day", False, "text", "/data/q_day", 3, {"fr": "Date du jour"}),
+    ]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={("Poids", "Poids (kg)"): 0.95})
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo,
+        lexical_top_k=1
+    )
+
+    # Act
+    result = service.compare_forms(b'old', b'new', False, False, False, True, False)
+
+    # Assert: q_age is matched by name in layer 2; q_weight only reaches the model with its single shortlisted candidate.
+    assert semantic_repo.calls == [("titles", ["Poids"], ["Poids (kg)"])]
+    pairs = [(m.old_element.question_name, m.new_element.question_name, m.reason) for m in result.modified_elements]
+    assert pairs == [("q_age", "q_age", "Moved"), ("q_weight", "q_poids", "Reworded (Title Match)")]
+    assert [el.question_name for el in result.new_elements] == ["q_day"]
+
+def test_ai_tier_scores_all_pending_elements_in_one_call_and_matches_only_shortlists():
+    # With k=1 each old element has a different single candidate; the model prefers a cross pair
+    # for q_weight, which must not be matched since it is outside q_weight's shortlist.
+    old_elements = [
+        RichCHTElement("q_weight", False, "text", "/data/q_weight", 1, {"fr": "Poids"}),
+        RichCHTElement("q_height", False, "text", "/data/q_height", 2, {"fr": "Taille"}),
+        RichCHTElement("q_temp", False, "text", "/data/q_temp", 3, {"fr": "Température"}),
+    ]
+    new_elements = [
+        RichCHTElement("q_poids", False, "text", "/data/q_poids", 1, {"fr": "Poids (kg)"}),
+        RichCHTElement("q_taille", False, "text", "/data/q_taille", 2, {"fr": "Taille (cm)"}),
+        RichCHTElement("q_temperature", False, "text", "/data/q_temperature", 3, {"fr": "Température (°C)"}),
+    ]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={
+        ("Poids", "Poids (kg)"): 0.6, ("Poids", "Taille (cm)"): 0.99,
+        ("Taille", "Taille (cm)"): 0.95, ("Température", "Température (°C)"): 0.95,
+    })
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo,
+        lexical_top_k=1,
+        lexical_accept_threshold=1.1  # Disables the lexical tier.
+    )
+
+    result = service.compare_forms(b'old', b'new', False, False, False, True, False)
+
+    assert semantic_repo.calls == [("titles", ["Poids", "Taille", "Température"], ["Poids (kg)", "Taille (cm)", "Température (°C)"])]
+    pairs = [(m.old_element.question_name, m.new_element.question_name) for m in result.modified_elements]
+    assert pairs == [("q_weight", "q_poids"), ("q_height", "q_taille"), ("q_temp", "q_temperature")]
+
+def test_lexical_tier_matches_locally_without_ai():
+    old_elements = [RichCHTElement("first_name", False, "text", "/data/first_name", 1, {"fr": "Prénom du patient"})]
+    new_elements = [RichCHTElement("firstname", False, "text", "/data/firstname", 1, {"fr": "Prénom du patient"})]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={})
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo,
+        lexical_accept_threshold=0.6
+    )
+
+    result = service.compare_forms(b'old', b'new', False, False, False, True, False)
+
+    assert semantic_repo.calls == []
+    assert [(m.old_element.question_name, m.new_element.question_name) for m in result.modified_elements] == [("first_name", "firstname")]
+
+def test_equivalent_formulas_are_matched_locally_without_ai():
+    old_elements = [
+        RichCHTElement("is_old", False, "calculate", "/data/is_old", 1, calculation="if(${age} > 5, 'old', \"young\")"),
+        RichCHTElement("total", False, "calculate", "/data/total", 2, calculation="${a} + ${b}"),
+    ]
+    new_elements = [
+        RichCHTElement("sum_ab", False, "calculate", "/data/sum_ab", 1, calculation="(${b}+${a})"),
+        RichCHTElement("age_class", False, "calculate", "/data/age_class", 2, calculation="if((5 < ${age}),\"old\",'young')"),
+    ]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={})
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo,
+        lexical_accept_threshold=1.1  # Disables the lexical tier.
+    )
+
+    result = service.compare_forms(b'old', b'new', False, False, False, False, True)
+
+    assert semantic_repo.calls == []
+    pairs = [(m.old_element.question_name, m.new_element.question_name, m.reason) for m in result.modified_elements]
+    assert pairs == [("is_old", "age_class", "Reworded (Formula Match)"), ("total", "sum_ab", "Reworded (Formula Match)")]
+
+def test_semantic_matching_maximizes_total_similarity_instead_of_first_best():
+    # Greedily, "a" would take "x" (0.9) and leave "b" without any candidate above the threshold.
+    # All titles share "Poids", so both new elements are on both shortlists.
+    old_elements = [
+        RichCHTElement("a", False, "text", "/data/a", 1, {"fr": "Poids de la mère"}),
+        RichCHTElement("b", False, "text", "/data/b", 2, {"fr": "Poids de l'enfant"}),
+    ]
+    new_elements = [
+        RichCHTElement("x", False, "text", "/data/x", 1, {"fr": "Poids mère (kg)"}),
+        RichCHTElement("y", False, "text", "/data/y", 2, {"fr": "Poids enfant (kg)"}),
+    ]
+    semantic_repo = BatchScoringSemanticComparator(title_scores={
+        ("Poids de la mère", "Poids mère (kg)"): 0.9, ("Poids de la mère", "Poids enfant (kg)"): 0.8,
+        ("Poids de l'enfant", "Poids mère (kg)"): 0.85, ("Poids de l'enfant", "Poids enfant (kg)"): 0.1,
+    })
+    service = XLSFormComparatorServiceImpl(
+        xlsform_repo=FakeRichXLSFormRepository(old_elements, new_elements),
+        semantic_repo=semantic_repo,
+        lexical_accept_threshold=1.1  # Disables the lexical tier.
+    )
+
+    result = service.compare_forms(b'old', b'new', False, False, False, True, False)
+
+    pairs = [(m.old_element.question_name, m.new_element.question_name) for m in result.modified_elements]
+    assert pairs == [("a", "y"), ("b", "x")]
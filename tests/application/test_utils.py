@@ -0,0 +1,58 @@
+import pytest
+import sys
+import os
+import asyncio
+import itertools
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from application.utils import ProgressReporter, iterate_sync, stream_progress
+
+def test_progress_reporter_estimates_the_time_left_in_a_stage():
+    events = []
+    ticks = itertools.count()
+    reporter = ProgressReporter(events.append, clock=lambda: float(next(ticks)))
+
+    reporter.start_stage("fetching", 4)
+    reporter.form_done("form_a")
+    reporter.finish("result")
+
+    assert [(event.stage, event.forms_done, event.forms_total) for event in events] == [("fetching", 0, 4), ("fetching", 1, 4), ("done", 1, 4)]
+    assert events[0].eta_seconds is None
+    # One form took 2 ticks since the stage started, so the three others should take 6.
+    assert events[1].eta_seconds == 6.0
+    assert events[1].fraction_done == 0.25
+    assert events[-1].result == "result"
+
+def test_stream_progress_yields_events_then_raises_the_operation_error():
+    async def run(reporter):
+        reporter.start_stage("auditing", 1)
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def collect(received):
+        async for event in stream_progress(run):
+            received.append(event.stage)
+
+    received = []
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(collect(received))
+    assert received == ["auditing"]
+
+def test_iterate_sync_hands_items_over_and_stops_when_closed_early():
+    async def numbers():
+        for number in itertools.count():
+            yield number
+            await asyncio.sleep(0.001)
+
+    # An endless iterator: closing the sync one must stop it, or close() would never return.
+    iterator = iterate_sync(numbers)
+    assert [next(iterator) for _ in range(3)] == [0, 1, 2]
+    iterator.close()
+
+    assert list(iterate_sync(lambda: _async_range(3))) == [0, 1, 2]
+
+async def _async_range(count):
+    for number in range(count):
+        yield number
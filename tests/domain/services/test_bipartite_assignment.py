@@ -0,0 +1,41 @@
+import itertools
+import sys
+import os
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.services.bipartite_assignment import best_assignment
+
+def _brute_force_total(scores: np.ndarray, threshold: float) -> float:
+    if scores.shape[0] > scores.shape[1]:
+        scores = scores.T
+    rows, columns = scores.shape
+    return max(
+        sum(scores[row, column] for row, column in enumerate(columns_order) if scores[row, column] >= threshold)
+        for columns_order in itertools.permutations(range(columns), rows)
+    )
+
+def test_assignment_prefers_the_best_total_over_the_best_first_pair():
+    assert best_assignment([[0.9, 0.8], [0.85, 0.1]], 0.5) == [(0, 1, 0.8), (1, 0, 0.85)]
+
+def test_pairs_below_threshold_or_not_allowed_are_never_made():
+    scores = [[0.4, float("-inf")], [float("nan"), 0.7]]
+
+    assert best_assignment(scores, 0.5) == [(1, 1, 0.7)]
+    assert best_assignment([[0.1]], 0.5) == []
+    assert best_assignment([], 0.5) == []
+
+def test_assignment_matches_brute_force_on_random_rectangular_matrices():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        rows, columns = rng.integers(1, 6, size=2)
+        scores = rng.random((rows, columns))
+        scores[rng.random((rows, columns)) < 0.3] = -np.inf
+
+        pairs = best_assignment(scores, 0.5)
+
+        assert len({row for row, _, _ in pairs}) == len(pairs) == len({column for _, column, _ in pairs})
+        assert abs(sum(score for _, _, score in pairs) - _brute_force_total(scores, 0.5)) < 1e-9
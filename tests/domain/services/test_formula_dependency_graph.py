@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.services.formula_dependency_graph import FormulaDependencyGraph, referenced_names
+
+SURVEY_ROWS = [
+    {'type': 'integer', 'name': 'age', 'constraint': '. >= 0'},
+    {'type': 'select_one yes_no', 'name': 'is_pregnant', 'relevant': "${sex} = 'female'"},
+    {'type': 'select_one sex', 'name': 'sex'},
+    {'type': 'calculate', 'name': 'is_adult', 'calculation': '${age} >= 18'},
+    {'type': 'calculate', 'name': 'needs_anc', 'calculation': "${is_adult} and ${is_pregnant} = 'yes'"},
+    {'type': 'select_one village', 'name': 'village', 'choice_filter': 'district = ${district}'},
+    {'type': 'select_one district', 'name': 'district'},
+    {'type': 'calculate', 'name': 'loop_a', 'calculation': '${loop_b}'},
+    {'type': 'calculate', 'name': 'loop_b', 'calculation': '${loop_a}'},
+    {'type': 'note', 'name': 'unrelated'},
+]
+
+def test_referenced_names_are_distinct_and_ordered():
+    assert referenced_names("${b} + ${a} + ${ b }") == ["b", "a"]
+    assert referenced_names("") == []
+
+def test_closure_follows_every_reference_column_transitively():
+    graph = FormulaDependencyGraph(SURVEY_ROWS)
+
+    # needs_anc -> is_adult -> age, and is_pregnant is only relevant when ${sex} is set.
+    assert graph.closure("${is_adult} and ${is_pregnant} = 'yes'") == {"is_adult", "age", "is_pregnant", "sex"}
+    assert graph.closure("${village}") == {"village", "district"}
+    assert graph.dependencies("village") == {"district"}
+
+def test_closure_tolerates_cycles_and_unknown_names():
+    graph = FormulaDependencyGraph(SURVEY_ROWS)
+
+    assert graph.closure("${loop_a}") == {"loop_a", "loop_b"}
+    assert graph.closure("${not_in_the_form} + 1") == {"not_in_the_form"}
+
+def test_context_rows_are_the_formula_rows_and_their_closure_in_sheet_order():
+    graph = FormulaDependencyGraph(SURVEY_ROWS)
+
+    assert graph.context_rows(["${age} >= 18"]) == [0, 3]
+    assert graph.context_rows(["${is_adult} and ${is_pregnant} = 'yes'", "${village}"]) == [0, 1, 2, 3, 4, 5, 6]
+    assert graph.context_rows(["today()"]) == []
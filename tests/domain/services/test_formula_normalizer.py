@@ -0,0 +1,28 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.services.formula_normalizer import normalize_formula
+
+@pytest.mark.parametrize("first, second", [
+    ("${age} * 12", "${ age }*12"),
+    ("if(${sex} = \"female\", 1, 0)", "if( ${sex}='female',1,0 )"),
+    ("../inputs/contact/date_of_birth", " ../inputs/contact/date_of_birth "),
+    ("${a}!=''", "${a} != ''"),
+])
+def test_layout_differences_share_one_key(first, second):
+    assert normalize_formula(first) == normalize_formula(second)
+
+@pytest.mark.parametrize("first, second", [
+    ("${age} * 12", "${weight} * 12"),
+    ("'a b'", "'ab'"),
+    ("date-of-birth", "date - of - birth"),
+])
+def test_meaning_differences_keep_distinct_keys(first, second):
+    assert normalize_formula(first) != normalize_formula(second)
+
+def test_string_with_a_single_quote_keeps_double_quotes():
+    assert normalize_formula("concat(\"l'enfant\",  ${name})") == "concat ( \"l'enfant\" , ${name} )"
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.entities.RichCHTElement import RichCHTElement
+from domain.services.lexical_candidate_index import LexicalCandidateIndex, character_ngrams, element_text, normalize_text
+
+def _element(name, fr="", calculation=None, odk_type="text"):
+    return RichCHTElement(name, False, odk_type, f"/form/{name}", 1, {"fr": fr}, calculation)
+
+def test_normalize_text_strips_accents_and_variable_references():
+    assert normalize_text("Âge de l'${patient_name}") == "age de l' patient_name "
+
+def test_element_text_combines_titles_name_and_calculation():
+    element = RichCHTElement("bmi", False, "calculate", "/form/bmi", 1, {"fr": "IMC", "en": "BMI"}, "${weight} div ${height}")
+    assert element_text(element) == "IMC BMI bmi ${weight} div ${height}"
+
+def test_character_ngrams_pad_each_word():
+    assert character_ngrams("Ab") == {" ab": 1, "ab ": 1}
+
+def test_top_candidates_ranks_by_similarity_and_skips_unrelated():
+    candidates = [
+        _element("visit_date", "Date de la visite"),
+        _element("patient_age", "Âge du patient"),
+        _element("patient_age_months", "Âge du patient en mois"),
+    ]
+    index = LexicalCandidateIndex(candidates)
+
+    ranked = index.top_candidates(_element("patient_age", "Age du patient"), k=2)
+
+    assert [i for i, _ in ranked] == [1, 2]
+    assert ranked[0][1] > 0.99
+    assert ranked[0][1] > ranked[1][1]
+    assert index.top_candidates(_element("zz", "xyz"), k=3) == []
+
+def test_top_candidates_use_normalized_calculations():
+    candidates = [_element("a", calculation="${weight} div ${height}", odk_type="calculate"), _element("b", calculation="today()", odk_type="calculate")]
+    index = LexicalCandidateIndex(candidates)
+
+    ranked = index.top_candidates(_element("c", calculation="${weight}  div  ${height}", odk_type="calculate"), k=1)
+
+    assert ranked[0][0] == 0
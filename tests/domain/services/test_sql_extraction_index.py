@@ -0,0 +1,80 @@
+import pytest
+import sys
+import os
+import re
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.services.sql_extraction_index import SQLExtractionIndex, get_sql_extraction_index
+
+SQL = """
+SELECT f.uuid,
+  ARRAY(
+    SELECT AS STRUCT
+      JSON_EXTRACT_SCALAR(item, '$.child_name') AS child_name,
+      json_extract_scalar( ITEM ,"$.Child_Age" ) AS child_age
+    FROM UNNEST(JSON_EXTRACT_ARRAY(f.doc, '$.fields.children')) AS item
+  ) AS children,
+  JSON_EXTRACT_SCALAR(f.doc, '$.fields.patient_name') AS patient_name
+FROM form f, unnest ( json_extract_array(f.doc,
+  "$.fields.visits" ) ) AS visit
+"""
+
+def _struct_regex(sql: str, json_path: str) -> bool:
+    pattern = re.compile(r"JSON_EXTRACT_SCALAR\s*\(\s*item\s*,\s*['\"]" + re.escape(json_path) + r"['\"]\s*\)", re.IGNORECASE | re.DOTALL)
+    return pattern.search(sql) is not None
+
+def _unnest_regex(sql: str, json_path: str) -> bool:
+    pattern = re.compile(r"UNNEST\s*\(\s*JSON_EXTRACT_ARRAY\s*\([^,]+,\s*['\"]" + re.escape(json_path) + r"['\"]\s*\)", re.IGNORECASE | re.DOTALL)
+    return pattern.search(sql) is not None
+
+@pytest.mark.parametrize("json_path", ['$.child_name', '$.child_age', '$.CHILD_NAME', '$.patient_name', '$.fields.patient_name', '$.child'])
+def test_struct_lookup_agrees_with_per_element_regex(json_path: str):
+    assert SQLExtractionIndex(SQL).is_extracted_in_struct(json_path) == _struct_regex(SQL, json_path)
+
+@pytest.mark.parametrize("json_path", ['$.fields.children', '$.fields.visits', '$.FIELDS.VISITS', '$.fields.patient_name', '$.fields.child'])
+def test_unnest_lookup_agrees_with_per_repeat_regex(json_path: str):
+    assert SQLExtractionIndex(SQL).is_unnested(json_path) == _unnest_regex(SQL, json_path)
+
+def test_index_is_cached_by_sql_text():
+    assert get_sql_extraction_index(SQL) is get_sql_extraction_index(''.join(SQL))
+    assert get_sql_extraction_index(SQL + " ") is not get_sql_extraction_index(SQL)
+
+def test_references_are_exact_literals_with_lines():
+    """`$.fields.child` is not present just because `$.fields.children` is, and comments are ignored."""
+    index = SQLExtractionIndex(SQL + "-- JSON_EXTRACT_SCALAR(f.doc, '$.fields.commented')\n")
+
+    assert index.references_path('$.fields.children')
+    assert not index.references_path('$.fields.child')
+    assert not index.references_path('$.fields.commented')
+    assert [reference.line for reference in index.occurrences('$.fields.patient_name')] == [9]
+
+def test_occurrences_of_looks_up_exact_literals():
+    """Only whole literals outside comments count, and each path keeps its references in source order."""
+    index = SQLExtractionIndex(SQL + "-- JSON_EXTRACT_SCALAR(f.doc, '$.fields.children')\n")
+    json_paths = ['$.fields.children', '$.fields.child', '$.child_name', '$.fields.patient_name', '$.fields.visits']
+
+    occurrences = index.occurrences_of(json_paths)
+
+    assert set(occurrences) == {'$.fields.children', '$.child_name', '$.fields.patient_name', '$.fields.visits'}
+    assert [reference.line for reference in occurrences['$.fields.children']] == [7]
+    assert [reference.line for reference in occurrences['$.fields.visits']] == [11]
+    for json_path, references in occurrences.items():
+        assert references == [reference for reference in index.references if reference.json_path == json_path]
+
+def test_references_record_function_source_cast_and_alias():
+    sql = (
+        "SELECT SAFE_CAST(JSON_VALUE(f.doc, '$.form.age') AS INT64) AS patient_age,\n"
+        "  CAST(json_extract_scalar(f.doc, \"$.form.dob\") AS DATE) AS `date_of_birth`,\n"
+        "  COALESCE(JSON_VALUE(f.doc, '$.form.name'), '') AS name\n"
+        "FROM t f"
+    )
+    references = {reference.json_path: reference for reference in SQLExtractionIndex(sql).references}
+
+    age = references['$.form.age']
+    assert (age.function, age.source, age.cast_type, age.alias, age.line) == ('JSON_VALUE', 'f.doc', 'INT64', 'patient_age', 1)
+    dob = references['$.form.dob']
+    assert (dob.function, dob.cast_type, dob.alias, dob.line) == ('JSON_EXTRACT_SCALAR', 'DATE', 'date_of_birth', 2)
+    name = references['$.form.name']
+    assert (name.function, name.cast_type, name.alias) == ('JSON_VALUE', None, None)
@@ -0,0 +1,54 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from domain.services.xpath_canonicalizer import (
+    XPathSyntaxError, are_formulas_equivalent, canonicalize_xpath, formula_fingerprint, parse_xpath
+)
+
+@pytest.mark.parametrize("formula1, formula2", [
+    ("${a} + ${b}", "(${b}+${a})"),
+    ("if(${x} > 5, 'yes', \"no\")", "if(5 < ${x},\"yes\",'no')"),
+    ("${a} and ${b} and ${c}", "${c} and (${a} and ${b})"),
+    ("1.0 * ${x}", "${x}*1"),
+    ("selected(${a}, 'yes') or -1 > ${b}", "${b} < -1 or selected( ${ a } ,'yes')"),
+    ("instance('contact-summary')/context/pregnant = 'true'", "'true' = instance(\"contact-summary\")/context/pregnant"),
+    ("count(${r}[. = 'x'])", "count(${r}[.='x'])"),
+])
+def test_equivalent_formulas_share_a_fingerprint(formula1, formula2):
+    assert are_formulas_equivalent(formula1, formula2)
+
+@pytest.mark.parametrize("formula1, formula2", [
+    ("${a} - ${b}", "${b} - ${a}"),
+    ("${a} div 2", "2 div ${a}"),
+    ("concat(${a}, ${b})", "concat(${b}, ${a})"),
+    ("${a} < ${b}", "${b} < ${a}"),
+    ("${a} + ${b} * ${c}", "(${a} + ${b}) * ${c}"),
+    ("'1'", "1"),
+])
+def test_different_formulas_have_different_fingerprints(formula1, formula2):
+    assert not are_formulas_equivalent(formula1, formula2)
+
+def test_operator_precedence_and_paths():
+    assert parse_xpath("${a} or ${b} and ${c} = 1") == (
+        'operator', 'or', (('reference', 'a'), ('operator', 'and', (('reference', 'b'), ('operator', '=', (('reference', 'c'), ('number', 1.0))))))
+    )
+    # Names may contain '-' and '.', so "date-of-birth" is one step and "* 3" a multiplication.
+    assert canonicalize_xpath("../date-of-birth * 3") == ('operator', '*', (
+        ('number', 3.0),
+        ('path', '/', ('step', 'parent', 'node()', ()), ('step', 'child', 'date-of-birth', ())),
+    ))
+    assert parse_xpath("/data/@id") == ('path', '/', ('path', '/', ('root',), ('step', 'child', 'data', ())), ('step', 'attribute', 'id', ()))
+
+@pytest.mark.parametrize("formula", ["${a} +", "concat(", "'unterminated", "${a} ${b}", "//", ""])
+def test_unparseable_formulas_have_no_fingerprint(formula):
+    assert formula_fingerprint(formula) is None
+    assert not are_formulas_equivalent(formula, formula)
+
+def test_syntax_error_is_a_value_error():
+    with pytest.raises(ValueError):
+        canonicalize_xpath("if(${a},")
+    assert issubclass(XPathSyntaxError, ValueError)
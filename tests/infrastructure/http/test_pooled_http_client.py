@@ -0,0 +1,77 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.http.pooled_http_client import PooledHttpClient
+from infrastructure.logging.dummy_logger import DummyLogger
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_requests_to_one_host_reuse_a_single_connection(local_server: str):
+    client = PooledHttpClient(DummyLogger())
+
+    for _ in range(5):
+        assert client.get(f"{local_server}/ping").text == "ok"
+
+    stats = client.get_stats()[local_server]
+    assert stats.requests == 5
+    assert stats.errors == 0
+    assert stats.connections_opened == 1
+    assert stats.reused_connections == 4
+    assert stats.average_latency_seconds > 0
+    client.close()
+
+def test_read_timeout_is_applied_and_counted(local_server: str):
+    client = PooledHttpClient(DummyLogger(), read_timeout_seconds=0.1)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get(f"{local_server}/slow")
+
+    assert client.get_stats([f"{local_server}/slow"])[local_server].errors == 1
+    client.close()
+
+def test_log_stats_logs_one_line_per_host(local_server: str):
+    logger = MagicMock()
+    client = PooledHttpClient(logger)
+
+    client.get(f"{local_server}/ping")
+    client.get(f"{local_server}/ping")
+    logger.reset_mock()
+    client.log_stats()
+
+    logger.log_info.assert_called_once()
+    message = logger.log_info.call_args[0][0]
+    assert message.startswith(f"HTTP {local_server}: 2 requests, 0 errors")
+    assert "1 connections opened, 1 reused" in message
+    client.close()
@@ -0,0 +1,46 @@
+import sys
+import os
+from unittest.mock import patch
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.http.request_rate_limiter import RequestRateLimiter, RetryPolicy
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@patch('infrastructure.http.request_rate_limiter.time.sleep')
+def test_rate_limiter_lets_a_burst_through_then_spaces_requests(mock_sleep):
+    clock = _Clock()
+    limiter = RequestRateLimiter(requests_per_minute=60, burst=2, clock=clock)
+
+    limiter.acquire()
+    limiter.acquire()
+    mock_sleep.assert_not_called()
+
+    # The bucket is empty: the next callers queue one second apart.
+    limiter.acquire()
+    limiter.acquire()
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
+
+    # Tokens refill with time, up to the burst size.
+    clock.now = 10.0
+    mock_sleep.reset_mock()
+    limiter.acquire()
+    limiter.acquire()
+    mock_sleep.assert_not_called()
+
+def test_retry_delays_grow_exponentially_up_to_the_cap():
+    policy = RetryPolicy(max_attempts=6, base_delay_seconds=2, max_delay_seconds=10, random_source=lambda low, high: high)
+
+    assert [policy.delay(n) for n in range(1, 6)] == [2, 4, 8, 10, 10]
+
+def test_retry_delays_are_jittered_from_zero():
+    policy = RetryPolicy(base_delay_seconds=1, random_source=lambda low, high: low)
+
+    assert policy.delay(3) == 0.0
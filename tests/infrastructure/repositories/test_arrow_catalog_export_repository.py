@@ -0,0 +1,51 @@
+import io
+import sys
+import os
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+pytest.importorskip("pyarrow")
+
+from application.dtos import DataCatalogRowDTO
+from infrastructure.repositories.arrow_catalog_export_repository import ArrowCatalogExportRepository
+
+def _rows(count):
+    return [
+        DataCatalogRowDTO(f"formview_form_{i % 3}", f"form_{i % 3}", f"column_{i}", "STRING", f"$.fields.column_{i}", "text", label_fr=f"Libellé {i}")
+        for i in range(count)
+    ]
+
+@pytest.mark.parametrize("file_format, extension", [("parquet", ".parquet"), ("feather", ".feather"), ("csv", ".csv")])
+def test_export_round_trips_every_row(tmp_path, file_format, extension):
+    repository = ArrowCatalogExportRepository(batch_size=4)
+    rows = _rows(10)
+    path = str(tmp_path / f"catalog{extension}")
+
+    # Rows are consumed lazily, batch by batch
+    repository.export(iter(rows), path, file_format)
+    table = repository.read_table(path)
+
+    assert table.num_rows == 10
+    assert table.column("column_name").to_pylist() == [row.column_name for row in rows]
+    assert table.column("xlsform_name").to_pylist() == [row.xlsform_name for row in rows]
+    assert table.column("label_fr").to_pylist()[9] == "Libellé 9"
+
+def test_repetitive_columns_are_dictionary_encoded():
+    table = ArrowCatalogExportRepository(batch_size=4).to_table(_rows(10))
+
+    assert table.column("xlsform_name").num_chunks == 3
+    assert str(table.schema.field("xlsform_name").type).startswith("dictionary")
+    assert str(table.schema.field("column_name").type) == "string"
+
+def test_export_to_a_file_object_and_rejects_unknown_formats():
+    repository = ArrowCatalogExportRepository()
+    buffer = io.BytesIO()
+
+    repository.export(_rows(2), buffer, "csv")
+    assert buffer.getvalue().decode("utf-8").splitlines()[0].startswith('"formview_name","xlsform_name"')
+
+    with pytest.raises(ValueError):
+        repository.export(_rows(2), io.BytesIO(), "xlsx")
@@ -0,0 +1,72 @@
+import pytest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.bigquery_repository import BigQueryRepository
+from infrastructure.logging.dummy_logger import DummyLogger
+
+@pytest.fixture
+def mock_client():
+    with patch('infrastructure.repositories.bigquery_repository.bigquery.Client') as mock_client_class:
+        client = mock_client_class.return_value
+        client.query.return_value.result.return_value = [
+            {"table_name": "formview_delivery", "view_definition": "SELECT 'delivery'"},
+            {"table_name": "formview_pregnancy", "view_definition": "SELECT 'pregnancy'"},
+        ]
+        yield client
+
+def test_load_view_queries_uses_a_single_information_schema_query(mock_client):
+    repository = BigQueryRepository(DummyLogger())
+
+    view_queries = repository.load_view_queries("project", "dataset")
+
+    assert view_queries == {"formview_delivery": "SELECT 'delivery'", "formview_pregnancy": "SELECT 'pregnancy'"}
+    mock_client.query.assert_called_once_with("SELECT table_name, view_definition FROM `project.dataset.INFORMATION_SCHEMA.VIEWS`")
+
+def test_load_view_queries_again_replaces_the_index(mock_client):
+    repository = BigQueryRepository(DummyLogger())
+    repository.load_view_queries("project", "dataset")
+
+    # A view changes and another is created between two audits of a long-running UI.
+    mock_client.query.return_value.result.return_value = [
+        {"table_name": "formview_delivery", "view_definition": "SELECT 'delivery v2'"},
+        {"table_name": "formview_new", "view_definition": "SELECT 'new'"},
+    ]
+    repository.load_view_queries("project", "dataset")
+
+    assert mock_client.query.call_count == 2
+    assert repository.get_view_query("project", "dataset", "formview_delivery") == "SELECT 'delivery v2'"
+    assert repository.get_view_query("project", "dataset", "formview_new") == "SELECT 'new'"
+    with pytest.raises(FileNotFoundError):
+        repository.get_view_query("project", "dataset", "formview_pregnancy")
+
+def test_get_view_query_is_served_from_the_loaded_index(mock_client):
+    repository = BigQueryRepository(DummyLogger())
+    repository.load_view_queries("project", "dataset")
+
+    assert repository.get_view_query("project", "dataset", "formview_delivery") == "SELECT 'delivery'"
+    with pytest.raises(FileNotFoundError):
+        repository.get_view_query("project", "dataset", "formview_unknown")
+    mock_client.get_table.assert_not_called()
+
+def test_get_view_query_falls_back_to_get_table_for_unloaded_datasets(mock_client):
+    mock_client.get_table.return_value.view_query = "SELECT 'other'"
+    repository = BigQueryRepository(DummyLogger())
+
+    assert repository.get_view_query("project", "other_dataset", "formview_other") == "SELECT 'other'"
+    mock_client.get_table.assert_called_once_with("project.other_dataset.formview_other")
+
+def test_failed_reload_falls_back_to_get_table(mock_client):
+    repository = BigQueryRepository(DummyLogger())
+    repository.load_view_queries("project", "dataset")
+
+    mock_client.query.side_effect = Exception("network down")
+    with pytest.raises(Exception):
+        repository.load_view_queries("project", "dataset")
+
+    mock_client.get_table.return_value.view_query = "SELECT 'fresh'"
+    assert repository.get_view_query("project", "dataset", "formview_delivery") == "SELECT 'fresh'"
@@ -0,0 +1,158 @@
+import pytest
+import sys
+import os
+from typing import Dict, List
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.cached_code_repository import CachedCodeRepository, git_blob_sha
+from infrastructure.logging.dummy_logger import DummyLogger
+from domain.contracts.code_repository import CodeRepository
+
+class InMemoryCodeRepository(CodeRepository):
+    """A fake remote repository that counts downloads."""
+    def __init__(self, files: Dict[str, bytes]):
+        self.files = files
+        self.downloads: List[str] = []
+
+    def download_file(self, branch: str, file_path: str) -> bytes:
+        self.downloads.append(file_path)
+        if file_path not in self.files:
+            raise FileNotFoundError(file_path)
+        return self.files[file_path]
+
+    def download_directory(self, branch: str, directory: str) -> Dict[str, bytes]:
+        self.downloads.append(directory)
+        return {path: content for path, content in self.files.items() if os.path.dirname(path) == directory}
+
+    def list_directory(self, branch: str, directory: str) -> Dict[str, str]:
+        return {path: git_blob_sha(content) for path, content in self.files.items() if os.path.dirname(path) == directory}
+
+    def get_file_history(self, branch: str, file_path: str) -> list:
+        return []
+
+@pytest.fixture
+def remote() -> InMemoryCodeRepository:
+    return InMemoryCodeRepository({"forms/app/a.xlsx": b"form a", "forms/app/b.xlsx": b"form b"})
+
+def test_git_blob_sha_matches_git():
+    """`git hash-object` of 'hello\\n' is a well-known value."""
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+def test_repeated_downloads_are_served_from_cache(remote, tmp_path):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+
+    assert repo.download_file("master", "forms/app/a.xlsx") == b"form a"
+    assert repo.download_file("master", "forms/app/a.xlsx") == b"form a"
+    # A fresh instance (e.g. the next audit run) reuses the persisted cache.
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+    assert repo.download_file("master", "forms/app/a.xlsx") == b"form a"
+
+    assert remote.downloads == ["forms/app/a.xlsx"]
+
+def test_changed_blob_is_downloaded_again(remote, tmp_path):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+    repo.download_file("master", "forms/app/a.xlsx")
+
+    remote.files["forms/app/a.xlsx"] = b"form a v2"
+
+    assert repo.download_file("master", "forms/app/a.xlsx") == b"form a v2"
+    assert len(remote.downloads) == 2
+
+def test_directory_download_only_fetches_uncached_blobs_in_bulk(remote, tmp_path):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+    repo.download_file("master", "forms/app/a.xlsx")
+
+    files = repo.download_directory("master", "forms/app")
+    assert set(files) == {"forms/app/a.xlsx", "forms/app/b.xlsx"}
+    assert remote.downloads == ["forms/app/a.xlsx"]  # Nothing is fetched before a value is read.
+
+    assert files["forms/app/b.xlsx"] == b"form b"
+    assert dict(repo.download_directory("master", "forms/app")) == remote.files
+    assert remote.downloads == ["forms/app/a.xlsx", "forms/app"]
+
+def test_missing_file_raises_without_download(remote, tmp_path):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger())
+
+    with pytest.raises(FileNotFoundError):
+        repo.download_file("master", "forms/app/missing.xlsx")
+    assert remote.downloads == []
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    remote = InMemoryCodeRepository({f"forms/app/{i}.xlsx": bytes([i]) * 400_000 for i in range(3)})
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), max_size_mb=1)
+
+    for i in range(3):
+        repo.download_file("master", f"forms/app/{i}.xlsx")
+    repo.download_file("master", "forms/app/0.xlsx")
+
+    # The third download pushed the cache over 1 MB and evicted form 0, which had to be fetched again.
+    assert remote.downloads == ["forms/app/0.xlsx", "forms/app/1.xlsx", "forms/app/2.xlsx", "forms/app/0.xlsx"]
+
+def test_offline_mode_never_calls_the_remote(remote, tmp_path):
+    CachedCodeRepository(remote, str(tmp_path), DummyLogger()).download_file("master", "forms/app/a.xlsx")
+    offline_remote = InMemoryCodeRepository({})
+    repo = CachedCodeRepository(offline_remote, str(tmp_path), DummyLogger(), offline=True)
+
+    assert repo.download_file("master", "forms/app/a.xlsx") == b"form a"
+    assert repo.list_directory("master", "forms/app") == {"forms/app/a.xlsx": git_blob_sha(b"form a")}
+    with pytest.raises(FileNotFoundError):
+        repo.download_file("master", "forms/app/b.xlsx")
+    assert offline_remote.downloads == []
+
+def test_cached_directory_load_writes_the_index_once(remote, tmp_path, monkeypatch):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+    dict(repo.download_directory("master", "forms/app"))
+
+    saves = []
+    original_save = repo._save_index
+    monkeypatch.setattr(repo, "_save_index", lambda: (saves.append(1), original_save()))
+
+    assert dict(repo.download_directory("master", "forms/app")) == remote.files
+    assert len(saves) == 1
+
+def test_file_missing_from_the_bulk_download_is_left_missing(tmp_path):
+    from infrastructure.repositories.lazy_file_mapping import LazyFileMapping
+
+    class PartialArchiveRepository(InMemoryCodeRepository):
+        def download_directory(self, branch, directory):
+            # Both files are listed, but the archive only holds a.xlsx.
+            return LazyFileMapping(self.files, lambda: {"forms/app/a.xlsx": self.files["forms/app/a.xlsx"]})
+
+    remote = PartialArchiveRepository({"forms/app/a.xlsx": b"form a", "forms/app/b.xlsx": b"form b"})
+    files = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0).download_directory("master", "forms/app")
+
+    assert files["forms/app/a.xlsx"] == b"form a"
+    with pytest.raises(FileNotFoundError):
+        files["forms/app/b.xlsx"]
+
+def test_cache_hits_leave_the_index_write_to_the_next_flush(remote, tmp_path, monkeypatch):
+    repo = CachedCodeRepository(remote, str(tmp_path), DummyLogger(), listing_ttl_seconds=0)
+    repo.download_file("master", "forms/app/a.xlsx")
+
+    saves = []
+    original_save = repo._save_index
+    monkeypatch.setattr(repo, "_save_index", lambda: (saves.append(1), original_save()))
+
+    for _ in range(3):
+        assert repo.download_file("master", "forms/app/a.xlsx") == b"form a"
+    assert saves == []
+
+    repo._flush_index()
+    repo._flush_index()
+    assert saves == [1]
+
+def test_blob_changed_between_listing_and_bulk_download_is_stored_under_its_own_sha(tmp_path):
+    class MovedBranchRepository(InMemoryCodeRepository):
+        def list_directory(self, branch, directory):
+            # The listing still has the previous version of a.xlsx.
+            return {"forms/app/a.xlsx": git_blob_sha(b"old form a")}
+
+    remote = MovedBranchRepository({"forms/app/a.xlsx": b"form a"})
+    files = CachedCodeRepository(remote, str(tmp_path), DummyLogger()).download_directory("master", "forms/app")
+    assert files["forms/app/a.xlsx"] == b"form a"
+
+    offline = CachedCodeRepository(InMemoryCodeRepository({}), str(tmp_path), DummyLogger(), offline=True)
+    assert offline.list_directory("master", "forms/app") == {"forms/app/a.xlsx": git_blob_sha(b"form a")}
+    assert offline.download_file("master", "forms/app/a.xlsx") == b"form a"
@@ -0,0 +1,214 @@
+import pytest
+import sys
+import os
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.cached_semantic_comparator import SemanticResponseCache, CachedSemanticComparator, CachedAsyncSemanticComparator
+from infrastructure.logging.dummy_logger import DummyLogger
+from domain.contracts.semantic_comparator_repository import SemanticComparatorRepository
+from domain.contracts.async_semantic_comparator_repository import AsyncSemanticComparatorRepository
+
+class CountingSemanticComparator(SemanticComparatorRepository):
+    """A fake model that counts every call it receives."""
+    model_id = "fake-model"
+
+    def __init__(self):
+        self.calls: List[tuple] = []
+
+    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        self.calls.append(("titles", title1, title2))
+        return title1.lower() == title2.lower()
+
+    def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        self.calls.append(("formulas", formula1, formula2))
+        return formula1 == formula2
+
+    def generate_descriptions_from_formula(self, formula: str, context_description: Optional[str] = None) -> Dict[str, str]:
+        self.calls.append(("descriptions", formula))
+        if formula == "broken":
+            return {"fr": "Error: quota", "en": "Error: quota", "bm": "Error: quota"}
+        return {"fr": f"fr:{formula}", "en": f"en:{formula}", "bm": f"bm:{formula}"}
+
+    def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        self.calls.append(("score_titles", tuple(titles1), tuple(titles2)))
+        return [[1.0 if a == b else 0.0 for b in titles2] for a in titles1]
+
+class AsyncCountingSemanticComparator(AsyncSemanticComparatorRepository):
+    model_id = "fake-model"
+
+    def __init__(self):
+        self.calls: List[tuple] = []
+
+    async def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        self.calls.append(("titles", title1, title2))
+        return title1.lower() == title2.lower()
+
+    async def are_formulas_semantically_similar(self, formula1: str, formula2: str) -> bool:
+        return formula1 == formula2
+
+    async def generate_descriptions_from_formula(self, formula: str, context_description: Optional[str] = None) -> Dict[str, str]:
+        return {"fr": formula, "en": formula, "bm": formula}
+
+    async def get_formula_description_with_context(self, formula: str, form_context: str) -> Dict[str, str]:
+        self.calls.append(("descriptions_with_context", formula))
+        return {"fr": f"fr:{formula}", "en": f"en:{formula}", "bm": f"bm:{formula}"}
+
+@pytest.fixture
+def cache(tmp_path) -> SemanticResponseCache:
+    return SemanticResponseCache(str(tmp_path / "responses.sqlite"), DummyLogger())
+
+def test_repeated_calls_are_served_from_the_cache(cache):
+    inner = CountingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+
+    assert comparator.are_titles_semantically_similar("Âge", "âge") is True
+    assert comparator.are_titles_semantically_similar("Âge ", "  âge") is True  # Whitespace-normalized key.
+    assert comparator.are_formulas_semantically_similar("1+1", "2") is False
+    assert comparator.are_formulas_semantically_similar("1+1", "2") is False
+
+    assert inner.calls == [("titles", "Âge", "âge"), ("formulas", "1+1", "2")]
+    stats = comparator.get_cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 2, 2)
+    assert stats.hit_ratio == 0.5
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    CachedSemanticComparator(CountingSemanticComparator(), SemanticResponseCache(path, DummyLogger())).generate_descriptions_from_formula("${a} + 1")
+
+    inner = CountingSemanticComparator()
+    descriptions = CachedSemanticComparator(inner, SemanticResponseCache(path, DummyLogger())).generate_descriptions_from_formula("${a} + 1")
+
+    assert descriptions == {"fr": "fr:${a} + 1", "en": "en:${a} + 1", "bm": "bm:${a} + 1"}
+    assert inner.calls == []
+
+def test_error_descriptions_are_not_cached(cache):
+    inner = CountingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+
+    comparator.generate_descriptions_from_formula("broken")
+    comparator.generate_descriptions_from_formula("broken")
+
+    assert inner.calls == [("descriptions", "broken"), ("descriptions", "broken")]
+
+class FailingSemanticComparator(CountingSemanticComparator):
+    """A fake model whose yes/no calls fail and whose matrices leave "broken" pairs unscored."""
+
+    def are_titles_semantically_similar(self, title1: str, title2: str) -> bool:
+        self.calls.append(("titles", title1, title2))
+        raise RuntimeError("quota")
+
+    def score_title_similarities(self, titles1: List[str], titles2: List[str]) -> List[List[float]]:
+        self.calls.append(("score_titles", tuple(titles1), tuple(titles2)))
+        return [[math.nan if "broken" in (a, b) else 1.0 for b in titles2] for a in titles1]
+
+def test_failed_model_calls_are_not_cached(cache):
+    inner = FailingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            comparator.are_titles_semantically_similar("Âge", "Age")
+        scores = comparator.score_title_similarities(["a", "broken"], ["a"])
+        assert scores[0] == [1.0] and math.isnan(scores[1][0])
+
+    # The failed yes/no call and the unscored pair are requested again; the scored pair is not.
+    assert inner.calls.count(("titles", "Âge", "Age")) == 2
+    assert [call for call in inner.calls if call[0] == "score_titles"] == [
+        ("score_titles", ("a", "broken"), ("a",)),
+        ("score_titles", ("broken",), ("a",)),
+    ]
+
+def test_model_and_prompt_version_are_part_of_the_key(cache):
+    inner = CountingSemanticComparator()
+    CachedSemanticComparator(inner, cache, prompt_version="1").are_titles_semantically_similar("a", "b")
+    CachedSemanticComparator(inner, cache, prompt_version="2").are_titles_semantically_similar("a", "b")
+    CachedSemanticComparator(inner, cache, model_id="other-model", prompt_version="2").are_titles_semantically_similar("a", "b")
+
+    assert len(inner.calls) == 3
+
+def test_similarity_matrices_only_score_missing_pairs(cache):
+    inner = CountingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+
+    assert comparator.score_title_similarities(["a", "b"], ["a", "c"]) == [[1.0, 0.0], [0.0, 0.0]]
+    assert comparator.score_title_similarities(["a", "b", "d"], ["a", "c"]) == [[1.0, 0.0], [0.0, 0.0], [0.0, 0.0]]
+    assert comparator.score_title_similarities(["b", "a"], ["c", "a"]) == [[0.0, 0.0], [0.0, 1.0]]
+
+    assert inner.calls == [
+        ("score_titles", ("a", "b"), ("a", "c")),
+        ("score_titles", ("d",), ("a", "c")),
+    ]
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = SemanticResponseCache(str(tmp_path / "responses.sqlite"), DummyLogger(), ttl_seconds=0.05)
+    inner = CountingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+
+    comparator.are_titles_semantically_similar("a", "b")
+    time.sleep(0.1)
+    comparator.are_titles_semantically_similar("a", "b")
+
+    assert len(inner.calls) == 2
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    cache = SemanticResponseCache(str(tmp_path / "responses.sqlite"), DummyLogger(), max_entries=2)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    cache.put("b", 2)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.get_stats().entries == 2
+
+def test_get_many_reads_every_key_with_one_select_and_one_commit(cache):
+    cache.put_many([("a", 1), ("b", 2)])
+    statements = []
+    cache._connection.set_trace_callback(statements.append)
+
+    assert cache.get_many(["a", "b", "missing", "a"]) == {"a": 1, "b": 2}
+
+    assert sum(statement.startswith("SELECT") for statement in statements) == 1
+    assert statements.count("COMMIT") == 1
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses) == (2, 1)
+
+def test_async_comparator_shares_the_store(cache):
+    inner = AsyncCountingSemanticComparator()
+    comparator = CachedAsyncSemanticComparator(inner, cache)
+
+    async def run():
+        first = await comparator.get_formula_description_with_context("${a}", "| survey |")
+        second = await comparator.get_formula_description_with_context("${a}", "| survey |")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == {"fr": "fr:${a}", "en": "en:${a}", "bm": "bm:${a}"}
+    assert inner.calls == [("descriptions_with_context", "${a}")]
+    # The synchronous decorator over the same store reuses the response.
+    sync_inner = CountingSemanticComparator()
+    assert CachedSemanticComparator(sync_inner, cache).get_formula_description_with_context("${a}", "| survey |") == first
+    assert sync_inner.calls == []
+
+def test_batched_descriptions_only_request_missing_formulas(cache):
+    inner = CountingSemanticComparator()
+    comparator = CachedSemanticComparator(inner, cache)
+    comparator.get_formula_description_with_context("${a}", "| survey |")
+
+    descriptions = comparator.get_formula_descriptions_with_context(["${a}", "broken", "${b}"], "| survey |")
+
+    assert [d["fr"] for d in descriptions] == ["fr:${a}", "Error: quota", "fr:${b}"]
+    assert inner.calls == [("descriptions", "${a}"), ("descriptions", "broken"), ("descriptions", "${b}")]
+    # Only the successful descriptions are reused by the next run.
+    comparator.get_formula_descriptions_with_context(["${a}", "broken", "${b}"], "| survey |")
+    assert inner.calls[3:] == [("descriptions", "broken")]
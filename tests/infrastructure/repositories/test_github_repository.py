@@ -1,11 +1,15 @@
 import pytest
 import sys
 import os
+import io
+import tarfile
+from unittest.mock import MagicMock
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from infrastructure.repositories.github_repository import GitHubRepository
+from infrastructure.logging.dummy_logger import DummyLogger
 
 # This is an integration test and will make a real API call to GitHub.
 # It requires a GITHUB_PAT to be set, even for public repos, due to rate limiting.
@@ -34,3 +38,41 @@ def test_download_file_from_public_repo():
     assert len(file_content) > 0
     # Check for the copyright notice which should be stable
     assert b"MIT License" in file_content
+
+
+def _tarball(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path, content in files.items():
+            info = tarfile.TarInfo(f"Muso-Health-config-muso-abc123/{path}")
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+def test_download_directory_streams_a_single_archive(monkeypatch):
+    """Listing and archive are two requests in total, whatever the number of files."""
+    monkeypatch.setenv("GITHUB_PAT", "token")
+    listing_response = MagicMock()
+    listing_response.json.return_value = [
+        {"type": "file", "path": "forms/app/a.xlsx", "sha": "1"},
+        {"type": "file", "path": "forms/app/b.xlsx", "sha": "2"},
+        {"type": "dir", "path": "forms/app/media", "sha": "3"},
+    ]
+    archive_response = MagicMock()
+    archive_response.__enter__.return_value = archive_response
+    archive_response.raw = io.BytesIO(_tarball({
+        "forms/app/a.xlsx": b"form a",
+        "forms/app/b.xlsx": b"form b",
+        "forms/other/c.xlsx": b"form c",
+    }))
+    http_client = MagicMock()
+    mock_get = http_client.get
+    mock_get.side_effect = [listing_response, archive_response]
+
+    repository = GitHubRepository(owner="Muso-Health", repo_name="config-muso", logger=DummyLogger(), http_client=http_client)
+    files = repository.download_directory(branch="master", directory="forms/app")
+
+    assert sorted(files) == ["forms/app/a.xlsx", "forms/app/b.xlsx"]
+    assert files["forms/app/a.xlsx"] == b"form a"
+    assert files["forms/app/b.xlsx"] == b"form b"
+    assert mock_get.call_count == 2
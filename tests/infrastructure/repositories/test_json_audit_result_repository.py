@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from application.dtos import (
+    DbDocGroupAuditResultDTO, FormAuditRecordDTO, NotFoundElementDTO, RepeatGroupAuditResultDTO, SingleFormComparisonResultDTO
+)
+from domain.entities.CHTElement import CHTElement
+from infrastructure.repositories.json_audit_result_repository import JsonAuditResultRepository
+from infrastructure.logging.dummy_logger import DummyLogger
+
+def test_records_round_trip_with_their_nested_results(tmp_path):
+    element = CHTElement("stock", False, "integer", "/form_a/doc/stock", 4, "$.stock")
+    record = FormAuditRecordDTO(
+        form_id="form_a",
+        xlsform_sha="abc123",
+        view_fingerprints={"formview_form_a": "f00d", "form_a_doc": None},
+        db_doc_groups=["doc"],
+        claimed_db_doc_groups=["doc"],
+        view_missing=False,
+        result=SingleFormComparisonResultDTO(
+            form_id="form_a",
+            not_found_elements=[NotFoundElementDTO("q", "$.fields.q")],
+            repeat_groups=[RepeatGroupAuditResultDTO("visits", "NOT_FOUND", [element], [NotFoundElementDTO("stock", "$.stock")])],
+            db_doc_groups=[DbDocGroupAuditResultDTO("doc", False, [element])]
+        )
+    )
+    invalid = FormAuditRecordDTO(form_id="form_b", xlsform_sha="def456", invalid=True)
+
+    JsonAuditResultRepository(directory=str(tmp_path), logger=DummyLogger()).save_records("MALI", {"form_a": record, "form_b": invalid})
+    loaded = JsonAuditResultRepository(directory=str(tmp_path), logger=DummyLogger()).load_records("MALI")
+
+    assert loaded == {"form_a": record, "form_b": invalid}
+
+def test_missing_or_unreadable_store_has_no_records(tmp_path):
+    repository = JsonAuditResultRepository(directory=str(tmp_path), logger=DummyLogger())
+    assert repository.load_records("RCI") == {}
+
+    (tmp_path / "rci.json").write_text("{broken")
+    assert repository.load_records("RCI") == {}
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from application.dtos import CatalogFormRecordDTO, DataCatalogRowDTO
+from infrastructure.repositories.json_catalog_store_repository import JsonCatalogStoreRepository
+from infrastructure.logging.dummy_logger import DummyLogger
+
+def test_forms_round_trip_with_their_rows(tmp_path):
+    row = DataCatalogRowDTO("formview_form_a", "form_a", "total", "INT64", "$.fields.total", "calculate", "${a} + 1", label_en="Total visits")
+    record = CatalogFormRecordDTO(form_id="form_a", xlsform_sha="abc123", view_name="formview_form_a", view_fingerprint="f00d", rows=[row])
+    unlisted = CatalogFormRecordDTO(form_id="form_b", xlsform_sha=None, view_name="formview_form_b", view_fingerprint="beef")
+
+    JsonCatalogStoreRepository(directory=str(tmp_path), logger=DummyLogger()).save_forms("MALI", {"form_a": record, "form_b": unlisted})
+    loaded = JsonCatalogStoreRepository(directory=str(tmp_path), logger=DummyLogger()).load_forms("MALI")
+
+    assert loaded == {"form_a": record, "form_b": unlisted}
+
+def test_missing_or_unreadable_store_has_no_forms(tmp_path):
+    repository = JsonCatalogStoreRepository(directory=str(tmp_path), logger=DummyLogger())
+    assert repository.load_forms("RCI") == {}
+
+    (tmp_path / "rci.json").write_text("{broken")
+    assert repository.load_forms("RCI") == {}
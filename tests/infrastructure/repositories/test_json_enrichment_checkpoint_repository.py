@@ -0,0 +1,37 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.json_enrichment_checkpoint_repository import JsonEnrichmentCheckpointRepository
+from infrastructure.logging.dummy_logger import DummyLogger
+
+def test_checkpoint_accumulates_saves_and_survives_a_new_instance(tmp_path):
+    repository = JsonEnrichmentCheckpointRepository(directory=str(tmp_path), logger=DummyLogger())
+    repository.save("MALI|overwrite|All", {"row_a": {"fr": "a", "en": "a", "bm": "a"}})
+    repository.save("MALI|overwrite|All", {"row_b": {"fr": "b", "en": "b", "bm": "b"}})
+
+    reopened = JsonEnrichmentCheckpointRepository(directory=str(tmp_path), logger=DummyLogger())
+
+    assert set(reopened.load("MALI|overwrite|All")) == {"row_a", "row_b"}
+    assert reopened.load("MALI|fill|All") == {}
+
+def test_clear_removes_only_the_given_run(tmp_path):
+    repository = JsonEnrichmentCheckpointRepository(directory=str(tmp_path), logger=DummyLogger())
+    repository.save("MALI|overwrite|All", {"row_a": {"fr": "a"}})
+    repository.save("CIV|overwrite|All", {"row_a": {"fr": "a"}})
+
+    repository.clear("MALI|overwrite|All")
+    repository.clear("MALI|overwrite|All")
+
+    assert repository.load("MALI|overwrite|All") == {}
+    assert repository.load("CIV|overwrite|All") == {"row_a": {"fr": "a"}}
+
+def test_unreadable_checkpoint_is_ignored(tmp_path):
+    repository = JsonEnrichmentCheckpointRepository(directory=str(tmp_path), logger=DummyLogger())
+    repository.save("MALI|overwrite|All", {"row_a": {"fr": "a"}})
+    for name in os.listdir(tmp_path):
+        (tmp_path / name).write_text("{not json")
+
+    assert repository.load("MALI|overwrite|All") == {}
@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.json_file_store import JsonFileStore
+from infrastructure.logging.dummy_logger import DummyLogger
+
+def test_records_round_trip_through_the_codec_and_leave_no_temporary_file(tmp_path):
+    store = JsonFileStore(str(tmp_path), "items", decode=lambda data: tuple(data), encode=list, logger=DummyLogger())
+
+    store.save("mali", {"version": 2}, {"a": (1, 2)})
+
+    assert store.load("mali", {"version": 2}, "items") == {"a": (1, 2)}
+    assert sorted(os.listdir(tmp_path)) == ["mali.json"]
+
+def test_other_header_missing_and_unreadable_files_load_empty(tmp_path):
+    store = JsonFileStore(str(tmp_path), "items", logger=DummyLogger())
+    store.save("mali", {"version": 1}, {"a": 1})
+
+    assert store.load("mali", {"version": 2}, "items") == {}
+    assert store.load("rci", {"version": 1}, "items") == {}
+    (tmp_path / "rci.json").write_text('["not", "an", "object"]')
+    assert store.load("rci", {"version": 1}, "items") == {}
+
+    store.remove("mali")
+    store.remove("mali")
+    assert store.load("mali", {"version": 1}, "items") == {}
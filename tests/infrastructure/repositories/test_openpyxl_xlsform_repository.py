@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+import io
+from openpyxl import Workbook
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.openpyxl_xlsform_repository import OpenpyxlXLSFormRepository
+from infrastructure.repositories.pandas_xlsform_repository import PandasXLSFormRepository
+from infrastructure.repositories.pandas_rich_xlsform_repository import PandasRichXLSFormRepository
+
+def _to_bytes(wb: Workbook) -> bytes:
+    virtual_workbook = io.BytesIO()
+    wb.save(virtual_workbook)
+    return virtual_workbook.getvalue()
+
+@pytest.fixture
+def nested_xlsform_bytes() -> bytes:
+    """Creates an XLSForm exercising inputs, nested groups, repeats, db-doc groups, notes and blank rows."""
+    wb = Workbook()
+    survey_ws = wb.active
+    survey_ws.title = "survey"
+    settings_ws = wb.create_sheet("settings")
+
+    settings_ws.append(['form_title', 'form_id'])
+    settings_ws.append(['Household visit', 'household_visit'])
+
+    survey_ws.append(['type', 'name', 'label::fr', 'instance::db-doc', 'calculation'])
+    survey_ws.append(['begin group', 'inputs', 'Inputs', None, None])
+    survey_ws.append(['string', 'source', None, None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['begin group', 'patient', 'Patient', None, None])
+    survey_ws.append(['text', 'patient_name', 'Nom', None, None])
+    survey_ws.append(['note', 'n_intro', 'Intro', None, None])
+    survey_ws.append([])
+    survey_ws.append(['begin group', None, 'Unnamed', None, None])
+    survey_ws.append(['integer', 'age', 'Age', None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['end group', 'patient', None, None, None])
+    survey_ws.append(['begin repeat', 'children', 'Enfants', None, None])
+    survey_ws.append(['begin group', 'child', None, None, None])
+    survey_ws.append(['text', 'child_name', None, None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['end repeat', None, None, None, None])
+    survey_ws.append(['begin group', 'referral', None, True, None])
+    survey_ws.append(['calculate', 'type', None, None, "'data_record'"])
+    survey_ws.append(['begin group', 'details', None, None, None])
+    survey_ws.append(['select_one yes_no', 'urgent', None, None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['begin group', 'followup', None, 1, None])
+    survey_ws.append(['date', 'followup_date', None, None, None])
+    survey_ws.append(['end group', None, None, None, None])
+    survey_ws.append(['calculate', 'summary', None, 'no', 'concat(${patient_name})'])
+    survey_ws.append([None, None, None, None, None])
+    return _to_bytes(wb)
+
+def test_parity_with_pandas_engine(nested_xlsform_bytes: bytes):
+    """Both engines must produce exactly the same main elements, repeat groups and db-doc groups."""
+    expected = PandasXLSFormRepository().get_elements_from_file(nested_xlsform_bytes)
+    actual = OpenpyxlXLSFormRepository().get_elements_from_file(nested_xlsform_bytes)
+
+    assert actual == expected
+    assert [el.path for el in actual["main_elements"]] == [
+        '/household_visit/inputs/source',
+        '/household_visit/patient/patient_name',
+        '/household_visit/patient/n_intro',
+        '/household_visit/patient/unnamed_group_9/age',
+        '/household_visit/summary',
+    ]
+    assert set(actual["db_doc_groups"]) == {"referral", "followup"}
+    assert actual["repeat_groups"]["children"]["json_path_in_parent"] == '$.fields.children'
+
+def test_parity_without_settings_sheet():
+    """Without a settings sheet both engines fall back to the default form name."""
+    wb = Workbook()
+    survey_ws = wb.active
+    survey_ws.title = "survey"
+    survey_ws.append(['type', 'name'])
+    survey_ws.append(['text', 'question1'])
+    xlsform_bytes = _to_bytes(wb)
+
+    actual = OpenpyxlXLSFormRepository().get_elements_from_file(xlsform_bytes)
+
+    assert actual == PandasXLSFormRepository().get_elements_from_file(xlsform_bytes)
+    assert actual["main_elements"][0].path == '/my_form/question1'
+
+def test_formula_context_matches_pandas_rich_repository(nested_xlsform_bytes: bytes):
+    formulas = ['${age} * 12']
+    assert OpenpyxlXLSFormRepository().get_formula_context_as_markdown(nested_xlsform_bytes, formulas) == \
+        PandasRichXLSFormRepository().get_formula_context_as_markdown(nested_xlsform_bytes, formulas)
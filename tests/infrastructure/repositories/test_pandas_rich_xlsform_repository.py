@@ -50,3 +50,31 @@ def test_get_rich_elements_parses_correctly(rich_xlsform_repository: PandasRichX
     assert c1.odk_type == "calculate"
     assert c1.calculation == "1+1"
     assert c1.titles['en'] == ""
+
+def _survey_bytes(rows) -> bytes:
+    wb = Workbook()
+    survey_ws = wb.active
+    survey_ws.title = "survey"
+    for row in rows:
+        survey_ws.append(row)
+    virtual_workbook = io.BytesIO()
+    wb.save(virtual_workbook)
+    return virtual_workbook.getvalue()
+
+def test_get_formula_context_as_markdown_keeps_only_the_dependency_closure(rich_xlsform_repository: PandasRichXLSFormRepository):
+    content = _survey_bytes([
+        ['type', 'name', 'label::fr', 'calculation', 'relevant'],
+        ['integer', 'age', 'Âge', '', ''],
+        ['select_one sex', 'sex', 'Sexe', '', ''],
+        ['select_one yes_no', 'pregnant', 'Enceinte ?', '', "${sex} = 'female'"],
+        ['text', 'comment', 'Commentaire', '', ''],
+        ['calculate', 'needs_anc', '', "${age} >= 15 and ${pregnant} = 'yes'", ''],
+    ])
+
+    context = rich_xlsform_repository.get_formula_context_as_markdown(content, ["${age} >= 15 and ${pregnant} = 'yes'"])
+
+    for name in ('age', 'sex', 'pregnant', 'needs_anc'):
+        assert name in context
+    assert 'comment' not in context
+    # A formula that cannot be located falls back to the whole sheet.
+    assert 'comment' in rich_xlsform_repository.get_formula_context_as_markdown(content, ["today()"])
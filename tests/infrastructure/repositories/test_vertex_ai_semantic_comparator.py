@@ -1,12 +1,18 @@
 import pytest
 import sys
 import os
-from unittest.mock import patch, MagicMock
+import asyncio
+import json
+import math
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
-from infrastructure.repositories.vertex_ai_semantic_comparator import VertexAISemanticComparator
+from infrastructure.repositories.vertex_ai_semantic_comparator import VertexAISemanticComparator, AsyncVertexAISemanticComparator
+from infrastructure.http.request_rate_limiter import RetryPolicy
+from infrastructure.logging.dummy_logger import DummyLogger
+from google.genai import errors
 
 # --- Unit Tests ---
 
@@ -47,3 +53,138 @@ def test_are_titles_semantically_similar_integration():
 
     # This assertion will now fail with the exact text from the AI
     assert result is True
+
+# --- Async comparator ---
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_async_comparator_uses_native_aio_client(mock_genai_client):
+    mock_response = MagicMock()
+    mock_response.text = '{"fr": "Âge en mois", "en": "Age in months", "bm": "Si kalo la"}'
+    mock_genai_client.return_value.aio.models.generate_content = AsyncMock(return_value=mock_response)
+
+    comparator = AsyncVertexAISemanticComparator(logger=DummyLogger())
+    descriptions = asyncio.run(comparator.get_formula_description_with_context("${age} * 12", "| calculate | age_months |"))
+
+    assert descriptions == {"fr": "Âge en mois", "en": "Age in months", "bm": "Si kalo la"}
+    mock_genai_client.return_value.aio.models.generate_content.assert_awaited_once()
+    mock_genai_client.return_value.models.generate_content.assert_not_called()
+
+# --- Batched similarity scoring ---
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_score_title_similarities_chunks_candidates_and_fills_matrix(mock_genai_client):
+    def generate_content(model, contents, config):
+        prompt = contents[0]
+        response = MagicMock()
+        # Every chunk answers that its first A item matches its first B item.
+        response.text = '{"matches": [{"a": 0, "b": 0, "score": 0.8}, {"a": 9, "b": 0, "score": 1.0}]}' if "A0:" in prompt else '{"matches": []}'
+        return response
+    mock_genai_client.return_value.models.generate_content.side_effect = generate_content
+
+    comparator = VertexAISemanticComparator(logger=DummyLogger(), similarity_chunk_size=2)
+    scores = comparator.score_title_similarities(["t0", "", "t2", "t3"], ["u0", "u1", "u2"])
+
+    # Empty titles are not sent: 3 x 3 candidates in chunks of 2 -> 2 x 2 prompts.
+    assert mock_genai_client.return_value.models.generate_content.call_count == 4
+    assert scores == [
+        [0.8, 0.0, 0.8],
+        [0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [0.8, 0.0, 0.8],
+    ]
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_failed_similarity_chunks_are_nan_and_failed_yes_no_calls_raise(mock_genai_client):
+    def generate_content(model, contents, config):
+        if "A0: 't0'" in contents[0] or "Label 1" in contents[0]:
+            raise _api_error(400)
+        response = MagicMock()
+        response.text = '{"matches": [{"a": 0, "b": 0, "score": 0.9}]}'
+        return response
+    mock_genai_client.return_value.models.generate_content.side_effect = generate_content
+
+    comparator = VertexAISemanticComparator(logger=DummyLogger(), similarity_chunk_size=1)
+    scores = comparator.score_title_similarities(["t0", "t1"], ["u0"])
+
+    # The failed pair is unknown rather than dissimilar.
+    assert math.isnan(scores[0][0]) and scores[1] == [0.9]
+    with pytest.raises(errors.APIError):
+        comparator.are_titles_semantically_similar("Âge", "Age du patient")
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_async_comparator_shares_the_failure_handling(mock_genai_client):
+    async def generate_content(model, contents, config):
+        if "A0: 't0'" in contents[0] or "Label 1" in contents[0]:
+            raise _api_error(400)
+        response = MagicMock()
+        response.text = '{"matches": [{"a": 0, "b": 0, "score": 0.9}]}'
+        return response
+    mock_genai_client.return_value.aio.models.generate_content = AsyncMock(side_effect=generate_content)
+
+    comparator = AsyncVertexAISemanticComparator(logger=DummyLogger(), similarity_chunk_size=1)
+    scores = asyncio.run(comparator.score_title_similarities(["t0", "t1"], ["u0"]))
+
+    assert math.isnan(scores[0][0]) and scores[1] == [0.9]
+    with pytest.raises(errors.APIError):
+        asyncio.run(comparator.are_titles_semantically_similar("Âge", "Age du patient"))
+    assert asyncio.run(comparator.are_formulas_semantically_similar("${a} + ${b}", "${b}+${a}")) is True
+
+# --- Batched formula descriptions ---
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_formula_descriptions_are_batched_per_token_budget(mock_genai_client):
+    prompts = []
+    def generate_content(model, contents, config):
+        prompts.append(contents[0])
+        count = contents[0].count("        F")
+        response = MagicMock()
+        # The model forgets the last formula of every batch.
+        response.text = json.dumps({"descriptions": [{"id": n, "fr": f"fr{n}", "en": f"en{n}", "bm": f"bm{n}"} for n in range(count - 1)]})
+        return response
+    mock_genai_client.return_value.models.generate_content.side_effect = generate_content
+
+    comparator = VertexAISemanticComparator(logger=DummyLogger())
+    context = "x" * 400  # ~100 tokens sent with every batch
+    comparator.BATCH_INPUT_TOKEN_BUDGET = 130  # room for the context and two formulas
+    descriptions = comparator.get_formula_descriptions_with_context(["${a}", "", "${b}", "${c}"], context)
+
+    assert len(prompts) == 2
+    assert all(context in prompt for prompt in prompts)
+    assert descriptions[0] == {"fr": "fr0", "en": "en0", "bm": "bm0"}
+    assert descriptions[1] == {"fr": "", "en": "", "bm": ""}
+    assert descriptions[2]["fr"].startswith("Error:")
+    assert descriptions[3]["fr"].startswith("Error:")
+
+# --- Rate limiting and retries ---
+
+def _api_error(code: int) -> errors.APIError:
+    return errors.APIError(code, {"error": {"message": f"status {code}"}})
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.time.sleep')
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_throttled_and_server_errors_are_retried_with_backoff(mock_genai_client, mock_sleep):
+    mock_response = MagicMock()
+    mock_response.text = "YES"
+    mock_genai_client.return_value.models.generate_content.side_effect = [_api_error(429), _api_error(503), mock_response]
+    rate_limiter = MagicMock()
+
+    comparator = VertexAISemanticComparator(
+        logger=DummyLogger(),
+        rate_limiter=rate_limiter,
+        retry_policy=RetryPolicy(max_attempts=3, base_delay_seconds=1, random_source=lambda low, high: high)
+    )
+
+    assert comparator.are_titles_semantically_similar("Âge", "Age du patient") is True
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+    # Every attempt takes a token from the limiter.
+    assert rate_limiter.acquire.call_count == 3
+
+@patch('infrastructure.repositories.vertex_ai_semantic_comparator.genai.Client')
+def test_client_errors_are_not_retried(mock_genai_client):
+    mock_genai_client.return_value.aio.models.generate_content = AsyncMock(side_effect=_api_error(400))
+
+    comparator = AsyncVertexAISemanticComparator(logger=DummyLogger(), retry_policy=RetryPolicy(max_attempts=5))
+    descriptions = asyncio.run(comparator.get_formula_description_with_context("${age} * 12", "| calculate | age_months |"))
+
+    assert descriptions["fr"].startswith("Error:")
+    mock_genai_client.return_value.aio.models.generate_content.assert_awaited_once()
@@ -0,0 +1,72 @@
+import pytest
+import sys
+import os
+import io
+from unittest.mock import patch
+from openpyxl import Workbook
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.xlsform_model import XLSFormModel, load_xlsform_model
+from infrastructure.repositories.pandas_xlsform_repository import PandasXLSFormRepository
+from infrastructure.repositories.pandas_rich_xlsform_repository import PandasRichXLSFormRepository
+
+def _to_bytes(wb: Workbook) -> bytes:
+    virtual_workbook = io.BytesIO()
+    wb.save(virtual_workbook)
+    return virtual_workbook.getvalue()
+
+@pytest.fixture
+def xlsform_bytes() -> bytes:
+    """An XLSForm with a db-doc group, a repeat, blank cells, NA-like labels and a numeric label column."""
+    wb = Workbook()
+    survey_ws = wb.active
+    survey_ws.title = "survey"
+    settings_ws = wb.create_sheet("settings")
+    settings_ws.append(['form_id'])
+    settings_ws.append(['model_form'])
+
+    survey_ws.append(['type', 'name', 'label::fr', 'label::bm', 'calculation', 'instance::db-doc'])
+    survey_ws.append(['text', 'q1', 'Q1', 1, None, None])
+    survey_ws.append(['begin group', 'g1', 'NA', None, None, None])
+    survey_ws.append(['calculate', 'c1', None, 2, '${q1} + 1', None])
+    survey_ws.append(['end group', None, None, None, None, None])
+    survey_ws.append([])
+    survey_ws.append(['begin repeat', 'r1', 'Repeat', None, None, None])
+    survey_ws.append(['integer', 'r_q', 'RQ', None, None, None])
+    survey_ws.append(['end repeat', None, None, None, None, None])
+    survey_ws.append(['begin group', 'doc', None, None, None, 'true'])
+    survey_ws.append(['calculate', 'type', None, None, "'data_record'", None])
+    survey_ws.append(['end group', None, None, None, None, None])
+    survey_ws.append([None, None, None, None, None, None])
+    return _to_bytes(wb)
+
+def _rich_view(elements):
+    return [(el.question_name, el.group, el.odk_type, el.path, el.excel_line_number, el.titles, el.calculation, el.json_path) for el in elements]
+
+def test_both_projections_come_from_a_single_parse(xlsform_bytes: bytes):
+    with patch.object(XLSFormModel, 'from_dataframe', wraps=XLSFormModel.from_dataframe) as from_dataframe:
+        groups = PandasXLSFormRepository().get_elements_from_file(xlsform_bytes)
+        rich_elements = PandasRichXLSFormRepository().get_rich_elements_from_file(xlsform_bytes)
+
+    assert from_dataframe.call_count == 1
+    assert [el.path for el in groups["main_elements"]] == ['/model_form/q1', '/model_form/g1/c1']
+    assert list(groups["repeat_groups"]) == ['r1']
+    assert [el.question_name for el in groups["db_doc_groups"]["doc"]] == ['type']
+    assert [el.path for el in rich_elements if el.question_name == 'c1'] == ['/model_form/g1/c1']
+
+def test_engines_build_the_same_model(xlsform_bytes: bytes):
+    pandas_model = load_xlsform_model(xlsform_bytes, engine="pandas")
+    openpyxl_model = load_xlsform_model(xlsform_bytes, engine="openpyxl")
+
+    assert openpyxl_model.rows == pandas_model.rows
+    assert openpyxl_model.cht_element_groups() == pandas_model.cht_element_groups()
+    assert _rich_view(openpyxl_model.rich_elements()) == _rich_view(pandas_model.rich_elements())
+    # pandas reads 'NA' as missing and renders a numeric column with blanks as floats.
+    assert pandas_model.rows[1].titles == {'fr': '', 'en': '', 'bm': ''}
+    assert pandas_model.rows[0].titles['bm'] == '1.0'
+
+def test_unknown_engine_is_rejected(xlsform_bytes: bytes):
+    with pytest.raises(ValueError):
+        load_xlsform_model(xlsform_bytes, engine="xlrd")
@@ -0,0 +1,57 @@
+import pytest
+import sys
+import os
+import io
+from unittest.mock import patch
+from openpyxl import Workbook
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from infrastructure.repositories.xlsform_workbook import XLSFormWorkbook, load_xlsform_workbook
+from infrastructure.repositories.pandas_xlsform_repository import PandasXLSFormRepository
+from infrastructure.repositories.pandas_rich_xlsform_repository import PandasRichXLSFormRepository
+
+@pytest.fixture
+def xlsform_bytes() -> bytes:
+    wb = Workbook()
+    survey_ws = wb.active
+    survey_ws.title = "survey"
+    settings_ws = wb.create_sheet("settings")
+    settings_ws.append(['form_id'])
+    settings_ws.append(['workbook_test_form'])
+    survey_ws.append(['type', 'name', 'label::fr', 'calculation'])
+    survey_ws.append(['text', 'question1', 'Q1', ''])
+    survey_ws.append(['calculate', 'calc1', '', '${question1}'])
+
+    virtual_workbook = io.BytesIO()
+    wb.save(virtual_workbook)
+    return virtual_workbook.getvalue()
+
+def test_workbook_is_memoized_by_content(xlsform_bytes: bytes):
+    assert load_xlsform_workbook(xlsform_bytes) is load_xlsform_workbook(bytes(xlsform_bytes))
+
+def test_sheets_are_parsed_once_and_shared_between_parsers(xlsform_bytes: bytes):
+    workbook = XLSFormWorkbook(xlsform_bytes)
+    with patch('infrastructure.repositories.xlsform_model.load_xlsform_workbook', return_value=workbook), \
+         patch('infrastructure.repositories.pandas_rich_xlsform_repository.load_xlsform_workbook', return_value=workbook), \
+         patch.object(workbook._excel_file, 'parse', wraps=workbook._excel_file.parse) as parse:
+        elements = PandasXLSFormRepository().get_elements_from_file(xlsform_bytes)
+        rich_elements = PandasRichXLSFormRepository().get_rich_elements_from_file(xlsform_bytes)
+        markdown = PandasRichXLSFormRepository().get_survey_sheet_as_markdown(xlsform_bytes)
+
+    assert sorted(call.kwargs['sheet_name'] for call in parse.call_args_list) == ['settings', 'survey']
+    assert elements["main_elements"][0].path == '/workbook_test_form/question1'
+    assert rich_elements[1].calculation == '${question1}'
+    assert 'question1' in markdown
+
+def test_missing_sheets(xlsform_bytes: bytes):
+    wb = Workbook()
+    wb.active.title = "survey"
+    virtual_workbook = io.BytesIO()
+    wb.save(virtual_workbook)
+    workbook = XLSFormWorkbook(virtual_workbook.getvalue())
+
+    assert workbook.form_name == 'my_form'
+    with pytest.raises(ValueError):
+        workbook.get_rows('settings')
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from application.services.bulk_audit_service_impl import BulkAuditServiceImpl
+from infrastructure.repositories.threaded_async_adapters import ThreadedAsyncCHTAppRepository, ThreadedAsyncCodeRepository, ThreadedAsyncDataWarehouseRepository
 from infrastructure.repositories.pandas_xlsform_repository import PandasXLSFormRepository
 from infrastructure.repositories.github_repository import GitHubRepository
 from domain.contracts.data_warehouse_repository import DataWarehouseRepository
@@ -27,9 +28,9 @@ class TestBulkAuditDbDoc(unittest.TestCase):
 
         # Instantiate the service with the real and mocked components
         bulk_audit_service = BulkAuditServiceImpl(
-            cht_app_repo=cht_app_repo, 
-            code_repo=code_repo, 
-            dw_repo=dw_repo, 
+            async_cht_app_repo=ThreadedAsyncCHTAppRepository(cht_app_repo),
+            async_code_repo=ThreadedAsyncCodeRepository(code_repo),
+            async_dw_repo=ThreadedAsyncDataWarehouseRepository(dw_repo),
             xlsform_repo=xlsform_repo, 
             logger=logger
         )